@@ -1,14 +1,154 @@
 from django.contrib import admin
-from .models import EGYNationalIDInfo, APILog
+from django.contrib.admin.views.main import ChangeList
+from .models import EGYNationalIDInfo, EGYNationalIDInfoStats, APILog, APILogDailyRollup
+from .stats import distribution
+
+
+class StatsListFilter(admin.SimpleListFilter):
+    """
+    Filter on a bucket field whose choices are read from EGYNationalIDInfoStats,
+    instead of a SELECT DISTINCT over every stored national ID. Rows are
+    filtered with `lookup`.
+    """
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        rows, _ = distribution([self.parameter_name])
+        return [(row[self.parameter_name], f"{row[self.parameter_name]} ({row['count']})") for row in rows]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(**{self.lookup: self.value()})
+
+
+class BirthYearListFilter(StatsListFilter):
+    title = "birth year"
+    parameter_name = "birth_year"
+    lookup = "birth_date__year"
+
+
+class BirthMonthListFilter(StatsListFilter):
+    title = "birth month"
+    parameter_name = "birth_month"
+    lookup = "birth_date__month"
+
+
+class GovernorateListFilter(StatsListFilter):
+    title = "governorate"
+    parameter_name = "governorate"
+    lookup = "governorate"
+
 
 @admin.register(EGYNationalIDInfo)
 class EGYNationalIDInfoAdmin(admin.ModelAdmin):
-    list_display = ("national_id", "birth_year", "birth_month", "birth_day")
+    list_display = ("national_id", "birth_year", "birth_month", "birth_day", "gender", "governorate")
     search_fields = ("national_id",)
-    list_filter = ("birth_year", "birth_month")
+    list_filter = (BirthYearListFilter, BirthMonthListFilter, "gender", GovernorateListFilter)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Matches national IDs exactly, or by prefix as a range of the integer
+        column, which can use its unique index.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if not search_term.isdigit() or len(search_term) > 14:
+            return queryset.none(), False
+        scale = 10 ** (14 - len(search_term))
+        return queryset.filter(national_id__gte=int(search_term) * scale, national_id__lt=(int(search_term) + 1) * scale), False
+
+
+@admin.register(EGYNationalIDInfoStats)
+class EGYNationalIDInfoStatsAdmin(admin.ModelAdmin):
+    """
+    Read-only buckets, above which the change list shows the distribution of the
+    stored national IDs by century, gender and governorate.
+    """
+    list_display = ("birth_year", "birth_month", "gender", "governorate", "count")
+    list_filter = ("century", "gender")
+    ordering = ("birth_year", "birth_month", "gender", "governorate")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context["distributions"] = []
+        for field in ("century", "gender", "governorate"):
+            rows, total = distribution([field])
+            extra_context["distributions"].append((field, total, [(row[field], row["count"]) for row in rows]))
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Change list paginated by primary key ("?before=<id>") instead of page number,
+    so neither a COUNT(*) nor a large OFFSET is run on big tables.
+    """
+    CURSOR_VAR = "before"
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        queryset = self.queryset
+        cursor = request.GET.get(self.CURSOR_VAR)
+        if cursor and cursor.isdigit():
+            queryset = queryset.filter(pk__lt=int(cursor))
+        results = list(queryset[:self.list_per_page + 1])
+
+        self.result_list = results[:self.list_per_page]
+        self.next_cursor = self.result_list[-1].pk if len(results) > self.list_per_page else None
+        self.result_count = len(self.result_list)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(cursor) or self.next_cursor is not None
+        self.paginator = self.model_admin.get_paginator(request, self.result_list, self.list_per_page)
+
+    def get_ordering(self, request, queryset):
+        # Newest first, by primary key only, so the cursor is stable
+        return ["-pk"]
+
 
 @admin.register(APILog)
 class APILogAdmin(admin.ModelAdmin):
     list_display = ("ip_address", "national_id", "timestamp")
     search_fields = ("national_id",)
     list_filter = ("timestamp",)
+    show_full_result_count = False
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Matches national IDs by prefix (or exactly for a full ID), which can use
+        the (national_id, timestamp) index, unlike the default icontains search.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if len(search_term) == 14:
+            return queryset.filter(national_id=search_term), False
+        return queryset.filter(national_id__startswith=search_term), False
+
+
+@admin.register(APILogDailyRollup)
+class APILogDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "ip_address", "calls")
+    search_fields = ("=ip_address",)
+    list_filter = ("day",)
+    date_hierarchy = "day"
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NationalIdProcessingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'National_ID_Processing'
+
+    def ready(self):
+        # Connect signal handlers
+        from . import signals  # noqa: F401
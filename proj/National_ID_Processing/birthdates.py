@@ -0,0 +1,70 @@
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+
+
+# Negative table entries for calendar dates that do not exist
+INVALID_DAY = -1
+INVALID_LEAP_DAY = -2
+
+# First year of the century encoded by the first digit of a national ID
+CENTURY_BASE_YEAR = {"2": 1900, "3": 2000}
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_DAY_SLOTS = 32  # days 0 to 31
+
+_table = None
+_table_lock = threading.Lock()
+
+_today_ordinal = 0
+_today_expires_at = 0.0
+
+
+def _build_table():
+    """
+    Builds the lookup table: one entry per (century, YY, MM, DD) slot holding the
+    proleptic Gregorian ordinal of the birth date, or a negative error code.
+    """
+    table = array("l", [INVALID_DAY]) * (len(CENTURY_BASE_YEAR) * 100 * 12 * _DAY_SLOTS)
+    index = 0
+    for base_year in CENTURY_BASE_YEAR.values():
+        for year in range(base_year, base_year + 100):
+            leap_year = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+            for month in range(1, 13):
+                for day in range(_DAY_SLOTS):
+                    if 1 <= day <= _DAYS_IN_MONTH[month] or (month == 2 and day == 29 and leap_year):
+                        table[index] = date(year, month, day).toordinal()
+                    elif month == 2 and day == 29:
+                        table[index] = INVALID_LEAP_DAY
+                    index += 1
+    return table
+
+
+def birth_ordinal(century_digit, yy, month, day):
+    """
+    Returns the ordinal of the birth date encoded by a national ID, or INVALID_DAY /
+    INVALID_LEAP_DAY. `century_digit` must be "2" or "3", `month` 1 to 12 and `day`
+    0 to 31. The table is built on first use.
+    """
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:  # pragma: no branch
+                _table = _build_table()
+
+    century = 0 if century_digit == "2" else 1
+    return _table[((century * 100 + yy) * 12 + month - 1) * _DAY_SLOTS + day]
+
+
+def today_ordinal():
+    """
+    Returns today's ordinal, recomputed only once the local date has changed.
+    """
+    global _today_ordinal, _today_expires_at
+    if time.time() >= _today_expires_at:
+        today = date.today()
+        tomorrow = today + timedelta(days=1)
+        _today_ordinal = today.toordinal()
+        _today_expires_at = time.mktime(tomorrow.timetuple())
+    return _today_ordinal
@@ -0,0 +1,31 @@
+"""
+Validation error codes and messages shared by the validators, without any
+dependency (numpy in particular), so that importing them stays cheap.
+"""
+
+# Length of a national ID, and of one packed record
+RECORD_SIZE = 14
+
+# Error codes, in the order the scalar validator checks them
+VALID = 0
+INVALID_FORMAT = 1
+INVALID_CENTURY = 2
+INVALID_MONTH = 3
+INVALID_DAY = 4
+INVALID_LEAP_DAY = 5
+INVALID_GOVERNORATE = 6
+INVALID_CHECK_DIGIT = 7
+FUTURE_BIRTH_DATE = 8
+
+# Error messages indexed by error code, identical to the scalar validator's
+ERROR_MESSAGES = (
+    None,
+    "Invalid format: National ID must be 14 digits.",
+    "Invalid first digit in National ID. It must be 2 or 3.",
+    "Invalid month in National ID.",
+    "Invalid day in National ID.",
+    "Invalid day in National ID (February 29 on a non-leap year).",
+    "Invalid governorate code in National ID.",
+    "Invalid check digit in National ID.",
+    "Invalid year: Birth year is in the future.",
+)
@@ -0,0 +1,181 @@
+import atexit
+import logging
+import math
+import os
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from .helpers import validate_national_id
+from .errors import ERROR_MESSAGES, INVALID_FORMAT, RECORD_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+_ERROR_CODES = {message: code for code, message in enumerate(ERROR_MESSAGES)}
+
+
+def _validate_one(national_id):
+    """Validates one item of a batch; anything but a string is an invalid format."""
+    if not isinstance(national_id, str):
+        return False, ERROR_MESSAGES[INVALID_FORMAT]
+    return validate_national_id(national_id)
+
+
+def _validate_records(records):
+    """
+    Worker entry point: validates a buffer of packed 14-byte ASCII records and
+    returns one error code byte per record (0 for valid IDs).
+    """
+    text = records.decode("ascii")
+    return bytes(
+        _ERROR_CODES[validate_national_id(text[start:start + RECORD_SIZE])[1]]
+        for start in range(0, len(text), RECORD_SIZE)
+    )
+
+
+class ValidationExecutor:
+    """
+    Validates batches of national IDs in a persistent pool of worker processes,
+    so large batches are not capped by the GIL of the calling process.
+
+    IDs are sent to the workers as contiguous buffers of 14-byte records and come
+    back as one error code byte each, which keeps pickling cheap. Batches smaller
+    than `inline_threshold` are validated in-process, where the pool's overhead
+    would outweigh the gain. Results are always returned in input order.
+
+    `workers` defaults to 1, which validates every batch in-process; 0 (or None)
+    starts one worker per CPU. The pool is per process, so every web server
+    worker that validates large batches starts its own `workers` processes.
+    """
+
+    # Chunks handed out per worker, so that a slow chunk does not stall the batch
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, workers=1, inline_threshold=2000, min_chunk_size=500, max_chunk_size=20000):
+        self.workers = workers or os.cpu_count() or 1
+        self.inline_threshold = inline_threshold
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self._pool = None
+        self._pid = None
+        self._registered = False
+        self._lock = threading.Lock()
+
+    def chunk_size(self, count):
+        """
+        Returns the number of IDs per chunk for a batch of `count` IDs.
+        """
+        size = math.ceil(count / (self.workers * self.CHUNKS_PER_WORKER))
+        return max(self.min_chunk_size, min(self.max_chunk_size, size))
+
+    def validate_many(self, national_ids):
+        """
+        Returns one `(is_valid, error_message)` tuple per national ID, in order.
+        """
+        national_ids = list(national_ids)
+        if self.workers <= 1 or len(national_ids) < self.inline_threshold:
+            return [_validate_one(national_id) for national_id in national_ids]
+
+        # Only 14-character ASCII strings fit a record; anything else is rare and
+        # is validated here
+        results = [None] * len(national_ids)
+        positions = []
+        records = []
+        for index, national_id in enumerate(national_ids):
+            if isinstance(national_id, str) and len(national_id) == RECORD_SIZE and national_id.isascii():
+                positions.append(index)
+                records.append(national_id)
+            else:
+                results[index] = _validate_one(national_id)
+
+        # The process pool machinery is only imported by the first large batch
+        from concurrent.futures.process import BrokenProcessPool
+
+        size = self.chunk_size(len(records))
+        buffers = ["".join(records[start:start + size]).encode("ascii") for start in range(0, len(records), size)]
+        try:
+            pool = self._get_pool()
+            codes = b"".join(future.result() for future in [pool.submit(_validate_records, buffer) for buffer in buffers])
+        except BrokenProcessPool:
+            logger.exception("Validation worker pool is broken; validating %d IDs in-process.", len(records))
+            self.shutdown()
+            codes = b"".join(map(_validate_records, buffers))
+
+        for index, code in zip(positions, codes):
+            results[index] = (code == 0, ERROR_MESSAGES[code])
+        return results
+
+    def _get_pool(self):
+        """
+        Returns the worker pool of this process, creating it on first use (and
+        again after a fork, since the parent's pool is not usable from the child).
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():  # pragma: no branch (created by another thread)
+                    # Forking a threaded server is unsafe, so workers are started
+                    # from a clean process where the platform allows it
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    methods = multiprocessing.get_all_start_methods()
+                    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+                    self._pid = os.getpid()
+                    if not self._registered:
+                        atexit.register(self.shutdown)
+                        self._registered = True
+        return self._pool
+
+    def shutdown(self):
+        """
+        Stops the worker processes; the pool is started again on the next batch.
+        """
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown()
+        self._pool = None
+        self._pid = None
+
+
+_executor = None
+
+
+def get_validation_executor():
+    """
+    Returns the process-wide executor configured by NATIONAL_ID_VALIDATION_EXECUTOR,
+    or None when batches are always validated in-process.
+    """
+    global _executor
+    if _executor is None:
+        options = getattr(settings, "NATIONAL_ID_VALIDATION_EXECUTOR", {})
+        if not options.get("ENABLED", True):
+            return None
+        _executor = ValidationExecutor(
+            workers=options.get("WORKERS", 1),
+            inline_threshold=options.get("INLINE_THRESHOLD", 2000),
+            min_chunk_size=options.get("MIN_CHUNK_SIZE", 500),
+            max_chunk_size=options.get("MAX_CHUNK_SIZE", 20000),
+        )
+    return _executor
+
+
+def validate_many(national_ids):
+    """
+    Validates many national IDs and returns one `(is_valid, error_message)` tuple
+    per ID, in order; items that are not strings get the invalid format error.
+    """
+    executor = get_validation_executor()
+    if executor is None:
+        return [_validate_one(national_id) for national_id in national_ids]
+    return executor.validate_many(national_ids)
+
+
+@receiver(setting_changed)
+def _reset_executor(setting, **kwargs):
+    global _executor
+    if setting == "NATIONAL_ID_VALIDATION_EXECUTOR":
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
@@ -0,0 +1,148 @@
+import csv
+import io
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from django.db.models import F
+from django.utils import timezone as django_timezone
+from django.utils.dateparse import parse_datetime
+from .models import APILog, EGYNationalIDInfo
+from .renderers import dumps
+
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows fetched from the database at a time, and written out per chunk
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _parse_datetime(value):
+    """Parses an ISO 8601 datetime or date (midnight), in the current time zone when naive."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"'{value}' is not an ISO 8601 date or datetime.")
+    if django_timezone.is_naive(parsed):
+        parsed = django_timezone.make_aware(parsed)
+    return parsed
+
+
+class Export(NamedTuple):
+    """
+    An exportable model: the exported fields (the primary key first), the
+    accepted filters, as {parameter: (lookup, parser)}, and the expressions of
+    exported fields that are not model fields.
+    """
+    model: type
+    fields: tuple
+    filters: dict
+    annotations: dict = {}
+
+
+EXPORTS = {
+    "national-ids": Export(
+        model=EGYNationalIDInfo,
+        fields=("id", "national_id", "birth_year", "birth_month", "birth_day", "gender", "governorate", "created_at"),
+        filters={
+            "birth_year_min": ("birth_date__year__gte", int),
+            "birth_year_max": ("birth_date__year__lte", int),
+            "birth_month_min": ("birth_date__month__gte", int),
+            "birth_month_max": ("birth_date__month__lte", int),
+            "created_after": ("created_at__gte", _parse_datetime),
+            "created_before": ("created_at__lt", _parse_datetime),
+        },
+        annotations={
+            "birth_year": F("birth_date__year"),
+            "birth_month": F("birth_date__month"),
+            "birth_day": F("birth_date__day"),
+        },
+    ),
+    "api-logs": Export(
+        model=APILog,
+        fields=("id", "ip_address", "national_id", "timestamp"),
+        filters={
+            "national_id": ("national_id", str),
+            "ip_address": ("ip_address", str),
+            "created_after": ("timestamp__gte", _parse_datetime),
+            "created_before": ("timestamp__lt", _parse_datetime),
+        },
+    ),
+}
+
+
+def export_queryset(export, params, after=None):
+    """
+    Returns the rows of `export` matching the filters in `params` (a mapping of
+    parameter to string; unknown parameters are ignored), after the primary key
+    `after` when resuming, in primary key order. Raises ValueError for invalid values.
+    """
+    queryset = export.model.objects.annotate(**export.annotations).order_by("pk")
+    lookups = {}
+    for parameter, (lookup, parse) in export.filters.items():
+        value = params.get(parameter)
+        if value in (None, ""):
+            continue
+        try:
+            lookups[lookup] = parse(value)
+        except ValueError as exc:
+            raise ValueError(f"Invalid {parameter}: {exc}")
+    if after not in (None, ""):
+        try:
+            lookups["pk__gt"] = int(after)
+        except ValueError:
+            raise ValueError(f"Invalid resume token '{after}'.")
+    return queryset.filter(**lookups)
+
+
+def _format_value(value):
+    """Datetimes are written in ISO 8601 UTC, like the API responses."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).isoformat()
+        return value[:-6] + "Z"
+    return value
+
+
+class ExportStream:
+    """
+    Iterates over the CSV or NDJSON encoding of a queryset, one chunk of rows at
+    a time. Rows are read with `QuerySet.iterator(chunk_size)` (a server-side
+    cursor on PostgreSQL), so memory use does not grow with the table. After
+    each chunk, `rows` is the number of rows written so far and `last_pk` the
+    resume token to pass as `after` to continue after them.
+    """
+
+    def __init__(self, queryset, fields, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported format '{file_format}': use {' or '.join(FORMATS)}.")
+        self.queryset = queryset
+        self.fields = fields
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.last_pk = None
+
+    def __iter__(self):
+        if self.file_format == "csv":
+            yield self._encode([self.fields])
+        chunk = []
+        for row in self.queryset.values_list(*self.fields).iterator(chunk_size=self.chunk_size):
+            chunk.append([_format_value(value) for value in row])
+            if len(chunk) == self.chunk_size:
+                yield self._flush(chunk)
+                chunk = []
+        if chunk:
+            yield self._flush(chunk)
+
+    def _flush(self, chunk):
+        self.rows += len(chunk)
+        self.last_pk = chunk[-1][0]
+        return self._encode(chunk)
+
+    def _encode(self, rows):
+        if self.file_format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            return buffer.getvalue().encode()
+        return b"".join(dumps(dict(zip(self.fields, row))) + b"\n" for row in rows)
@@ -0,0 +1,130 @@
+from datetime import date
+
+from django import forms
+from django.core import validators
+from django.db import models
+from django.db.models.lookups import YearExact, YearGt, YearGte, YearLt, YearLte
+from django.utils.dateparse import parse_date
+
+
+class NationalIDField(models.BigIntegerField):
+    """
+    A 14-digit national ID stored as a 64-bit integer: 8 bytes and an integer
+    index instead of a 14-character text column. Reads and writes 14-digit
+    strings; national IDs never start with 0, so none is lost.
+    """
+    description = "Egyptian national ID (stored as a 64-bit integer)"
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else str(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return str(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            if not (value.isascii() and value.isdigit()):
+                raise ValueError(f"Field '{self.name}' expected a national ID but got {value!r}.")
+            value = int(value)
+        return super().get_prep_value(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return forms.CharField(**{
+            "max_length": 14,
+            "min_length": 14,
+            "validators": [validators.RegexValidator(r"\A[1-9][0-9]{13}\Z", "Enter a 14-digit national ID.")],
+            **kwargs,
+        })
+
+
+class PackedDateField(models.IntegerField):
+    """
+    A date stored as the integer YYYYMMDD: one 4-byte column, ordered like the
+    date, instead of separate year, month and day columns. Supports the `year`,
+    `month` and `day` transforms; year comparisons are run as ranges of the
+    column, so they can use an index.
+    """
+    description = "Date (stored as the integer YYYYMMDD)"
+
+    @staticmethod
+    def pack(value):
+        return value.year * 10000 + value.month * 100 + value.day
+
+    @staticmethod
+    def unpack(value):
+        year, month_day = divmod(value, 10000)
+        return date(year, *divmod(month_day, 100))
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else self.unpack(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, date):
+            return value
+        if isinstance(value, int):
+            return self.unpack(value)
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValueError(f"Field '{self.name}' expected a date but got {value!r}.")
+        return parsed
+
+    def get_prep_value(self, value):
+        if isinstance(value, date):
+            return self.pack(value)
+        if isinstance(value, str):
+            return self.pack(self.to_python(value))
+        return super().get_prep_value(value)
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return "" if value is None else value.isoformat()
+
+    def formfield(self, **kwargs):
+        return forms.DateField(**kwargs)
+
+
+class PackedDatePart(models.Transform):
+    """(column / DIVISOR) % MODULUS, in integer arithmetic."""
+    output_field = models.IntegerField()
+    divisor = 1
+    modulus = None
+
+    def as_sql(self, compiler, connection):
+        lhs, params = compiler.compile(self.lhs)
+        sql = f"({lhs} / {self.divisor})" if self.divisor != 1 else lhs
+        if self.modulus is not None:
+            sql = f"({sql} %% {self.modulus})"
+        return sql, params
+
+
+@PackedDateField.register_lookup
+class PackedYear(PackedDatePart):
+    lookup_name = "year"
+    divisor = 10000
+
+
+@PackedDateField.register_lookup
+class PackedMonth(PackedDatePart):
+    lookup_name = "month"
+    divisor = 100
+    modulus = 100
+
+
+@PackedDateField.register_lookup
+class PackedDay(PackedDatePart):
+    lookup_name = "day"
+    modulus = 100
+
+
+class PackedYearBounds:
+    def year_lookup_bounds(self, connection, year):
+        return year * 10000 + 101, year * 10000 + 1231
+
+
+for lookup in (YearExact, YearGt, YearGte, YearLt, YearLte):
+    PackedYear.register_lookup(type(f"Packed{lookup.__name__}", (PackedYearBounds, lookup), {}))
@@ -0,0 +1,48 @@
+# Governorate names by the two-digit code in positions 8-9 of a national ID
+_GOVERNORATE_CODES = {
+    1: "Cairo",
+    2: "Alexandria",
+    3: "Port Said",
+    4: "Suez",
+    11: "Damietta",
+    12: "Dakahlia",
+    13: "Sharqia",
+    14: "Qalyubia",
+    15: "Kafr El Sheikh",
+    16: "Gharbia",
+    17: "Monufia",
+    18: "Beheira",
+    19: "Ismailia",
+    21: "Giza",
+    22: "Beni Suef",
+    23: "Fayoum",
+    24: "Minya",
+    25: "Asyut",
+    26: "Sohag",
+    27: "Qena",
+    28: "Aswan",
+    29: "Luxor",
+    31: "Red Sea",
+    32: "New Valley",
+    33: "Matrouh",
+    34: "North Sinai",
+    35: "South Sinai",
+    88: "Outside Egypt",
+}
+
+# Static table indexed by code (0 to 99); None marks codes that are not assigned
+GOVERNORATES = tuple(_GOVERNORATE_CODES.get(code) for code in range(100))
+
+# Choices for model fields storing governorate names
+GOVERNORATE_CHOICES = [(name, name) for name in _GOVERNORATE_CODES.values()]
+
+# Weights applied to the first 13 digits when computing the check digit
+CHECK_DIGIT_WEIGHTS = (2, 7, 6, 5, 4, 3, 2, 7, 6, 5, 4, 3, 2)
+
+
+def check_digit(national_id):
+    """
+    Returns the expected check digit (weighted modulo 11) for the first 13 digits of a national ID.
+    """
+    total = sum(int(digit) * weight for digit, weight in zip(national_id, CHECK_DIGIT_WEIGHTS))
+    return (11 - total % 11) % 10
@@ -1,12 +1,30 @@
 import re
 import logging
-from datetime import datetime
 
+from .birthdates import CENTURY_BASE_YEAR, INVALID_DAY, INVALID_LEAP_DAY, birth_ordinal, today_ordinal
+from .governorates import GOVERNORATES, check_digit
+from .logging_utils import RateLimitedLogger, mask_national_id
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+
+logger = logging.getLogger(__name__)
+# Invalid IDs come from clients, so their log records are rate limited
+error_logger = RateLimitedLogger(logger)
+
+# Compiled at import rather than on the first call. [0-9] rather than \d, which
+# also matches other scripts' digits, and fullmatch rather than $, which also
+# matches before a trailing newline
+_FORMAT = re.compile(r'[0-9]{14}')
+
+
+def _invalid(national_id, error_message):
+    """Logs a rejected national ID (masked) and returns the validation failure."""
+    if logger.isEnabledFor(logging.ERROR):
+        masked_id = mask_national_id(national_id)
+        error_logger.error(
+            "Rejected National ID %s: %s", masked_id, error_message,
+            extra={"national_id": masked_id, "validation_error": error_message},
+        )
+    return False, error_message
 
 def is_leap_year(year):
     """Returns True if the year is a leap year."""
@@ -16,65 +34,57 @@ def validate_national_id(national_id, current_date=None):
     """
     Validates the national ID format and its date of birth component.
     """
-    logging.info(f"Validating National ID: {national_id}")
-
-    if current_date is None:
-        current_date = datetime.now()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Validating National ID: %s", mask_national_id(national_id))
 
     # Check if the ID is exactly 14 digits
-    if not re.match(r'^\d{14}$', national_id):
-        logging.error("Invalid format: National ID must be 14 digits.")
-        return False, "Invalid format: National ID must be 14 digits."
+    if not _FORMAT.fullmatch(national_id):
+        return _invalid(national_id, "Invalid format: National ID must be 14 digits.")
 
     # Check if the first digit is either 2 or 3
-    if national_id[0] not in ['2', '3']:
-        logging.error("Invalid first digit in National ID. It must be 2 or 3.")
-        return False, "Invalid first digit in National ID. It must be 2 or 3."
+    century_digit = national_id[0]
+    if century_digit not in CENTURY_BASE_YEAR:
+        return _invalid(national_id, "Invalid first digit in National ID. It must be 2 or 3.")
 
-    # Extract components from the ID
-    birth_year = int(national_id[1:3])  # YY
-    month = int(national_id[3:5])  # MM
-    day = int(national_id[5:7])    # DD
-    gender_digit = int(national_id[12])  # 13th digit (odd for male, even for female)
+    # Extract components from the ID (YYMMDD)
+    birth_year, month_day = divmod(int(national_id[1:7]), 10000)
+    month, day = divmod(month_day, 100)
 
-    # Adjust the birth year based on the first digit
-    if national_id[0] == '2':  # Born in the 1990s
-        full_birth_year = 1900 + birth_year
-    else:  # Born in the 2000s
-        full_birth_year = 2000 + birth_year
-  
     # Validate month (1 to 12)
     if month < 1 or month > 12:
-        logging.error("Invalid month in National ID.")
-        return False, "Invalid month in National ID."
+        return _invalid(national_id, "Invalid month in National ID.")
+
+    # Validate the day against the month and leap years in a single table lookup
+    birth_date = birth_ordinal(century_digit, birth_year, month, day) if day <= 31 else INVALID_DAY
+    if birth_date == INVALID_DAY:
+        return _invalid(national_id, "Invalid day in National ID.")
+    if birth_date == INVALID_LEAP_DAY:
+        return _invalid(national_id, "Invalid day in National ID (February 29 on a non-leap year).")
 
-    # Validate day (1 to 31) and handle month-specific days
-    if day < 1 or (month == 2 and day > 29) or (month in [4, 6, 9, 11] and day > 30) or (month not in [2, 4, 6, 9, 11] and day > 31):
-        logging.error("Invalid day in National ID.")
-        return False, "Invalid day in National ID."
+    # Validate the governorate code (digits 8-9)
+    if GOVERNORATES[int(national_id[7:9])] is None:
+        return _invalid(national_id, "Invalid governorate code in National ID.")
 
-    # Handle leap year for February 29
-    if month == 2 and day == 29:
-        if not is_leap_year(full_birth_year):  # Check leap year based on full birth year
-            logging.error("Invalid day in National ID (February 29 on a non-leap year).")
-            return False, "Invalid day in National ID (February 29 on a non-leap year)."
+    # Validate the check digit (digit 14)
+    if int(national_id[13]) != check_digit(national_id):
+        return _invalid(national_id, "Invalid check digit in National ID.")
 
     # Validate gender (odd for male, even for female)
-    gender = "female" if gender_digit % 2 == 0 else "male"
-    logging.info(f"Gender: {gender}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Gender: %s", "female" if int(national_id[12]) % 2 == 0 else "male")
 
     # Validate if the year is in the future
-    birth_date = datetime(full_birth_year, month, day)
-    if birth_date > current_date:
-        logging.error(f"Invalid year: Birth year is in the future. Birth Date: {birth_date}, Current Date: {current_date}")
-        return False, "Invalid year: Birth year is in the future."
+    current_ordinal = today_ordinal() if current_date is None else current_date.toordinal()
+    if birth_date > current_ordinal:
+        return _invalid(national_id, "Invalid year: Birth year is in the future.")
 
-    logging.info("National ID is valid.")
+    logger.debug("National ID is valid.")
     return True, None
   
 def extract_info(national_id):
     """
-    Extracts information like birth year, month, day, and gender from a valid national ID.
+    Extracts information like birth year, month, day, gender, governorate and
+    serial number from a valid national ID.
     """
 
     # Extract components
@@ -92,10 +102,17 @@ def extract_info(national_id):
     gender_digit = int(national_id[12])
     gender = "female" if gender_digit % 2 == 0 else "male"
 
+    # Governorate code (digits 8-9) and serial number (digits 10-13)
+    governorate_code = int(national_id[7:9])
+
     # Return extracted info as a dictionary
     return {
         "birth_year": full_birth_year,
         "birth_month": month,
         "birth_day": day,
-        "gender": gender
+        "gender": gender,
+        "governorate_code": governorate_code,
+        "governorate": GOVERNORATES[governorate_code],
+        "serial": national_id[9:13],
+        "check_digit": int(national_id[13]),
     }
@@ -0,0 +1,212 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.dispatch import receiver
+from .models import APILog
+
+
+logger = logging.getLogger(__name__)
+
+
+class APILogPipeline:
+    """
+    Queues APILog records in memory and writes them with `bulk_create` from a
+    background thread, once `batch_size` records are waiting or `flush_interval`
+    seconds have passed. The queue is bounded: when it is full, `submit` waits
+    at most `put_timeout` seconds and then drops the record, and `submit_many`
+    waits at most `put_timeout` seconds for the whole batch.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=1.0, max_queue_size=10000, put_timeout=0.05):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.put_timeout = put_timeout
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(max_queue_size)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._registered = False
+        self._start_lock = threading.Lock()
+
+    def submit(self, ip_address, national_id, start=True, wait=True):
+        """
+        Queues one API call record, starting the writer thread unless `start` is
+        False (the caller then flushes explicitly). When the queue is full, waits
+        up to `put_timeout` seconds (not at all if `wait` is False, e.g. on an event
+        loop) and returns False if the record had to be dropped.
+        """
+        if start:
+            self.start()
+        try:
+            self._queue.put(
+                APILog(ip_address=ip_address, national_id=national_id),
+                timeout=self.put_timeout if wait else 0,
+            )
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def submit_many(self, ip_address, national_ids, start=True):
+        """
+        Queues one API call record per national ID, starting the writer thread
+        unless `start` is False. When the queue is full, waits up to `put_timeout`
+        seconds in total for the batch, not per record, then drops every record
+        that does not fit. Returns the number of records queued.
+        """
+        if start:
+            self.start()
+        deadline = time.monotonic() + self.put_timeout
+        queued = 0
+        for national_id in national_ids:
+            try:
+                self._queue.put(
+                    APILog(ip_address=ip_address, national_id=national_id),
+                    timeout=max(deadline - time.monotonic(), 0),
+                )
+            except queue.Full:
+                self.dropped += 1
+            else:
+                queued += 1
+        return queued
+
+    def start(self):
+        """
+        Starts the writer thread in this process (again after a fork).
+        """
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():  # pragma: no cover (started by another thread)
+                return
+            if self._pid is not None:
+                # Forked from a process that had already started the pipeline:
+                # its queued records belong to the parent
+                self._queue = queue.Queue(self.max_queue_size)
+            if not self._registered:
+                atexit.register(self.stop)
+                self._registered = True
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="api-log-pipeline", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def stop(self, timeout=5.0):
+        """
+        Stops the writer thread after it has written every queued record.
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            self._stopping.set()
+            self._thread.join(timeout)
+            self._thread = None
+            self._pid = None
+        self.flush()
+
+    def flush(self):
+        """
+        Writes every queued record from the calling thread.
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            APILog.objects.bulk_create(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to write %d API log records.", len(batch))
+        else:
+            self.written += len(batch)
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size and not self._stopping.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+                    except queue.Empty:
+                        continue
+                if batch:
+                    self._write(batch)
+            self.flush()
+        finally:
+            connection.close()
+
+
+_pipeline = None
+
+
+def get_api_log_pipeline():
+    """
+    Returns the process-wide pipeline configured by NATIONAL_ID_API_LOG_PIPELINE,
+    or None when API calls are logged synchronously.
+    """
+    global _pipeline
+    if _pipeline is None:
+        options = getattr(settings, "NATIONAL_ID_API_LOG_PIPELINE", {})
+        if not options.get("ENABLED", False):
+            return None
+        _pipeline = APILogPipeline(
+            batch_size=options.get("BATCH_SIZE", 500),
+            flush_interval=options.get("FLUSH_INTERVAL", 1.0),
+            max_queue_size=options.get("MAX_QUEUE_SIZE", 10000),
+            put_timeout=options.get("PUT_TIMEOUT", 0.05),
+        )
+    return _pipeline
+
+
+def log_api_calls(ip_address, national_ids):
+    """
+    Logs one API call per national ID, through the pipeline when it is enabled
+    and with a single `bulk_create` otherwise.
+    """
+    pipeline = get_api_log_pipeline()
+    if pipeline is None:
+        APILog.objects.bulk_create([APILog(ip_address=ip_address, national_id=national_id) for national_id in national_ids])
+        return
+    pipeline.submit_many(ip_address, national_ids)
+
+
+async def alog_api_call(ip_address, national_id):
+    """
+    Async version of `log_api_calls` for a single API call; never blocks the event loop.
+    """
+    pipeline = get_api_log_pipeline()
+    if pipeline is None:
+        await APILog.objects.acreate(ip_address=ip_address, national_id=national_id)
+    else:
+        pipeline.submit(ip_address, national_id, wait=False)
+
+
+@receiver(setting_changed)
+def _reset_pipeline(setting, **kwargs):
+    global _pipeline
+    if setting == "NATIONAL_ID_API_LOG_PIPELINE":
+        if _pipeline is not None:
+            _pipeline.stop()
+        _pipeline = None
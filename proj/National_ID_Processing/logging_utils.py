@@ -0,0 +1,71 @@
+import logging
+import os
+import time
+
+
+# Number of trailing digits of a national ID left visible in log records
+# (0 masks the whole ID, 14 logs it unmasked)
+MASK_VISIBLE_DIGITS = int(os.environ.get("NATIONAL_ID_LOG_VISIBLE_DIGITS", 4))
+
+
+def configure(mask_visible_digits=None):
+    """
+    Overrides the masking configuration read from the environment at import time.
+    """
+    global MASK_VISIBLE_DIGITS
+    if mask_visible_digits is not None:
+        MASK_VISIBLE_DIGITS = mask_visible_digits
+
+
+def mask_national_id(national_id, visible_digits=None):
+    """
+    Masks a national ID for logging, keeping only its last `visible_digits` characters.
+    """
+    if visible_digits is None:
+        visible_digits = MASK_VISIBLE_DIGITS
+    if not isinstance(national_id, str):
+        return repr(national_id)
+
+    hidden = max(len(national_id) - visible_digits, 0)
+    return "*" * hidden + national_id[hidden:]
+
+
+class RateLimitedLogger:
+    """
+    Wraps a logger so that at most `max_records` records are emitted per `interval`
+    seconds. Records over the limit are dropped and counted; the count is reported
+    on the first record of the next interval.
+    """
+
+    def __init__(self, logger, max_records=10, interval=60.0):
+        self.logger = logger
+        self.max_records = max_records
+        self.interval = interval
+        self.window_start = 0.0
+        self.emitted = 0
+        self.suppressed = 0
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+
+        now = time.monotonic()
+        if now - self.window_start >= self.interval:
+            if self.suppressed:
+                self.logger.log(level, "%d similar log records were suppressed.", self.suppressed)
+            self.window_start = now
+            self.emitted = 0
+            self.suppressed = 0
+
+        if self.emitted >= self.max_records:
+            self.suppressed += 1
+            return
+
+        self.emitted += 1
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self.log(logging.ERROR, msg, *args, **kwargs)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from National_ID_Processing.storage import (
+    COMPACT_COLUMNS_MIGRATION, COMPACT_STORAGE_MIGRATION, DEFAULT_CHUNK_SIZE, backfill_compact_columns,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the integer national ID and packed birth date columns added by migration "
+        f"{COMPACT_COLUMNS_MIGRATION[1]}, one chunk of rows per transaction, so that "
+        f"{COMPACT_STORAGE_MIGRATION[1]} only has to drop the old columns. Safe to "
+        "interrupt and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Primary keys filled per transaction.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database to backfill (default: default).")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        using = options["database"]
+        loader = MigrationLoader(connections[using])
+        if COMPACT_STORAGE_MIGRATION in loader.applied_migrations:
+            self.stdout.write("The compact storage migration is already applied; nothing to backfill.")
+            return
+        if COMPACT_COLUMNS_MIGRATION not in loader.applied_migrations:
+            raise CommandError(f"Apply the compact columns first: manage.py migrate {' '.join(COMPACT_COLUMNS_MIGRATION)}")
+
+        # The model as of the migration, with both the old and the compact columns
+        apps = loader.project_state(COMPACT_COLUMNS_MIGRATION).apps
+        model = apps.get_model("National_ID_Processing", "EGYNationalIDInfo")
+        total = 0
+        for total in backfill_compact_columns(model, chunk_size=options["chunk_size"], using=using):
+            self.stdout.write(f"Backfilled {total} rows.")
+        self.stdout.write(f"Done: {total} rows backfilled.")
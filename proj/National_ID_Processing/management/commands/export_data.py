@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from National_ID_Processing.exports import DEFAULT_CHUNK_SIZE, EXPORTS, FORMATS, ExportStream, export_queryset
+
+
+# Filter options of every dataset
+FILTERS = sorted({parameter for export in EXPORTS.values() for parameter in export.filters})
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports every stored row of a dataset (national-ids or api-logs) to a CSV or NDJSON "
+        "file in primary key order, reading a chunk of rows at a time. Interrupted exports "
+        "can be continued with --after and the resume token it reports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=EXPORTS)
+        parser.add_argument("output", help="Output file (.csv or .ndjson), or - for standard output.")
+        parser.add_argument("--format", choices=FORMATS, help="Output format (default: from the output file extension).")
+        parser.add_argument("--after", help="Resume token: export only rows after this id.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows read from the database at a time.")
+        for parameter in FILTERS:
+            parser.add_argument(f"--{parameter.replace('_', '-')}", dest=parameter, help="Filter (see the export API).")
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options["dataset"]]
+        output = options["output"]
+        file_format = options["format"] or os.path.splitext(output)[1].lstrip(".").lower()
+        if file_format not in FORMATS:
+            raise CommandError("Pass --format, or an output file ending in .csv or .ndjson.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        unsupported = [parameter for parameter in FILTERS if options[parameter] and parameter not in export.filters]
+        if unsupported:
+            raise CommandError(f"{options['dataset']} cannot be filtered by {', '.join(unsupported)}.")
+
+        try:
+            queryset = export_queryset(export, options, after=options["after"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        stream = ExportStream(queryset, export.fields, file_format, chunk_size=options["chunk_size"])
+        try:
+            if output == "-":
+                for chunk in stream:
+                    self.stdout.write(chunk.decode(), ending="")
+            else:
+                with open(output, "wb") as output_file:
+                    for chunk in stream:
+                        output_file.write(chunk)
+        finally:
+            # Reported even when interrupted, so the export can be continued with --after
+            self.stderr.write(f"Exported {stream.rows} rows; resume token (last id): {stream.last_pk}.")
@@ -0,0 +1,185 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from National_ID_Processing.executor import ValidationExecutor, validate_many
+from National_ID_Processing.helpers import extract_info
+from National_ID_Processing.models import EGYNationalIDInfo
+from National_ID_Processing.stats import INFO_BUCKET_FIELDS, add_to_stats, bucket_counts, stats_enabled
+
+
+OUTPUT_FIELDS = ["national_id", "valid", "error", "birth_year", "birth_month", "birth_day", "gender", "governorate"]
+
+
+def validate_chunk(national_ids, executor=None):
+    """
+    Validates a chunk of national IDs, through `executor` when given and the
+    shared validation executor otherwise, and returns one output row per ID.
+    """
+    results = executor.validate_many(national_ids) if executor is not None else validate_many(national_ids)
+    rows = []
+    for national_id, (is_valid, error_message) in zip(national_ids, results):
+        row = {"national_id": national_id, "valid": is_valid, "error": error_message}
+        if is_valid:
+            info = extract_info(national_id)
+            row.update({field: info[field] for field in OUTPUT_FIELDS[3:]})
+        rows.append(row)
+    return rows
+
+
+def read_csv(path, column):
+    with open(path, newline="", encoding="utf-8") as input_file:
+        reader = csv.DictReader(input_file)
+        if column not in (reader.fieldnames or []):
+            raise CommandError(f"Column '{column}' not found in {path}.")
+        for row in reader:
+            yield row[column]
+
+
+def read_ndjson(path, column):
+    with open(path, encoding="utf-8") as input_file:
+        for line in input_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                # Reported as an invalid ID rather than aborting the whole file
+                yield line
+                continue
+            yield item.get(column) if isinstance(item, dict) else item
+
+
+def read_parquet(path, column):
+    try:
+        import pyarrow.parquet
+    except ImportError:
+        raise CommandError("Reading Parquet files requires the pyarrow package.")
+    for batch in pyarrow.parquet.ParquetFile(path).iter_batches(columns=[column]):
+        yield from batch.column(0).to_pylist()
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson, "parquet": read_parquet}
+
+
+class Command(BaseCommand):
+    help = (
+        "Validates the national IDs of a CSV, NDJSON or Parquet file in chunks, writes one "
+        "result per ID to an output file and upserts the valid ones into EGYNationalIDInfo. "
+        "Progress is checkpointed after every chunk so an interrupted run can be resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="File of national IDs (.csv, .ndjson/.jsonl or .parquet).")
+        parser.add_argument("output", help="Results file; CSV if it ends in .csv, NDJSON otherwise.")
+        parser.add_argument("--format", choices=sorted(READERS), help="Input format (default: from the extension).")
+        parser.add_argument("--column", default="national_id", help="CSV/Parquet column or NDJSON key holding the ID.")
+        parser.add_argument("--chunk-size", type=int, default=10000, help="IDs validated and upserted per chunk.")
+        parser.add_argument(
+            "--workers", type=int,
+            help="Processes validating each chunk in parallel (default: NATIONAL_ID_VALIDATION_EXECUTOR; 1 for in-process).",
+        )
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: OUTPUT.checkpoint).")
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over.")
+
+    def handle(self, *args, **options):
+        input_format = options["format"] or self.detect_format(options["input"])
+        checkpoint_path = options["checkpoint"] or options["output"] + ".checkpoint"
+        chunk_size = options["chunk_size"]
+
+        checkpoint = {"offset": 0, "output_position": 0}
+        if not options["restart"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            self.stdout.write(f"Resuming after {checkpoint['offset']} IDs.")
+
+        national_ids = islice(READERS[input_format](options["input"], options["column"]), checkpoint["offset"], None)
+        chunks = iter(lambda: list(islice(national_ids, chunk_size)), [])
+
+        # Drop output written after the last checkpoint, then append
+        mode = "r+" if checkpoint["offset"] and os.path.exists(options["output"]) else "w"
+        with open(options["output"], mode, newline="", encoding="utf-8") as output_file:
+            output_file.truncate(checkpoint["output_position"])
+            output_file.seek(checkpoint["output_position"])
+            writer = self.make_writer(output_file, options["output"], write_header=checkpoint["offset"] == 0)
+
+            offset, valid_count = checkpoint["offset"], 0
+            for rows in self.validate(chunks, options["workers"]):
+                writer(rows)
+                output_file.flush()
+                valid_count += self.upsert(rows)
+                offset += len(rows)
+                self.save_checkpoint(checkpoint_path, {"offset": offset, "output_position": output_file.tell()})
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {offset - checkpoint['offset']} IDs ({valid_count} valid); {offset} in total."
+        ))
+
+    def detect_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        formats = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+        if extension not in formats:
+            raise CommandError(f"Cannot detect the format of {path}; use --format.")
+        return formats[extension]
+
+    def validate(self, chunks, workers):
+        """
+        Yields validated chunks in input order. Without --workers, chunks go through
+        the shared validation executor (NATIONAL_ID_VALIDATION_EXECUTOR).
+        """
+        if workers is None:
+            yield from map(validate_chunk, chunks)
+            return
+
+        # Every chunk is spread over the workers, however small it is
+        executor = ValidationExecutor(workers=workers, inline_threshold=0, min_chunk_size=1)
+        try:
+            for chunk in chunks:
+                yield validate_chunk(chunk, executor)
+        finally:
+            executor.shutdown()
+
+    def make_writer(self, output_file, path, write_header):
+        if path.lower().endswith(".csv"):
+            writer = csv.DictWriter(output_file, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+            if write_header:
+                writer.writeheader()
+            return writer.writerows
+
+        def write_ndjson(rows):
+            output_file.writelines(json.dumps(row) + "\n" for row in rows)
+        return write_ndjson
+
+    def upsert(self, rows):
+        """
+        Inserts or updates the valid rows of a chunk in one bulk statement, and updates
+        the statistics of the inserted and overwritten rows.
+        """
+        infos = {row["national_id"]: EGYNationalIDInfo.from_info(row["national_id"], row) for row in rows if row["valid"]}
+        with transaction.atomic():
+            # Buckets of the rows about to be overwritten, to move them in the statistics
+            existing = {
+                row[0]: row[1:] for row in EGYNationalIDInfo.objects.filter(national_id__in=list(infos))
+                .values_list("national_id", *INFO_BUCKET_FIELDS)
+            }
+            EGYNationalIDInfo.objects.bulk_create(
+                infos.values(),
+                update_conflicts=True,
+                unique_fields=["national_id"],
+                update_fields=["birth_date", "gender", "governorate"],
+            )
+            if stats_enabled():
+                counts = bucket_counts(infos.values())
+                counts.subtract(existing.values())
+                add_to_stats(counts)
+        return sum(row["valid"] for row in rows)
+
+    def save_checkpoint(self, path, checkpoint):
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temporary_path, path)
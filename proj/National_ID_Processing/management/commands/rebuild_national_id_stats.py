@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from National_ID_Processing.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the national ID statistics (EGYNationalIDInfoStats) from every stored "
+        "national ID with one GROUP BY query, replacing the stored buckets atomically. "
+        "Run it after enabling NATIONAL_ID_STATS or changing rows outside the ORM."
+    )
+
+    def handle(self, *args, **options):
+        buckets = rebuild_stats()
+        self.stdout.write(f"Rebuilt {buckets} statistics buckets.")
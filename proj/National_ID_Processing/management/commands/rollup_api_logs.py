@@ -0,0 +1,68 @@
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from National_ID_Processing.models import APILog, APILogDailyRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rolls APILog rows older than --keep-days up into daily per-IP call counts "
+        "(APILogDailyRollup) and deletes them, one bounded chunk per transaction. "
+        "Safe to interrupt and re-run: every chunk is counted and deleted atomically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-days", type=int, default=90, help="Days of APILog rows to keep (default: 90).")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows rolled up and deleted per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would be rolled up.")
+
+    def handle(self, *args, **options):
+        if options["keep_days"] < 0 or options["chunk_size"] < 1:
+            raise CommandError("--keep-days must be at least 0 and --chunk-size at least 1.")
+
+        # Whole UTC days only, so a day is never split between rollup runs
+        today = datetime.now(timezone.utc).date()
+        cutoff = datetime.combine(today - timedelta(days=options["keep_days"]), time.min, tzinfo=timezone.utc)
+        old_logs = APILog.objects.filter(timestamp__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{old_logs.count()} API log rows older than {cutoff:%Y-%m-%d} would be rolled up.")
+            return
+
+        total = 0
+        while True:
+            rolled_up = self.rollup_chunk(old_logs, options["chunk_size"])
+            if not rolled_up:
+                break
+            total += rolled_up
+            self.stdout.write(f"Rolled up {total} rows.")
+        self.stdout.write(self.style.SUCCESS(f"Rolled up and deleted {total} API log rows older than {cutoff:%Y-%m-%d}."))
+
+    @transaction.atomic
+    def rollup_chunk(self, old_logs, chunk_size):
+        """
+        Adds the lowest `chunk_size` old rows to the daily rollups and deletes
+        them. Returns the number of rows rolled up.
+        """
+        rows = list(old_logs.order_by("pk").values_list("pk", "timestamp", "ip_address")[:chunk_size])
+        if not rows:
+            return 0
+
+        calls = Counter((timestamp.astimezone(timezone.utc).date(), ip_address) for pk, timestamp, ip_address in rows)
+        rollups = APILogDailyRollup.objects.select_for_update().filter(
+            day__in={day for day, ip_address in calls}, ip_address__in={ip_address for day, ip_address in calls},
+        )
+        existing = {(rollup.day, rollup.ip_address): rollup for rollup in rollups if (rollup.day, rollup.ip_address) in calls}
+        for key, rollup in existing.items():
+            rollup.calls += calls[key]
+        APILogDailyRollup.objects.bulk_update(existing.values(), ["calls"])
+        APILogDailyRollup.objects.bulk_create([
+            APILogDailyRollup(day=day, ip_address=ip_address, calls=count)
+            for (day, ip_address), count in calls.items() if (day, ip_address) not in existing
+        ])
+
+        # Exactly the rows read above: the lowest old rows up to the last primary key
+        old_logs.filter(pk__lte=rows[-1][0]).delete()
+        return len(rows)
@@ -0,0 +1,163 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from .errors import ERROR_MESSAGES
+
+
+# Upper bounds (in seconds) of the stage duration histogram buckets
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+# Label of every validation outcome, indexed like ERROR_MESSAGES
+ERROR_TYPES = (
+    "valid",
+    "invalid_format",
+    "invalid_century",
+    "invalid_month",
+    "invalid_day",
+    "invalid_leap_day",
+    "invalid_governorate",
+    "invalid_check_digit",
+    "future_birth_date",
+)
+_ERROR_TYPES = dict(zip(ERROR_MESSAGES, ERROR_TYPES))
+
+_DISABLED = nullcontext()
+
+
+class Histogram:
+    """
+    Histogram of durations: the number of observations in each bucket (plus
+    +Inf) and their sum. Counts are cumulated only when rendered.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _Timer:
+    """Context manager adding the time spent in its block to a histogram."""
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class Metrics:
+    """
+    Per-process request metrics: a duration histogram per (view, stage) and a
+    counter of validation outcomes per (view, error type).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._histograms = {}
+        self._validations = Counter()
+        self._lock = threading.Lock()
+
+    def timed(self, view, stage):
+        """Returns a context manager timing one `stage` of a `view` request."""
+        histogram = self._histograms.get((view, stage))
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault((view, stage), Histogram(self.buckets))
+        return _Timer(histogram)
+
+    def count_validations(self, view, error_messages):
+        """Counts validation outcomes, given the error message of each (None if valid)."""
+        outcomes = Counter(error_messages)
+        with self._lock:
+            for error_message, count in outcomes.items():
+                self._validations[view, _ERROR_TYPES.get(error_message, "invalid_format")] += count
+
+    def render(self):
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP national_id_stage_seconds Time spent in each stage of a request.",
+            "# TYPE national_id_stage_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            validations = sorted(self._validations.items())
+        for (view, stage), histogram in histograms:
+            with histogram._lock:
+                counts, total = list(histogram.counts), histogram.sum
+            labels = f'view="{view}",stage="{stage}"'
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'national_id_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"national_id_stage_seconds_sum{{{labels}}} {total}")
+            lines.append(f"national_id_stage_seconds_count{{{labels}}} {cumulative}")
+
+        lines += [
+            "# HELP national_id_validations_total National IDs validated, by outcome.",
+            "# TYPE national_id_validations_total counter",
+        ]
+        for (view, error_type), count in validations:
+            lines.append(f'national_id_validations_total{{view="{view}",result="{error_type}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+_metrics = None
+_configured = False
+
+
+def get_metrics():
+    """
+    Returns the process-wide metrics configured by NATIONAL_ID_METRICS, or None
+    when they are disabled.
+    """
+    global _metrics, _configured
+    if not _configured:
+        options = getattr(settings, "NATIONAL_ID_METRICS", {})
+        _metrics = Metrics(options.get("BUCKETS", DEFAULT_BUCKETS)) if options.get("ENABLED", True) else None
+        _configured = True
+    return _metrics
+
+
+def timed(view, stage):
+    """
+    Returns a context manager timing one `stage` of a `view` request, or a
+    no-op one when metrics are disabled.
+    """
+    metrics = get_metrics()
+    return _DISABLED if metrics is None else metrics.timed(view, stage)
+
+
+def count_validations(view, error_messages):
+    """Counts validation outcomes (see `Metrics.count_validations`) when metrics are enabled."""
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.count_validations(view, error_messages)
+
+
+@receiver(setting_changed)
+def _reset_metrics(setting, **kwargs):
+    global _metrics, _configured
+    if setting == "NATIONAL_ID_METRICS":
+        _metrics = None
+        _configured = False
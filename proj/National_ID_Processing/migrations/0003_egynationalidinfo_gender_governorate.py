@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-17 18:45
+
+from django.db import migrations, models
+
+
+def backfill_gender_and_governorate(apps, schema_editor):
+    """Fills the new columns of existing rows from their national IDs."""
+    from National_ID_Processing.governorates import GOVERNORATES
+
+    EGYNationalIDInfo = apps.get_model('National_ID_Processing', 'EGYNationalIDInfo')
+    for info in EGYNationalIDInfo.objects.only('id', 'national_id').iterator():
+        info.gender = 'female' if int(info.national_id[12]) % 2 == 0 else 'male'
+        info.governorate = GOVERNORATES[int(info.national_id[7:9])] or ''
+        info.save(update_fields=['gender', 'governorate'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('National_ID_Processing', '0002_egynationalidinfo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='egynationalidinfo',
+            name='gender',
+            field=models.CharField(choices=[('male', 'male'), ('female', 'female')], db_index=True, default='', max_length=6),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='egynationalidinfo',
+            name='governorate',
+            field=models.CharField(choices=[('Cairo', 'Cairo'), ('Alexandria', 'Alexandria'), ('Port Said', 'Port Said'), ('Suez', 'Suez'), ('Damietta', 'Damietta'), ('Dakahlia', 'Dakahlia'), ('Sharqia', 'Sharqia'), ('Qalyubia', 'Qalyubia'), ('Kafr El Sheikh', 'Kafr El Sheikh'), ('Gharbia', 'Gharbia'), ('Monufia', 'Monufia'), ('Beheira', 'Beheira'), ('Ismailia', 'Ismailia'), ('Giza', 'Giza'), ('Beni Suef', 'Beni Suef'), ('Fayoum', 'Fayoum'), ('Minya', 'Minya'), ('Asyut', 'Asyut'), ('Sohag', 'Sohag'), ('Qena', 'Qena'), ('Aswan', 'Aswan'), ('Luxor', 'Luxor'), ('Red Sea', 'Red Sea'), ('New Valley', 'New Valley'), ('Matrouh', 'Matrouh'), ('North Sinai', 'North Sinai'), ('South Sinai', 'South Sinai'), ('Outside Egypt', 'Outside Egypt')], db_index=True, default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_gender_and_governorate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('National_ID_Processing', '0003_egynationalidinfo_gender_governorate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APILogDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('ip_address', models.GenericIPAddressField()),
+                ('calls', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='apilog',
+            index=models.Index(fields=['national_id', 'timestamp'], name='apilog_national_id_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apilog',
+            index=models.Index(fields=['timestamp'], name='apilog_timestamp_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='apilogdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'ip_address'), name='apilog_rollup_day_ip_unique'),
+        ),
+    ]
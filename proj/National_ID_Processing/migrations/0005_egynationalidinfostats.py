@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:31
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_stats(apps, schema_editor):
+    """Counts the existing rows per bucket."""
+    EGYNationalIDInfo = apps.get_model('National_ID_Processing', 'EGYNationalIDInfo')
+    EGYNationalIDInfoStats = apps.get_model('National_ID_Processing', 'EGYNationalIDInfoStats')
+    fields = ('birth_year', 'birth_month', 'gender', 'governorate')
+    buckets = EGYNationalIDInfo.objects.values(*fields).annotate(count=Count('pk')).order_by()
+    EGYNationalIDInfoStats.objects.bulk_create(
+        [EGYNationalIDInfoStats(century=bucket['birth_year'] // 100, **bucket) for bucket in buckets.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('National_ID_Processing', '0004_apilog_indexes_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EGYNationalIDInfoStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('century', models.PositiveSmallIntegerField(help_text='Birth century: 19 for 19xx, 20 for 20xx.')),
+                ('birth_year', models.IntegerField()),
+                ('birth_month', models.IntegerField()),
+                ('gender', models.CharField(choices=[('male', 'male'), ('female', 'female')], max_length=6)),
+                ('governorate', models.CharField(choices=[('Cairo', 'Cairo'), ('Alexandria', 'Alexandria'), ('Port Said', 'Port Said'), ('Suez', 'Suez'), ('Damietta', 'Damietta'), ('Dakahlia', 'Dakahlia'), ('Sharqia', 'Sharqia'), ('Qalyubia', 'Qalyubia'), ('Kafr El Sheikh', 'Kafr El Sheikh'), ('Gharbia', 'Gharbia'), ('Monufia', 'Monufia'), ('Beheira', 'Beheira'), ('Ismailia', 'Ismailia'), ('Giza', 'Giza'), ('Beni Suef', 'Beni Suef'), ('Fayoum', 'Fayoum'), ('Minya', 'Minya'), ('Asyut', 'Asyut'), ('Sohag', 'Sohag'), ('Qena', 'Qena'), ('Aswan', 'Aswan'), ('Luxor', 'Luxor'), ('Red Sea', 'Red Sea'), ('New Valley', 'New Valley'), ('Matrouh', 'Matrouh'), ('North Sinai', 'North Sinai'), ('South Sinai', 'South Sinai'), ('Outside Egypt', 'Outside Egypt')], max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'national ID statistics bucket',
+                'constraints': [models.UniqueConstraint(fields=('birth_year', 'birth_month', 'gender', 'governorate'), name='egyinfo_stats_bucket_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:05
+
+import National_ID_Processing.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    First step of the compact storage of EGYNationalIDInfo: adds the integer
+    national ID and packed birth date columns next to the old ones. Fill them
+    with `manage.py backfill_compact_storage` before applying 0007, or let 0007
+    fill them.
+    """
+
+    dependencies = [
+        ('National_ID_Processing', '0005_egynationalidinfostats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='egynationalidinfo',
+            name='compact_national_id',
+            field=National_ID_Processing.fields.NationalIDField(null=True),
+        ),
+        migrations.AddField(
+            model_name='egynationalidinfo',
+            name='birth_date',
+            field=National_ID_Processing.fields.PackedDateField(null=True),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:05
+
+import National_ID_Processing.fields
+from django.db import migrations, models
+
+
+def backfill_compact_columns(apps, schema_editor):
+    """Fills the compact columns of the rows the backfill command has not filled."""
+    from National_ID_Processing.storage import backfill_compact_columns
+
+    EGYNationalIDInfo = apps.get_model('National_ID_Processing', 'EGYNationalIDInfo')
+    for _ in backfill_compact_columns(EGYNationalIDInfo, using=schema_editor.connection.alias):
+        pass
+
+
+def restore_old_columns(apps, schema_editor):
+    """Fills the old columns back from the compact ones."""
+    from National_ID_Processing.storage import restore_old_columns
+
+    EGYNationalIDInfo = apps.get_model('National_ID_Processing', 'EGYNationalIDInfo')
+    restore_old_columns(EGYNationalIDInfo, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+    """
+    Second step of the compact storage of EGYNationalIDInfo: fills the compact
+    columns of any remaining rows, drops the old columns and makes the integer
+    national ID the unique one.
+    """
+
+    dependencies = [
+        ('National_ID_Processing', '0006_egynationalidinfo_compact_columns'),
+    ]
+
+    operations = [
+        # Nullable, so that they can be added back empty when reverting
+        migrations.AlterField(
+            model_name='egynationalidinfo',
+            name='national_id',
+            field=models.CharField(max_length=14, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='egynationalidinfo',
+            name='birth_year',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='egynationalidinfo',
+            name='birth_month',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='egynationalidinfo',
+            name='birth_day',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.RunPython(backfill_compact_columns, restore_old_columns),
+        migrations.RemoveField(
+            model_name='egynationalidinfo',
+            name='national_id',
+        ),
+        migrations.RemoveField(
+            model_name='egynationalidinfo',
+            name='birth_year',
+        ),
+        migrations.RemoveField(
+            model_name='egynationalidinfo',
+            name='birth_month',
+        ),
+        migrations.RemoveField(
+            model_name='egynationalidinfo',
+            name='birth_day',
+        ),
+        migrations.RenameField(
+            model_name='egynationalidinfo',
+            old_name='compact_national_id',
+            new_name='national_id',
+        ),
+        migrations.AlterField(
+            model_name='egynationalidinfo',
+            name='national_id',
+            field=National_ID_Processing.fields.NationalIDField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='egynationalidinfo',
+            name='birth_date',
+            field=National_ID_Processing.fields.PackedDateField(),
+        ),
+    ]
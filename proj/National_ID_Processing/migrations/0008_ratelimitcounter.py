@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('National_ID_Processing', '0007_egynationalidinfo_compact_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('count', models.BigIntegerField(default=0)),
+                ('expires', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
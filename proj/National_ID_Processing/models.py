@@ -1,5 +1,9 @@
 # id_validator/models.py
+from datetime import date
+
 from django.db import models
+from .fields import NationalIDField, PackedDateField
+from .governorates import GOVERNORATE_CHOICES
 
 class APILog(models.Model):
     """
@@ -9,15 +13,95 @@ class APILog(models.Model):
     national_id = models.CharField(max_length=14)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["national_id", "timestamp"], name="apilog_national_id_ts_idx"),
+            models.Index(fields=["timestamp"], name="apilog_timestamp_idx"),
+        ]
+
+
+class APILogDailyRollup(models.Model):
+    """
+    Number of API calls per day and IP address, kept after old APILog rows are
+    deleted by the rollup_api_logs command.
+    """
+    day = models.DateField()
+    ip_address = models.GenericIPAddressField()
+    calls = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "ip_address"], name="apilog_rollup_day_ip_unique"),
+        ]
+
+
+class RateLimitCounter(models.Model):
+    """
+    Hits of one rate limit window, shared by every worker process when the
+    shared cache is a DatabaseCache (see ratelimit.DatabaseCounters).
+    """
+    key = models.CharField(max_length=255, unique=True)
+    count = models.BigIntegerField(default=0)
+    expires = models.DateTimeField(db_index=True)
+
 
 class EGYNationalIDInfo(models.Model):
     """
     Model to store important data extracted from an Egyptian National ID.
+    The national ID is stored as an integer and the birth date as one packed
+    integer column (see fields.py); `birth_year`, `birth_month` and `birth_day`
+    read the parts of the birth date. Migrations 0006 and 0007 convert the
+    original text and three-integer columns, and are reversed by migrating to 0005.
     """
-    national_id = models.CharField(max_length=14, unique=True)
-    birth_year = models.IntegerField()
-    birth_month = models.IntegerField()
-    birth_day = models.IntegerField()
+    national_id = NationalIDField(unique=True)
+    birth_date = PackedDateField()
+    gender = models.CharField(max_length=6, choices=[("male", "male"), ("female", "female")], db_index=True)
+    governorate = models.CharField(max_length=20, choices=GOVERNORATE_CHOICES, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_info(cls, national_id, info):
+        """
+        Builds an unsaved row from the result of `extract_info` (or any mapping
+        with its birth_year, birth_month, birth_day, gender and governorate keys).
+        """
+        return cls(
+            national_id=national_id,
+            birth_date=date(info["birth_year"], info["birth_month"], info["birth_day"]),
+            gender=info["gender"],
+            governorate=info["governorate"],
+        )
+
+    @property
+    def birth_year(self):
+        return self.birth_date.year
+
+    @property
+    def birth_month(self):
+        return self.birth_date.month
+
+    @property
+    def birth_day(self):
+        return self.birth_date.day
+
+
+class EGYNationalIDInfoStats(models.Model):
+    """
+    Number of stored EGYNationalIDInfo rows per birth year, month, gender and
+    governorate, kept up to date as rows are inserted (see stats.py), so that
+    distributions are read from a few thousand buckets instead of the whole table.
+    """
+    century = models.PositiveSmallIntegerField(help_text="Birth century: 19 for 19xx, 20 for 20xx.")
+    birth_year = models.IntegerField()
+    birth_month = models.IntegerField()
+    gender = models.CharField(max_length=6, choices=[("male", "male"), ("female", "female")])
+    governorate = models.CharField(max_length=20, choices=GOVERNORATE_CHOICES)
+    count = models.BigIntegerField(default=0)
 
+    class Meta:
+        verbose_name = "national ID statistics bucket"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["birth_year", "birth_month", "gender", "governorate"], name="egyinfo_stats_bucket_unique",
+            ),
+        ]
@@ -0,0 +1,93 @@
+# id_validator/parsers.py
+import json
+from collections.abc import Sequence
+
+import msgpack
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from .errors import ERROR_MESSAGES, RECORD_SIZE
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON (one JSON value per line) into a list.
+    Blank lines are skipped.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        items = []
+        for line_number, raw_line in enumerate(stream, start=1):
+            line = raw_line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {line_number} - {exc}")
+        return items
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses a MessagePack body, the binary counterpart of JSONParser.
+    """
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
+
+
+class PackedNationalIDs(Sequence):
+    """
+    National IDs packed as concatenated 14-byte ASCII records. Records are
+    sliced from a memoryview of the body and only become strings when read.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer).cast("B")
+        if len(self.buffer) % RECORD_SIZE:
+            raise ValueError(f"Body length must be a multiple of {RECORD_SIZE} bytes.")
+
+    def __len__(self):
+        return len(self.buffer) // RECORD_SIZE
+
+    def __getitem__(self, index):
+        start = range(0, len(self.buffer), RECORD_SIZE)[index]
+        # latin-1 maps every byte, so that non-ASCII records fail the format check
+        return str(self.buffer[start:start + RECORD_SIZE], "latin-1")
+
+    def __iter__(self):
+        # One decode of the whole body, then slices, rather than a decode per record
+        text = str(self.buffer, "latin-1")
+        return (text[start:start + RECORD_SIZE] for start in range(0, len(text), RECORD_SIZE))
+
+    def validate(self):
+        """
+        Validates every record with the vectorized validator, which reads the
+        buffer in place. Returns one `(is_valid, error_message)` tuple per ID.
+        """
+        from .vectorized import validate_national_ids
+
+        return [(code == 0, ERROR_MESSAGES[code]) for code in validate_national_ids(self.buffer).error_code.tolist()]
+
+
+class PackedNationalIDParser(BaseParser):
+    """
+    Parses a body of concatenated 14-byte ASCII national IDs, without
+    separators, into PackedNationalIDs.
+    """
+    media_type = "application/x-packed-national-ids"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return PackedNationalIDs(stream.read() if stream is not None else b"")
+        except ValueError as exc:
+            raise ParseError(str(exc))
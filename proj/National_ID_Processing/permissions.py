@@ -0,0 +1,169 @@
+import hashlib
+import hmac
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_api_key.permissions import HasAPIKey
+from .logging_utils import RateLimitedLogger
+from .result_cache import ResultCache
+
+
+logger = logging.getLogger(__name__)
+error_logger = RateLimitedLogger(logger)
+
+
+def _digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+_api_key_cache = None
+
+
+def get_api_key_cache():
+    """
+    Returns the process-wide cache of verified API keys configured by
+    NATIONAL_ID_API_KEY_CACHE, or None when every request is verified.
+    Entries map a key prefix to the digest of the full key and its expiry date.
+    """
+    global _api_key_cache
+    if _api_key_cache is None:
+        options = getattr(settings, "NATIONAL_ID_API_KEY_CACHE", {})
+        if not options.get("ENABLED", True):
+            return None
+        _api_key_cache = ResultCache(max_size=options.get("MAX_SIZE", 1000), ttl=options.get("TTL", 30))
+    return _api_key_cache
+
+
+def _shared_cache():
+    alias = getattr(settings, "NATIONAL_ID_API_KEY_CACHE", {}).get("SHARED_CACHE_ALIAS", "shared")
+    return caches[alias] if alias else None
+
+
+def _version_key(prefix):
+    # Prefixes come from the request, so they are not used in cache keys as is
+    return f"national-id-api-key:{_digest(prefix)}"
+
+
+def api_key_version(prefix):
+    """
+    Returns the version of the API key `prefix` in the shared cache, which is
+    replaced whenever the key is saved or deleted. Returns "" when no shared
+    cache is configured, and None when the key has no version yet or the shared
+    cache is unavailable.
+    """
+    shared_cache = _shared_cache()
+    if shared_cache is None:
+        return ""
+    try:
+        return shared_cache.get(_version_key(prefix))
+    except Exception:
+        error_logger.error("API key versions could not be read from the shared cache.", exc_info=True)
+        return None
+
+
+def _add_api_key_version(prefix):
+    """Stores a first version of the API key `prefix` in the shared cache."""
+    try:
+        _shared_cache().add(_version_key(prefix), uuid.uuid4().hex, timeout=None)
+    except Exception:
+        error_logger.error("API key versions could not be written to the shared cache.", exc_info=True)
+
+
+def invalidate_api_key(prefix):
+    """
+    Drops the cached verification of the API key `prefix` in this process and,
+    through its version in the shared cache, in every other one. When the shared
+    cache is unavailable, this is logged and other processes keep accepting the
+    key from their caches until its entry expires (NATIONAL_ID_API_KEY_CACHE TTL).
+    """
+    api_key_cache = get_api_key_cache()
+    if api_key_cache is None:
+        return
+    api_key_cache.delete(prefix)
+    shared_cache = _shared_cache()
+    if shared_cache is not None:
+        try:
+            shared_cache.delete(_version_key(prefix))
+        except Exception:
+            error_logger.error(
+                "API key %s could not be invalidated in the shared cache; other processes accept it from "
+                "their caches until it expires there.", prefix, exc_info=True,
+            )
+
+
+class CachedHasAPIKey(HasAPIKey):
+    """
+    HasAPIKey that remembers verified keys in process for a short TTL, so repeat
+    callers skip the database lookup and the key hashing. Only a digest of the key
+    is kept, with the key's version in the shared cache at the time it was
+    verified; a cached key is only accepted while that version is unchanged, so
+    saving or deleting an APIKey (e.g. revoking it in the admin) takes effect in
+    every process at once.
+    """
+
+    def has_permission(self, request, view):
+        key = self.get_key(request)
+        if not key:
+            return False
+        api_key_cache = get_api_key_cache()
+        version = self._cached_version(api_key_cache, key)
+        if version is not None and version == api_key_version(key.partition(".")[0]):
+            return True
+        return self._verify(api_key_cache, key)
+
+    async def ahas_permission(self, request):
+        """
+        Async version of `has_permission` for async views.
+        """
+        key = self.get_key(request)
+        if not key:
+            return False
+        api_key_cache = get_api_key_cache()
+        version = self._cached_version(api_key_cache, key)
+        if version is not None and version == await sync_to_async(api_key_version)(key.partition(".")[0]):
+            return True
+        # The database lookup and the key hashing run off the event loop
+        return await sync_to_async(self._verify)(api_key_cache, key)
+
+    def _cached_version(self, api_key_cache, key):
+        """
+        Returns the version a cached verification of `key` was made at, or None
+        when there is no valid one in this process.
+        """
+        entry = api_key_cache.get(key.partition(".")[0]) if api_key_cache is not None else None
+        if entry is None:
+            return None
+        digest, expiry_date, version = entry
+        if hmac.compare_digest(digest, _digest(key)) and (expiry_date is None or expiry_date > timezone.now()):
+            return version
+        return None
+
+    def _verify(self, api_key_cache, key):
+        # The version is read before the lookup, so that a change made meanwhile
+        # leaves the cached verification stale
+        version = api_key_version(key.partition(".")[0]) if api_key_cache is not None else None
+        try:
+            api_key = self.model.objects.get_from_key(key)
+        except self.model.DoesNotExist:
+            return False
+        if api_key.has_expired:
+            return False
+        if version is not None:
+            api_key_cache.set(api_key.prefix, (_digest(key), api_key.expiry_date, version))
+        elif api_key_cache is not None:
+            # Versions are only created for valid keys; the next request caches this one
+            _add_api_key_version(api_key.prefix)
+        return True
+
+
+@receiver(setting_changed)
+def _reset_api_key_cache(setting, **kwargs):
+    global _api_key_cache
+    if setting == "NATIONAL_ID_API_KEY_CACHE":
+        _api_key_cache = None
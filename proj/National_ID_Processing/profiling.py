@@ -0,0 +1,114 @@
+import io
+import logging
+import os
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Functions listed in the logged cProfile report
+REPORT_LINES = 30
+
+
+def should_profile(request):
+    """
+    True when profiling is enabled (NATIONAL_ID_PROFILING), the request asks for
+    it with the profiling header and it falls in the sampled share of traffic.
+    """
+    options = getattr(settings, "NATIONAL_ID_PROFILING", {})
+    if not options.get("ENABLED", False):
+        return False
+    header = "HTTP_" + options.get("HEADER", "X-Profile").upper().replace("-", "_")
+    return request.META.get(header) == "1" and random.random() < options.get("SAMPLE_RATE", 1.0)
+
+
+class _RequestProfiler:
+    """
+    Profiles one request with cProfile or pyinstrument (PROFILER), logs the
+    report and saves it to DIRECTORY when one is configured.
+    """
+
+    def __init__(self, request):
+        options = getattr(settings, "NATIONAL_ID_PROFILING", {})
+        self.request = request
+        self.kind = options.get("PROFILER", "cprofile")
+        self.directory = options.get("DIRECTORY")
+        if self.kind == "pyinstrument":
+            from pyinstrument import Profiler  # optional dependency
+
+            self.profiler = Profiler(async_mode="enabled")
+        else:
+            import cProfile  # imported when a request is profiled, not at startup
+
+            self.profiler = cProfile.Profile()
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self, response):
+        if self.kind == "pyinstrument":
+            self.profiler.stop()
+            report = self.profiler.output_text()
+        else:
+            self.profiler.disable()
+            import pstats
+
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(REPORT_LINES)
+            report = stream.getvalue()
+        logger.info("Profile of %s %s:\n%s", self.request.method, self.request.path, report)
+
+        if self.directory:
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{random.randrange(16 ** 6):06x}"
+            if self.kind == "pyinstrument":
+                name += ".html"
+                with open(os.path.join(self.directory, name), "w") as profile_file:
+                    profile_file.write(self.profiler.output_html())
+            else:
+                name += ".prof"
+                self.profiler.dump_stats(os.path.join(self.directory, name))
+            response["X-Profile-File"] = name
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests selected by `should_profile`. Costs one settings
+    lookup per request when profiling is disabled. On ASGI, cProfile profiles
+    also include other requests the event loop ran while the request waited;
+    pyinstrument attributes time to the request correctly.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not should_profile(request):
+            return self.get_response(request)
+        profiler = _RequestProfiler(request)
+        profiler.start()
+        # Exceptions raised by views are turned into responses before reaching middleware
+        response = self.get_response(request)
+        return profiler.stop(response)
+
+    async def __acall__(self, request):
+        if not should_profile(request):
+            return await self.get_response(request)
+        profiler = _RequestProfiler(request)
+        profiler.start()
+        response = await self.get_response(request)
+        return profiler.stop(response)
@@ -0,0 +1,460 @@
+import functools
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+from rest_framework_api_key.permissions import KeyParser
+from .models import RateLimitCounter
+
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    Parses a rate such as "10/m" or "1000/h" into (limit, window in seconds).
+    """
+    limit, _, period = rate.partition("/")
+    return int(limit), _PERIODS[period[0].lower()]
+
+
+class CacheCounters:
+    """
+    Shared counters in a Django cache whose `incr` is atomic, such as Redis.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def add(self, key, amount, timeout):
+        """Adds `amount` to the counter `key`, created with a lifetime of `timeout` seconds."""
+        try:
+            if not self.cache.add(key, amount, timeout=timeout):
+                self.cache.incr(key, amount)
+        except ValueError:  # pragma: no cover (expired between add and incr)
+            self.cache.set(key, amount, timeout=timeout)
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+
+class DatabaseCounters:
+    """
+    Shared counters in the RateLimitCounter table.
+
+    DatabaseCache has no atomic `incr`: it reads the value and writes it back,
+    so concurrent syncs from two processes lose hits. Here PostgreSQL and SQLite
+    add to a counter with a single INSERT ... ON CONFLICT DO UPDATE; other
+    databases update it with an F() expression and create it when it is missing.
+    Expired counters are deleted at most once every `purge_interval` seconds.
+    """
+
+    def __init__(self, using=None, purge_interval=60):
+        self.using = using or router.db_for_write(RateLimitCounter)
+        self.purge_interval = purge_interval
+        self._purged_at = None
+
+    def add(self, key, amount, timeout):
+        """Adds `amount` to the counter `key`, which then expires in `timeout` seconds."""
+        now = timezone.now()
+        expires = now + timedelta(seconds=timeout)
+        connection = connections[self.using]
+        if connection.vendor in ("postgresql", "sqlite"):
+            quote = connection.ops.quote_name
+            table = quote(RateLimitCounter._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} ({quote('key')}, {quote('count')}, {quote('expires')}) VALUES (%s, %s, %s) "
+                    f"ON CONFLICT ({quote('key')}) DO UPDATE SET "
+                    f"{quote('count')} = {table}.{quote('count')} + excluded.{quote('count')}, "
+                    f"{quote('expires')} = excluded.{quote('expires')}",
+                    [key, amount, RateLimitCounter._meta.get_field("expires").get_db_prep_value(expires, connection)],
+                )
+        else:
+            counters = RateLimitCounter.objects.using(self.using)
+            if not counters.filter(key=key).update(count=F("count") + amount, expires=expires):
+                try:
+                    with transaction.atomic(using=self.using):
+                        counters.create(key=key, count=amount, expires=expires)
+                except IntegrityError:  # pragma: no cover (created by another process in between)
+                    counters.filter(key=key).update(count=F("count") + amount, expires=expires)
+
+        if self._purged_at is None or (now - self._purged_at).total_seconds() >= self.purge_interval:
+            RateLimitCounter.objects.using(self.using).filter(expires__lt=now).delete()
+            self._purged_at = now
+
+    def get_many(self, keys):
+        return dict(
+            RateLimitCounter.objects.using(self.using)
+            .filter(key__in=keys, expires__gt=timezone.now())
+            .values_list("key", "count")
+        )
+
+
+def shared_counters(cache_alias, purge_interval=60):
+    """
+    Returns the counters backing the rate limits counted in the `cache_alias`
+    cache: the RateLimitCounter table in place of a DatabaseCache, the cache
+    itself otherwise.
+    """
+    from django.core.cache.backends.db import DatabaseCache
+
+    cache = caches[cache_alias]
+    if isinstance(cache, DatabaseCache):
+        return DatabaseCounters(purge_interval=purge_interval)
+    return CacheCounters(cache)
+
+
+class _Window:
+    __slots__ = ("index", "current", "previous", "pending", "synced_at", "syncing")
+
+    def __init__(self, index, current, previous, synced_at):
+        self.index = index
+        self.current = current  # shared count of this window at the last sync, plus hits being written
+        self.previous = previous  # shared count of the previous window
+        self.pending = 0  # hits allowed here and not yet added to the shared count
+        self.synced_at = synced_at
+        self.syncing = False  # a thread is syncing this window with the shared counters
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window-counter rate limiter whose counters are shared by every
+    worker process, through a Django cache (see `shared_counters`).
+
+    The number of hits in the last `window` seconds is estimated from the counts
+    of the current and the previous fixed window, the latter weighted by how much
+    of it still overlaps. Each process keeps a local snapshot of the shared counts
+    and counts its own hits locally; it adds them to the shared counters when the
+    snapshot is `sync_interval` seconds old, when a new window starts, or once it
+    has used half of the budget that was left at the last sync, whichever comes
+    first. With `sync_interval=0` every hit is written through to the cache.
+
+    The lock only guards the local counts: the shared counters are read and
+    written outside it, so a slow store never blocks hits on other keys, or the
+    event loop in `ahit`. While one thread syncs a key, others count its hits on
+    the local snapshot.
+
+    When the shared counters are unavailable, hits are allowed on local counts,
+    so each process only enforces its own share of the limit; this is logged
+    once per outage.
+    """
+
+    def __init__(self, limit, window, cache_alias="default", sync_interval=1.0, key_prefix="national-id-rl",
+                 max_keys=10000):
+        self.limit = limit
+        self.window = window
+        self.counters = shared_counters(cache_alias, purge_interval=window)
+        self.sync_interval = sync_interval
+        self.key_prefix = key_prefix
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        self._failing = False
+
+    def hit(self, key, now=None):
+        """
+        Records a hit for `key` if it is within the limit. Returns None when the
+        hit is allowed and the number of seconds to wait before retrying otherwise.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            sync = self._begin_sync(key, now)
+            if sync is None:
+                retry_after, write = self._consume(key, now)
+        if sync is not None:
+            exchanged = self._exchange(key, now, *sync)
+            with self._lock:
+                self._end_sync(key, now, *sync, *exchanged)
+                retry_after, write = self._consume(key, now)
+        if write is not None and not self._exchange(key, now, *write, read=False)[0]:
+            with self._lock:
+                self._write_failed(*write)
+                self._sync_failed()
+        return retry_after
+
+    async def ahit(self, key):
+        """
+        Async version of `hit`; only the occasional sync with the cache leaves the event loop.
+        """
+        now = time.time()
+        with self._lock:
+            sync = self._begin_sync(key, now)
+            if sync is None:
+                retry_after, write = self._consume(key, now)
+        if sync is not None:
+            exchanged = await sync_to_async(self._exchange)(key, now, *sync)
+            with self._lock:
+                self._end_sync(key, now, *sync, *exchanged)
+                retry_after, write = self._consume(key, now)
+        if write is not None and not (await sync_to_async(self._exchange)(key, now, *write, read=False))[0]:
+            with self._lock:
+                self._write_failed(*write)
+                self._sync_failed()
+        return retry_after
+
+    def _cache_key(self, key, index):
+        return f"{self.key_prefix}:{key}:{index}"
+
+    def _needs_sync(self, key, now):
+        window = self._windows.get(key)
+        if window is None or window.index != int(now // self.window):
+            return True
+        if window.syncing:
+            return False
+        if now - window.synced_at >= self.sync_interval:
+            return True
+        return window.pending >= max(1, (self.limit - self._shared_estimate(window, now)) / 2)
+
+    def _shared_estimate(self, window, now):
+        overlap = 1 - (now - window.index * self.window) / self.window
+        return window.previous * overlap + window.current
+
+    def _consume(self, key, now):
+        """
+        Counts a hit of `key` on the local snapshot. Returns the Retry-After delay
+        (None when the hit is allowed) and the hits to write through, if any.
+        """
+        window = self._windows[key]
+        count = window.current + window.pending
+        elapsed = now - window.index * self.window
+        if window.previous * (1 - elapsed / self.window) + count + 1 <= self.limit:
+            window.pending += 1
+            return None, self._begin_write(window) if self.sync_interval <= 0 else None
+
+        # Time until the weighted estimate leaves room for one more hit
+        if count + 1 > self.limit:
+            wait = self.window - elapsed + self.window * (1 - (self.limit - 1) / count)
+        else:
+            wait = self.window * (1 - (self.limit - 1 - count) / window.previous) - elapsed
+        return max(1, math.ceil(wait)), None
+
+    def _begin_write(self, window):
+        """
+        Moves the pending hits of `window` to its local count while they are
+        written; returns the (window, pending) pair to pass to `_exchange`.
+        """
+        pending, window.pending = window.pending, 0
+        window.current += pending
+        return window, pending
+
+    def _write_failed(self, window, pending):
+        """Returns hits that could not be written to the pending ones."""
+        window.current -= pending
+        window.pending += pending
+
+    def _begin_sync(self, key, now):
+        """
+        Returns the (window, pending) pair to sync if `key` needs a sync, and
+        None otherwise.
+        """
+        if not self._needs_sync(key, now):
+            return None
+        window = self._windows.get(key)
+        if window is None:
+            return None, 0
+        window.syncing = True
+        return self._begin_write(window)
+
+    def _exchange(self, key, now, window, pending, read=True):
+        """
+        Adds `pending` hits to the shared counter of `window` and reads the
+        shared counts of the current and the previous window, without the lock.
+        Returns (whether the hits were written, the counts or None on failure).
+        """
+        index = int(now // self.window)
+        try:
+            if pending:
+                self.counters.add(self._cache_key(key, window.index), pending, timeout=2 * self.window + 1)
+        except Exception:
+            return False, None
+        if not read:
+            return True, None
+        try:
+            return True, self.counters.get_many([self._cache_key(key, index), self._cache_key(key, index - 1)])
+        except Exception:
+            return True, None
+
+    def _end_sync(self, key, now, window, pending, written, counts):
+        """
+        Replaces the local snapshot of `key` with the shared counts read by
+        `_exchange`, keeping the hits allowed in the meantime.
+        """
+        index = int(now // self.window)
+        if window is not None:
+            window.syncing = False
+            if not written:
+                self._write_failed(window, pending)
+        latest = self._windows.get(key)
+        if counts is None:
+            # Fail open on local counts when the shared store is unavailable
+            self._sync_failed()
+            if latest is not None and latest.index == index:
+                latest.synced_at = now
+                return
+            counts = {}
+        elif self._failing:
+            logger.warning("Rate limit counters are shared again.")
+            self._failing = False
+
+        synced = _Window(
+            index,
+            counts.get(self._cache_key(key, index), 0),
+            counts.get(self._cache_key(key, index - 1), 0),
+            now,
+        )
+        if latest is not None and latest.index == index:
+            # Hits allowed while the counters were read
+            synced.pending = latest.pending
+        self._windows[key] = synced
+        self._windows.move_to_end(key)
+        # Forget the least recently synced keys; their unsynced hits are dropped
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+
+    def _sync_failed(self):
+        if not self._failing:
+            self._failing = True
+            logger.critical(
+                "Rate limit counters could not be synced; until they can, each process only enforces "
+                "its own share of the limits.", exc_info=True,
+            )
+
+
+def client_ip(request):
+    return request.META.get("REMOTE_ADDR")
+
+
+def api_key_prefix(request):
+    """Returns the (non-secret) prefix of the request's API key, if it has one."""
+    key = KeyParser().get(request)
+    return key.partition(".")[0] if key else None
+
+
+_SCOPES = {"ip": client_ip, "api_key": api_key_prefix}
+_limiters = None
+
+
+def get_rate_limiters():
+    """
+    Returns a (scope, limiter) pair for every rate configured in
+    NATIONAL_ID_RATE_LIMITS, or an empty list when rate limiting is disabled.
+    """
+    global _limiters
+    if _limiters is None:
+        options = getattr(settings, "NATIONAL_ID_RATE_LIMITS", {})
+        _limiters = [] if not options.get("ENABLED", True) else [
+            (scope, SlidingWindowLimiter(
+                *parse_rate(rate),
+                cache_alias=options.get("CACHE_ALIAS", "default"),
+                sync_interval=options.get("SYNC_INTERVAL", 1.0),
+                key_prefix=f"national-id-rl:{scope}",
+            ))
+            for scope, rate in options.get("RATES", {"ip": "10/m"}).items()
+        ]
+    return _limiters
+
+
+def reset_rate_limits():
+    """
+    Drops every limiter and its local counts; the shared counters are kept.
+    """
+    global _limiters
+    _limiters = None
+
+
+def check_rate_limits(request, group):
+    """
+    Records a request to `group` against every configured scope. Returns None
+    when it is allowed and the Retry-After delay in seconds otherwise.
+    """
+    for scope, limiter in get_rate_limiters():
+        identity = _SCOPES[scope](request)
+        if identity is not None:
+            retry_after = limiter.hit(f"{group}:{identity}")
+            if retry_after is not None:
+                return retry_after
+    return None
+
+
+async def acheck_rate_limits(request, group):
+    """
+    Async version of `check_rate_limits`.
+    """
+    for scope, limiter in get_rate_limiters():
+        identity = _SCOPES[scope](request)
+        if identity is not None:
+            retry_after = await limiter.ahit(f"{group}:{identity}")
+            if retry_after is not None:
+                return retry_after
+    return None
+
+
+class NationalIDRateThrottle(BaseThrottle):
+    """
+    DRF throttle applying NATIONAL_ID_RATE_LIMITS; requests are grouped by the
+    view's `throttle_scope` (its class name by default). Throttled requests get
+    a 429 response with a Retry-After header.
+    """
+
+    def allow_request(self, request, view):
+        group = getattr(view, "throttle_scope", None) or type(view).__name__
+        self.retry_after = check_rate_limits(request, group)
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+def throttled_response(retry_after):
+    """Returns the 429 response of a throttled request, like DRF's."""
+    response = JsonResponse(
+        {"detail": f"Request was throttled. Expected available in {retry_after} seconds."}, status=429
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def rate_limit(group):
+    """
+    Decorator applying NATIONAL_ID_RATE_LIMITS to a sync or async function view.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                retry_after = await acheck_rate_limits(request, group)
+                if retry_after is not None:
+                    return throttled_response(retry_after)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            retry_after = check_rate_limits(request, group)
+            if retry_after is not None:
+                return throttled_response(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@receiver(setting_changed)
+def _reset_limiters(setting, **kwargs):
+    if setting in ("NATIONAL_ID_RATE_LIMITS", "CACHES"):
+        reset_rate_limits()
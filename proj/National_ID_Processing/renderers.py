@@ -0,0 +1,79 @@
+import msgpack
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+# orjson leaves datetimes and dataclasses to DRF's encoder, as the stdlib encoder does
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+# Written in chunks of about this many bytes by `stream_json_list`
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_default = JSONEncoder().default
+
+
+def dumps(data):
+    """
+    Encodes `data` with orjson into the bytes DRF's JSONRenderer produces with
+    its default settings: compact, UTF-8, with U+2028 and U+2029 escaped.
+    Floats use orjson's shortest form (e.g. 1e-05 is encoded as 0.00001).
+    """
+    content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return content
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson. Indented output (requested with
+    `application/json; indent=N`) and anything orjson cannot encode, such as
+    integers over 64 bits, fall back to DRF's stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is None:
+            try:
+                return dumps(data)
+            except orjson.JSONEncodeError:
+                pass
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders MessagePack, encoding what msgpack does not know (datetimes,
+    decimals, lazy strings, ...) as DRF's JSON encoder does.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_default)
+
+
+def stream_json_list(key, items, extra):
+    """
+    Yields the JSON encoding of `{key: list(items), **extra}` in chunks of about
+    STREAM_CHUNK_SIZE bytes, encoding one item at a time so that neither the
+    list nor the whole document is ever held in memory.
+    """
+    head = dumps({key: []})
+    chunk = bytearray(head[:-2])  # b'{"key":['
+    separator = b""
+    for item in items:
+        chunk += separator
+        chunk += dumps(item)
+        separator = b","
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    chunk += b"]," + dumps(extra)[1:] if extra else b"]}"
+    yield bytes(chunk)
@@ -0,0 +1,116 @@
+from asgiref.sync import sync_to_async
+from django.db import connections, router, transaction
+from .models import EGYNationalIDInfo
+from .stats import record_created
+
+
+def _insert_returning(objs, using):
+    """
+    Inserts `objs` with INSERT ... ON CONFLICT DO NOTHING RETURNING and returns
+    the rows that were created, keyed by national ID as it is stored. Rows that
+    already existed are not returned. The statement is written here rather than
+    through the private QuerySet._insert, whose signature changes between
+    Django versions.
+    """
+    opts = EGYNationalIDInfo._meta
+    fields = [field for field in opts.concrete_fields if not field.primary_key]
+    national_id_field = opts.get_field("national_id")
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(opts.db_table)} ({', '.join(quote(field.column) for field in fields)}) VALUES {{}} "
+        f"ON CONFLICT DO NOTHING RETURNING {quote(opts.pk.column)}, {quote(national_id_field.column)}"
+    )
+    placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+
+    # Created rows are matched by the national ID as the database returns it
+    by_national_id = {}
+    for obj in objs:
+        for field in fields:
+            field.pre_save(obj, add=True)  # sets created_at
+        by_national_id[national_id_field.get_db_prep_save(obj.national_id, connection)] = obj
+
+    created = {}
+    batch_size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            cursor.execute(
+                sql.format(", ".join([placeholders] * len(batch))),
+                [field.get_db_prep_save(getattr(obj, field.attname), connection) for obj in batch for field in fields],
+            )
+            for pk, national_id in cursor.fetchall():
+                obj = by_national_id[national_id]
+                obj.pk = pk
+                obj._state.adding = False
+                obj._state.db = using
+                created[str(national_id)] = obj
+    return created
+
+
+def _stored(national_id):
+    """Returns a national ID as it reads back from the database."""
+    return str(EGYNationalIDInfo._meta.get_field("national_id").get_prep_value(national_id))
+
+
+def save_national_id_infos(infos):
+    """
+    Stores the extracted info of many valid national IDs (a mapping of national
+    ID to `extract_info` result), keeping rows that already exist. Returns a
+    `(rows, created)` pair: every row keyed by national ID, and the set of
+    national IDs whose rows were created.
+
+    New rows are written with a single INSERT ... ON CONFLICT DO NOTHING
+    RETURNING per batch and only the IDs that already existed are read back, so
+    concurrent writers of the same IDs never fail on the unique constraint. On
+    databases without INSERT ... RETURNING, bulk_create(ignore_conflicts=True)
+    is followed by a fetch of every row. The created rows are added to the
+    statistics buckets in the same transaction.
+    """
+    if not infos:
+        return {}, set()
+    using = router.db_for_write(EGYNationalIDInfo)
+    objs = [EGYNationalIDInfo.from_info(national_id, info) for national_id, info in infos.items()]
+    # Rows are matched by the national ID as the database stores and returns it,
+    # and returned under the national ID as it was given
+    stored = {national_id: _stored(national_id) for national_id in infos}
+
+    connection = connections[using]
+    if connection.vendor in ("postgresql", "sqlite") and connection.features.can_return_rows_from_bulk_insert:
+        with transaction.atomic(using=using, savepoint=False):
+            created = _insert_returning(objs, using)
+            record_created(created.values(), using=using)
+        created_ids = {national_id for national_id in infos if stored[national_id] in created}
+    else:
+        with transaction.atomic(using=using):
+            existing = set(
+                EGYNationalIDInfo.objects.using(using).filter(national_id__in=list(infos))
+                .values_list("national_id", flat=True)
+            )
+            EGYNationalIDInfo.objects.using(using).bulk_create(objs, ignore_conflicts=True)
+            new_objs = [obj for obj in objs if stored[obj.national_id] not in existing]
+            record_created(new_objs, using=using)
+        # Rows created by bulk_create have no primary key here; all of them are fetched
+        created = {}
+        created_ids = {obj.national_id for obj in new_objs}
+
+    missing = [national_id for national_id in infos if stored[national_id] not in created]
+    fetched = EGYNationalIDInfo.objects.using(using).in_bulk(missing, field_name="national_id") if missing else {}
+    rows = {national_id: created.get(stored[national_id]) or fetched[stored[national_id]] for national_id in infos}
+    return rows, created_ids
+
+
+def get_or_create_national_id_info(national_id, info):
+    """
+    Single-ID version of `save_national_id_infos`, a race-free replacement for
+    `get_or_create`: returns `(row, created)`.
+    """
+    rows, created = save_national_id_infos({national_id: info})
+    return rows[national_id], national_id in created
+
+
+async def aget_or_create_national_id_info(national_id, info):
+    """
+    Async version of `get_or_create_national_id_info`.
+    """
+    return await sync_to_async(get_or_create_national_id_info)(national_id, info)
@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class ResultCache:
+    """
+    Read-through cache of serialized validation results keyed by national ID.
+
+    The first tier is an in-process LRU with a TTL and a maximum size. When
+    `shared_cache` (a Django cache) is given, local misses fall back to it so
+    results are shared across worker processes.
+    """
+
+    def __init__(self, max_size=10000, ttl=300, shared_cache=None, key_prefix="national-id-result:"):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self.key_prefix = key_prefix
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, national_id):
+        """
+        Returns the cached payload for `national_id`, or None on a miss.
+        """
+        payload = self._get_local(national_id)
+        if payload is None and self.shared_cache is not None:
+            payload = self._got_shared(national_id, self.shared_cache.get(self.key_prefix + national_id))
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+        return payload
+
+    async def aget(self, national_id):
+        """
+        Async version of `get`, which does not block on the shared tier.
+        """
+        payload = self._get_local(national_id)
+        if payload is None and self.shared_cache is not None:
+            payload = self._got_shared(national_id, await self.shared_cache.aget(self.key_prefix + national_id))
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+        return payload
+
+    def set(self, national_id, payload):
+        """
+        Caches `payload` for `national_id` in every tier.
+        """
+        self._store(national_id, payload)
+        if self.shared_cache is not None:
+            self.shared_cache.set(self.key_prefix + national_id, payload, self.ttl)
+
+    async def aset(self, national_id, payload):
+        """
+        Async version of `set`.
+        """
+        self._store(national_id, payload)
+        if self.shared_cache is not None:
+            await self.shared_cache.aset(self.key_prefix + national_id, payload, self.ttl)
+
+    def delete(self, national_id):
+        """
+        Removes `national_id` from every tier.
+        """
+        with self._lock:
+            self._entries.pop(national_id, None)
+        if self.shared_cache is not None:
+            self.shared_cache.delete(self.key_prefix + national_id)
+
+    def clear(self):
+        """
+        Empties the local tier and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.shared_hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self):
+        """
+        Returns the cache counters, e.g. to size `max_size` and `ttl`.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _get_local(self, national_id):
+        with self._lock:
+            entry = self._entries.get(national_id)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(national_id)
+                self.hits += 1
+                return payload
+            del self._entries[national_id]
+            self.expirations += 1
+            return None
+
+    def _got_shared(self, national_id, payload):
+        if payload is not None:
+            self._store(national_id, payload)
+            with self._lock:
+                self.shared_hits += 1
+        return payload
+
+    def _store(self, national_id, payload):
+        with self._lock:
+            self._entries[national_id] = (time.monotonic() + self.ttl, payload)
+            self._entries.move_to_end(national_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    """
+    Returns the process-wide result cache configured by NATIONAL_ID_RESULT_CACHE,
+    or None when caching is disabled.
+    """
+    global _result_cache
+    if _result_cache is None:
+        options = getattr(settings, "NATIONAL_ID_RESULT_CACHE", {})
+        if not options.get("ENABLED", True):
+            return None
+        alias = options.get("SHARED_CACHE_ALIAS")
+        _result_cache = ResultCache(
+            max_size=options.get("MAX_SIZE", 10000),
+            ttl=options.get("TTL", 300),
+            shared_cache=caches[alias] if alias else None,
+        )
+    return _result_cache
+
+
+@receiver(setting_changed)
+def _reset_result_cache(setting, **kwargs):
+    global _result_cache
+    if setting in ("NATIONAL_ID_RESULT_CACHE", "CACHES"):
+        _result_cache = None
@@ -1,5 +1,8 @@
 # id_validator/serializers.py
-from rest_framework import serializers
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import APILog, EGYNationalIDInfo
 
 class APILogSerializer(serializers.ModelSerializer):
@@ -15,6 +18,61 @@ class EGYNationalIDInfoSerializer(serializers.ModelSerializer):
     """
     Serializer to convert EGYNationalIDInfo model data to JSON format.
     """
+    # Stored as an integer, represented as the 14-digit string
+    national_id = serializers.CharField(min_length=14, max_length=14)
+    birth_year = serializers.IntegerField(read_only=True)
+    birth_month = serializers.IntegerField(read_only=True)
+    birth_day = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = EGYNationalIDInfo
-        fields = ['national_id', 'birth_year', 'birth_month', 'birth_day', 'created_at']
+        fields = ['national_id', 'birth_year', 'birth_month', 'birth_day', 'gender', 'governorate', 'created_at']
+
+
+_created_at_field = serializers.DateTimeField()
+
+
+def national_id_info_to_dict(egy_info):
+    """
+    Returns what `EGYNationalIDInfoSerializer(egy_info).data` returns, without
+    building a serializer: a plain dict with the same keys in the same order.
+    """
+    created_at = egy_info.created_at
+    if created_at and settings.USE_TZ and timezone.is_aware(created_at) and api_settings.DATETIME_FORMAT == ISO_8601:
+        # DateTimeField.to_representation, inlined for the default settings
+        created_at = created_at.astimezone(timezone.get_current_timezone()).isoformat()
+        if created_at.endswith("+00:00"):
+            created_at = created_at[:-6] + "Z"
+    else:
+        created_at = _created_at_field.to_representation(created_at)
+    return {
+        "national_id": egy_info.national_id,
+        "birth_year": egy_info.birth_year,
+        "birth_month": egy_info.birth_month,
+        "birth_day": egy_info.birth_day,
+        "gender": egy_info.gender,
+        "governorate": egy_info.governorate,
+        "created_at": created_at,
+    }
+
+
+# Data columns of the column-oriented batch layout
+INFO_COLUMNS = ("birth_year", "birth_month", "birth_day", "gender", "governorate", "created_at")
+
+
+def batch_results_to_columns(national_ids, errors, egy_infos):
+    """
+    Column-oriented batch results: one list per field, each with one entry per
+    requested ID in request order. `error` is None for valid IDs, and the data
+    columns are None for invalid ones. `errors` maps request positions to error
+    messages and `egy_infos` national IDs to their rows.
+    """
+    data = {national_id: national_id_info_to_dict(egy_info) for national_id, egy_info in egy_infos.items()}
+    rows = [None if index in errors else data[national_id] for index, national_id in enumerate(national_ids)]
+    columns = {
+        "national_id": list(national_ids),
+        "error": [errors.get(index) for index in range(len(national_ids))],
+    }
+    for field in INFO_COLUMNS:
+        columns[field] = [row[field] if row is not None else None for row in rows]
+    return columns
@@ -0,0 +1,67 @@
+# id_validator/signals.py
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import EGYNationalIDInfo
+from .result_cache import get_result_cache
+from .stats import add_to_stats, bucket_counts, stats_enabled
+
+
+@receiver(post_save, sender=EGYNationalIDInfo)
+@receiver(post_delete, sender=EGYNationalIDInfo)
+def invalidate_cached_result(sender, instance, **kwargs):
+    """
+    Drops the cached result of a national ID whose stored data changed or was deleted.
+    """
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        result_cache.delete(instance.national_id)
+
+
+@receiver(post_save, sender=EGYNationalIDInfo)
+def count_saved_national_id_info(sender, instance, created, using, **kwargs):
+    """
+    Adds a national ID created with `save()` to the statistics. Bulk inserts
+    send no signals and are counted by the code performing them.
+    """
+    if created and stats_enabled():
+        add_to_stats(bucket_counts([instance]), using=using)
+
+
+@receiver(post_delete, sender=EGYNationalIDInfo)
+def count_deleted_national_id_info(sender, instance, using, **kwargs):
+    """
+    Removes a deleted national ID from the statistics.
+    """
+    if stats_enabled():
+        add_to_stats({bucket: -count for bucket, count in bucket_counts([instance]).items()}, using=using)
+
+
+# A lazy sender, so that app loading does not import DRF and the API key
+# permission; they are imported once an API key is saved or deleted
+@receiver(post_save, sender="rest_framework_api_key.APIKey")
+@receiver(post_delete, sender="rest_framework_api_key.APIKey")
+def invalidate_cached_api_key(sender, instance, **kwargs):
+    """
+    Drops the cached verifications of an API key that was changed (e.g. revoked
+    or given an expiry date) or deleted, in every process.
+    """
+    from .permissions import invalidate_api_key
+
+    invalidate_api_key(instance.prefix)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    Applies the NATIONAL_ID_SQLITE PRAGMAs to every new SQLite connection.
+    """
+    config = getattr(settings, "NATIONAL_ID_SQLITE", {})
+    if connection.vendor != "sqlite" or not config.get("ENABLED", False):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA journal_mode = {config.get('JOURNAL_MODE', 'WAL')}")
+        cursor.execute(f"PRAGMA synchronous = {config.get('SYNCHRONOUS', 'NORMAL')}")
+        cursor.execute(f"PRAGMA busy_timeout = {int(config.get('BUSY_TIMEOUT', 5000))}")
+        cursor.execute(f"PRAGMA mmap_size = {int(config.get('MMAP_SIZE', 0))}")
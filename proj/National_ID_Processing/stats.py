@@ -0,0 +1,114 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+from .models import EGYNationalIDInfo, EGYNationalIDInfoStats
+
+
+# Columns identifying a bucket, and the ones the read API can group and filter by
+BUCKET_FIELDS = ("birth_year", "birth_month", "gender", "governorate")
+GROUP_FIELDS = ("century",) + BUCKET_FIELDS
+
+# The same columns read from EGYNationalIDInfo
+INFO_BUCKET_FIELDS = ("birth_date__year", "birth_date__month", "gender", "governorate")
+
+
+def stats_enabled():
+    return getattr(settings, "NATIONAL_ID_STATS", {}).get("ENABLED", True)
+
+
+def bucket_counts(egy_infos):
+    """Counts `egy_infos` (EGYNationalIDInfo instances) per bucket."""
+    return Counter((info.birth_year, info.birth_month, info.gender, info.governorate) for info in egy_infos)
+
+
+def add_to_stats(counts, using=None):
+    """
+    Adds `counts` ({bucket: count}, counts may be negative) to the stored
+    buckets. PostgreSQL and SQLite increment every bucket in a single
+    INSERT ... ON CONFLICT DO UPDATE; other databases lock the existing buckets
+    and update or create them.
+    """
+    counts = {bucket: count for bucket, count in counts.items() if count}
+    if not counts:
+        return
+    using = using or router.db_for_write(EGYNationalIDInfoStats)
+    connection = connections[using]
+    if connection.vendor in ("postgresql", "sqlite"):
+        _upsert_counts(counts, connection)
+        return
+
+    with transaction.atomic(using=using):
+        stats = EGYNationalIDInfoStats.objects.using(using).select_for_update().filter(
+            birth_year__in={bucket[0] for bucket in counts},
+        )
+        existing = {tuple(getattr(row, field) for field in BUCKET_FIELDS): row for row in stats}
+        for bucket, row in existing.items():
+            row.count += counts.get(bucket, 0)
+        EGYNationalIDInfoStats.objects.using(using).bulk_update(
+            [row for bucket, row in existing.items() if bucket in counts], ["count"],
+        )
+        EGYNationalIDInfoStats.objects.using(using).bulk_create([
+            EGYNationalIDInfoStats(century=bucket[0] // 100, count=count, **dict(zip(BUCKET_FIELDS, bucket)))
+            for bucket, count in counts.items() if bucket not in existing
+        ])
+
+
+def _upsert_counts(counts, connection):
+    quote = connection.ops.quote_name
+    table = quote(EGYNationalIDInfoStats._meta.db_table)
+    columns = ("century",) + BUCKET_FIELDS + ("count",)
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    # Stay under the bound parameter limit of the database
+    batch_size = max(connection.ops.bulk_batch_size(columns, list(counts)), 1)
+    buckets = list(counts.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(buckets), batch_size):
+            batch = buckets[start:start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(map(quote, columns))}) "
+                f"VALUES {', '.join([placeholders] * len(batch))} "
+                f"ON CONFLICT ({', '.join(map(quote, BUCKET_FIELDS))}) "
+                f"DO UPDATE SET {quote('count')} = {table}.{quote('count')} + excluded.{quote('count')}",
+                [value for bucket, count in batch for value in (bucket[0] // 100, *bucket, count)],
+            )
+
+
+def record_created(egy_infos, using=None):
+    """Adds newly stored EGYNationalIDInfo rows to the statistics, when enabled."""
+    if stats_enabled():
+        add_to_stats(bucket_counts(egy_infos), using=using)
+
+
+def rebuild_stats(using=None):
+    """
+    Recomputes every bucket from EGYNationalIDInfo with one GROUP BY, replacing
+    the stored buckets in a single transaction. Returns the number of buckets.
+    """
+    using = using or router.db_for_write(EGYNationalIDInfoStats)
+    buckets = (
+        EGYNationalIDInfo.objects.using(using).values_list(*INFO_BUCKET_FIELDS)
+        .annotate(count=Count("pk")).order_by()
+    )
+    with transaction.atomic(using=using):
+        EGYNationalIDInfoStats.objects.using(using).all().delete()
+        created = EGYNationalIDInfoStats.objects.using(using).bulk_create(
+            [
+                EGYNationalIDInfoStats(century=bucket[0] // 100, count=bucket[-1], **dict(zip(BUCKET_FIELDS, bucket)))
+                for bucket in buckets.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def distribution(group_by, filters=None):
+    """
+    Returns the number of stored national IDs per value of the `group_by`
+    fields (a subset of GROUP_FIELDS), for the buckets matching `filters`
+    ({field: value}), ordered by the grouped fields, and the total.
+    """
+    stats = EGYNationalIDInfoStats.objects.filter(count__gt=0, **(filters or {}))
+    rows = list(stats.values(*group_by).annotate(count=Sum("count")).order_by(*group_by))
+    return rows, sum(row["count"] for row in rows)
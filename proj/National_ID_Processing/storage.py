@@ -0,0 +1,46 @@
+from django.db import models, transaction
+from django.db.models import F, Max
+from django.db.models.functions import Cast
+
+
+# Primary key range filled per transaction
+DEFAULT_CHUNK_SIZE = 10000
+
+# The migration adding the compact columns, and the one dropping the old ones
+COMPACT_COLUMNS_MIGRATION = ("National_ID_Processing", "0006_egynationalidinfo_compact_columns")
+COMPACT_STORAGE_MIGRATION = ("National_ID_Processing", "0007_egynationalidinfo_compact_storage")
+
+
+def backfill_compact_columns(model, chunk_size=DEFAULT_CHUNK_SIZE, using="default"):
+    """
+    Fills the integer national ID and packed birth date columns of `model` (the
+    EGYNationalIDInfo model as of migration 0006) from the old columns, with
+    one UPDATE per `chunk_size` primary keys, each in its own transaction. Rows
+    already filled are skipped, so it can be interrupted and run again. Yields
+    the number of rows filled so far after each chunk.
+    """
+    queryset = model.objects.using(using).filter(compact_national_id__isnull=True)
+    last_pk = queryset.aggregate(last_pk=Max("pk"))["last_pk"]
+    total = 0
+    start = 0
+    while last_pk is not None and start < last_pk:
+        with transaction.atomic(using=using):
+            total += queryset.filter(pk__gt=start, pk__lte=start + chunk_size).update(
+                compact_national_id=Cast("national_id", models.BigIntegerField()),
+                birth_date=F("birth_year") * 10000 + F("birth_month") * 100 + F("birth_day"),
+            )
+        start += chunk_size
+        yield total
+
+
+def restore_old_columns(model, using="default"):
+    """
+    Fills the old national ID and birth year, month and day columns of `model`
+    from the compact ones, when migration 0007 is reverted.
+    """
+    model.objects.using(using).update(
+        national_id=Cast("compact_national_id", models.CharField(max_length=14)),
+        birth_year=F("birth_date") / 10000,
+        birth_month=F("birth_date") / 100 % 100,
+        birth_day=F("birth_date") % 100,
+    )
@@ -1,8 +1,22 @@
 # id_validator/urls.py
 from django.urls import path
-from .views import index, NationalIDValidatorView
+from .views import (
+    index, national_id_async, ExportView, MetricsView, NationalIDValidatorView, NationalIDBatchValidatorView, NationalIDStatsView,
+    ResultCacheStatsView,
+)
+
+# The API alone, as served by the API-only settings profile (proj.settings_api)
+api_urlpatterns = [
+    path("api/national-id/", NationalIDValidatorView.as_view(), name="national_id_api"),
+    path("api/national-id/batch/", NationalIDBatchValidatorView.as_view(), name="national_id_batch_api"),
+    path("api/national-id/async/", national_id_async, name="national_id_async_api"),
+    path("api/national-id/stats/", NationalIDStatsView.as_view(), name="national_id_stats"),
+    path("api/national-id/cache/stats/", ResultCacheStatsView.as_view(), name="national_id_cache_stats"),
+    path("api/export/<str:dataset>.<str:file_format>", ExportView.as_view(), name="export_api"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+]
 
 urlpatterns = [
     path("", index, name="index"),  # Serve the index.html template on the homepage
-    path("api/national-id/", NationalIDValidatorView.as_view(), name="national_id_api"),
+    *api_urlpatterns,
 ]
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+from .errors import (
+    ERROR_MESSAGES, FUTURE_BIRTH_DATE, INVALID_CENTURY, INVALID_CHECK_DIGIT, INVALID_DAY, INVALID_FORMAT,
+    INVALID_GOVERNORATE, INVALID_LEAP_DAY, INVALID_MONTH, RECORD_SIZE, VALID,
+)
+from .governorates import CHECK_DIGIT_WEIGHTS, GOVERNORATES
+
+
+# Highest day accepted for each month (index 0 is unused); February 29 is
+# checked separately against the leap year mask
+_MAX_DAY = np.array([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int16)
+
+_GOVERNORATE_ASSIGNED = np.array([name is not None for name in GOVERNORATES])
+_CHECK_DIGIT_WEIGHTS = np.array(CHECK_DIGIT_WEIGHTS, dtype=np.int16)
+
+
+class BatchValidation(NamedTuple):
+    """
+    Column-oriented result of `validate_national_ids`. Birth date and gender
+    columns are 0 for invalid rows; gender is 1 for male and 0 for female.
+    """
+    valid: np.ndarray
+    error_code: np.ndarray
+    birth_year: np.ndarray
+    birth_month: np.ndarray
+    birth_day: np.ndarray
+    gender: np.ndarray
+    governorate_code: np.ndarray
+
+
+def _code_matrix(national_ids):
+    """
+    Returns a 2-D integer array with one row of character codes per national ID.
+    """
+    if isinstance(national_ids, (bytes, bytearray, memoryview)):
+        buffer = np.frombuffer(national_ids, dtype=np.uint8)
+        if buffer.size % RECORD_SIZE:
+            raise ValueError(f"Buffer length must be a multiple of {RECORD_SIZE} bytes.")
+        return buffer.reshape(-1, RECORD_SIZE)
+
+    array = np.asarray(national_ids)
+    if array.dtype.kind == "O":
+        array = array.astype(str)
+    if array.dtype.kind == "S":
+        width, code_type = array.dtype.itemsize, np.uint8
+    elif array.dtype.kind == "U":
+        width, code_type = array.dtype.itemsize // 4, np.uint32
+    else:
+        raise TypeError(f"Unsupported dtype for national IDs: {array.dtype}")
+
+    array = np.ascontiguousarray(array.reshape(-1))
+    return array.view(code_type).reshape(array.size, width)
+
+
+def validate_national_ids(national_ids, current_date=None):
+    """
+    Validates a batch of national IDs with array arithmetic only (no per-row Python).
+    Mirrors `helpers.validate_national_id`, which stays the reference implementation.
+
+    `national_ids` is a sequence or NumPy array of strings (``S`` or ``U`` dtype)
+    or a bytes-like buffer of concatenated 14-byte ASCII records.
+    """
+    if current_date is None:
+        current_date = datetime.now()
+    if isinstance(current_date, datetime):
+        current_date = current_date.date()
+    today = np.datetime64(current_date, "D")
+
+    codes = _code_matrix(national_ids)
+    width = codes.shape[1]
+    if width < RECORD_SIZE:
+        codes = np.pad(codes, ((0, 0), (0, RECORD_SIZE - width)))
+
+    # Exactly 14 ASCII digits; anything after them must be padding. The range is
+    # checked on the unsigned codes, which any narrower signed cast would wrap
+    head = codes[:, :RECORD_SIZE]
+    format_ok = ((head >= ord("0")) & (head <= ord("9"))).all(axis=1) & (codes[:, RECORD_SIZE:] == 0).all(axis=1)
+    digits = np.where(format_ok[:, None], head, ord("0")).astype(np.int16) - ord("0")
+
+    century = digits[:, 0]
+    century_ok = (century == 2) | (century == 3)
+
+    year = 1900 + 100 * (century == 3) + digits[:, 1] * 10 + digits[:, 2]
+    month = digits[:, 3] * 10 + digits[:, 4]
+    day = digits[:, 5] * 10 + digits[:, 6]
+
+    month_ok = (month >= 1) & (month <= 12)
+    day_ok = (day >= 1) & (day <= _MAX_DAY[np.where(month_ok, month, 0)])
+    leap_year = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    leap_day_ok = ~((month == 2) & (day == 29) & ~leap_year)
+
+    governorate_code = digits[:, 7] * 10 + digits[:, 8]
+    governorate_ok = _GOVERNORATE_ASSIGNED[governorate_code]
+    check_digit_ok = digits[:, 13] == (11 - (digits[:, :13] @ _CHECK_DIGIT_WEIGHTS) % 11) % 10
+
+    # Days since the epoch, with placeholder 1/1 for rows that already failed
+    date_ok = month_ok & day_ok
+    birth_date = (
+        (year - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+        + np.where(date_ok, month - 1, 0)
+    ).astype("datetime64[D]") + np.where(date_ok, day - 1, 0)
+    future = birth_date > today
+
+    error_code = np.select(
+        [~format_ok, ~century_ok, ~month_ok, ~day_ok, ~leap_day_ok, ~governorate_ok, ~check_digit_ok, future],
+        [
+            INVALID_FORMAT, INVALID_CENTURY, INVALID_MONTH, INVALID_DAY, INVALID_LEAP_DAY,
+            INVALID_GOVERNORATE, INVALID_CHECK_DIGIT, FUTURE_BIRTH_DATE,
+        ],
+        default=VALID,
+    ).astype(np.uint8)
+    valid = error_code == VALID
+
+    return BatchValidation(
+        valid=valid,
+        error_code=error_code,
+        birth_year=np.where(valid, year, 0).astype(np.int16),
+        birth_month=np.where(valid, month, 0).astype(np.int8),
+        birth_day=np.where(valid, day, 0).astype(np.int8),
+        gender=np.where(valid, digits[:, 12] % 2, 0).astype(np.uint8),
+        governorate_code=np.where(valid, governorate_code, 0).astype(np.uint8),
+    )
+
+
+def error_messages(error_code):
+    """
+    Maps an array of error codes to an object array of error messages (None for valid rows).
+    """
+    return np.array(ERROR_MESSAGES, dtype=object)[error_code]
@@ -1,63 +1,332 @@
 # id_validator/views.py
+import json
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django_ratelimit.decorators import ratelimit
-from django.utils.decorators import method_decorator
-from rest_framework_api_key.permissions import HasAPIKey
+from rest_framework.parsers import JSONParser
+from .executor import validate_many
+from .exports import EXPORTS, FORMATS, ExportStream, export_queryset
 from .helpers import validate_national_id, extract_info
-from .models import APILog, EGYNationalIDInfo
-from .serializers import APILogSerializer, EGYNationalIDInfoSerializer
+from .log_pipeline import alog_api_call, log_api_calls
+from .metrics import count_validations, get_metrics, timed
+from .parsers import MessagePackParser, NDJSONParser, PackedNationalIDParser, PackedNationalIDs
+from .permissions import CachedHasAPIKey
+from .ratelimit import NationalIDRateThrottle, acheck_rate_limits, rate_limit, throttled_response
+from .repository import aget_or_create_national_id_info, get_or_create_national_id_info, save_national_id_infos
+from .result_cache import get_result_cache
+from .renderers import MessagePackRenderer, stream_json_list
+from .serializers import batch_results_to_columns, national_id_info_to_dict
+from .stats import GROUP_FIELDS, distribution
 from django.shortcuts import render
 
 
-@ratelimit(key='ip', rate='10/m', block=True)
+@rate_limit("index")
 def index(request):
     """
     Renders the index.html template for the homepage.
-    Limited to 10 requests per minute per IP address.
+    Rate limited per IP address (NATIONAL_ID_RATE_LIMITS).
     """
     
     return render(request, 'index.html')
 
 
-class NationalIDValidatorView(APIView):
+class InstrumentedAPIView(APIView):
+    """
+    APIView recording the time spent in the whole request, the API key check,
+    the rate limits and rendering as stages of its throttle_scope (NATIONAL_ID_METRICS).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with timed(self.throttle_scope, "request"):
+            return super().dispatch(request, *args, **kwargs)
+
+    def check_permissions(self, request):
+        with timed(self.throttle_scope, "api_key"):
+            super().check_permissions(request)
+
+    def check_throttles(self, request):
+        with timed(self.throttle_scope, "rate_limit"):
+            super().check_throttles(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if not isinstance(response, Response):
+            return response  # streamed
+        with timed(self.throttle_scope, "render"):
+            return response.render()
+
+
+class NationalIDValidatorView(InstrumentedAPIView):
     """
     API view for validating and extracting information from an Egyptian National ID.
-    Limited to 10 requests per minute per IP address.
+    Rate limited per IP address and per API key (NATIONAL_ID_RATE_LIMITS).
     """
-    permission_classes = [HasAPIKey]
+    permission_classes = [CachedHasAPIKey]
+    throttle_classes = [NationalIDRateThrottle]
+    throttle_scope = "national_id"
 
-    @method_decorator(ratelimit(key='ip', rate='10/m', block=True))
     def post(self, request):
         national_id = request.data.get("national_id")
-      
-        is_valid, error_message = validate_national_id(national_id)
-        if not is_valid:
-            return Response({"error": error_message}, status=400)
 
-        # Extract data
-        extracted_data = extract_info(national_id)
+        # Repeat lookups are served from the result cache
+        result_cache = get_result_cache()
+        with timed("national_id", "result_cache"):
+            data = result_cache.get(national_id) if result_cache is not None and isinstance(national_id, str) else None
+
+        if data is None:
+            with timed("national_id", "validate"):
+                is_valid, error_message = validate_national_id(national_id)
+            count_validations("national_id", [error_message])
+            if not is_valid:
+                return Response({"error": error_message}, status=400)
+
+            # Extract data
+            with timed("national_id", "extract"):
+                extracted_data = extract_info(national_id)
+
+            # Save extracted data to the model
+            with timed("national_id", "save"):
+                egy_info, created = get_or_create_national_id_info(national_id, extracted_data)
+
+            # Serialize data
+            with timed("national_id", "serialize"):
+                data = national_id_info_to_dict(egy_info)
+            if result_cache is not None:
+                result_cache.set(national_id, data)
 
         # Log API call
-        APILog.objects.create(
-            ip_address=request.META.get("REMOTE_ADDR"),
-            national_id=national_id,
-        )
+        with timed("national_id", "log"):
+            log_api_calls(request.META.get("REMOTE_ADDR"), [national_id])
+
+        return Response({
+            "data": data,
+            "message": "Data processed successfully.",
+        }, status=200)
+
+
+class ResultCacheStatsView(APIView):
+    """
+    API view exposing the result cache counters (hits, misses, evictions, ...).
+    """
+    permission_classes = [CachedHasAPIKey]
+
+    def get(self, request):
+        result_cache = get_result_cache()
+        return Response(result_cache.stats() if result_cache is not None else {"enabled": False})
+
+
+class NationalIDStatsView(APIView):
+    """
+    Number of stored national IDs per value of the comma-separated `group_by`
+    fields (century, birth_year, birth_month, gender, governorate), read from the
+    precomputed statistics (NATIONAL_ID_STATS). Each of these fields can also be
+    passed as a query parameter to count only the matching IDs.
+    """
+    permission_classes = [CachedHasAPIKey]
+    throttle_classes = [NationalIDRateThrottle]
+    throttle_scope = "stats"
+
+    def get(self, request):
+        group_by = [field for field in request.query_params.get("group_by", "birth_year").split(",") if field]
+        unknown = [field for field in group_by if field not in GROUP_FIELDS]
+        if unknown or len(set(group_by)) != len(group_by):
+            return Response({"error": f"group_by must be distinct fields among {', '.join(GROUP_FIELDS)}."}, status=400)
+
+        filters = {}
+        for field in GROUP_FIELDS:
+            value = request.query_params.get(field)
+            if value in (None, ""):
+                continue
+            if field in ("gender", "governorate"):
+                filters[field] = value
+            elif value.isdigit():
+                filters[field] = int(value)
+            else:
+                return Response({"error": f"{field} must be an integer."}, status=400)
+
+        buckets, total = distribution(group_by, filters)
+        return Response({"total": total, "group_by": group_by, "buckets": buckets})
+
+
+class ExportView(APIView):
+    """
+    Streams every stored row of a dataset ("national-ids" or "api-logs") as CSV
+    or NDJSON, in primary key order, filtered by the query parameters listed in
+    `exports.EXPORTS`. Pass the id of the last row received as `after` to resume.
+    """
+    permission_classes = [CachedHasAPIKey]
+    throttle_classes = [NationalIDRateThrottle]
+    throttle_scope = "export"
+
+    def get(self, request, dataset, file_format):
+        export = EXPORTS.get(dataset)
+        if export is None or file_format not in FORMATS:
+            return Response({"error": f"Unknown export '{dataset}.{file_format}'."}, status=404)
+        try:
+            queryset = export_queryset(export, request.query_params, after=request.query_params.get("after"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        response = StreamingHttpResponse(ExportStream(queryset, export.fields, file_format), content_type=FORMATS[file_format])
+        response["Content-Disposition"] = f'attachment; filename="{dataset}.{file_format}"'
+        return response
+
+
+class NationalIDBatchValidatorView(InstrumentedAPIView):
+    """
+    API view for validating and extracting information from many Egyptian National IDs at once.
+    Accepts a JSON array, an NDJSON body or a MessagePack array, where every item is either
+    a national ID string or an object with a "national_id" key, or a packed body of
+    concatenated 14-byte IDs. Results are returned in request order, as one list per field
+    when the response is MessagePack.
+    Rate limited per IP address and per API key (NATIONAL_ID_RATE_LIMITS).
+    """
+    permission_classes = [CachedHasAPIKey]
+    throttle_classes = [NationalIDRateThrottle]
+    throttle_scope = "national_id_batch"
+    parser_classes = [JSONParser, NDJSONParser, MessagePackParser, PackedNationalIDParser]
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, (list, PackedNationalIDs)) or not items:
+            return Response({"error": "Request body must be a non-empty list of national IDs."}, status=400)
+
+        max_size = getattr(settings, "NATIONAL_ID_BATCH_MAX_SIZE", 10000)
+        if len(items) > max_size:
+            return Response({"error": f"Batch size exceeds the maximum of {max_size} national IDs."}, status=400)
+
+        # Validate every item, remembering the extracted data of the valid ones
+        if isinstance(items, PackedNationalIDs):
+            national_ids = list(items)
+            with timed("national_id_batch", "validate"):
+                validations = items.validate()
+        else:
+            national_ids = [item.get("national_id") if isinstance(item, dict) else item for item in items]
+            with timed("national_id_batch", "validate"):
+                validations = validate_many(national_ids)
+        count_validations("national_id_batch", [error_message for is_valid, error_message in validations])
+        errors = {}
+        extracted = {}
+        with timed("national_id_batch", "extract"):
+            for index, (national_id, (is_valid, error_message)) in enumerate(zip(national_ids, validations)):
+                if not is_valid:
+                    errors[index] = error_message
+                elif national_id not in extracted:
+                    extracted[national_id] = extract_info(national_id)
+
+        # Log every valid item in a single insert
+        with timed("national_id_batch", "log"):
+            log_api_calls(
+                request.META.get("REMOTE_ADDR"),
+                [national_id for index, national_id in enumerate(national_ids) if index not in errors],
+            )
+
+        # Save extracted data in a single insert, keeping rows that already exist
+        with timed("national_id_batch", "save"):
+            egy_infos = save_national_id_infos(extracted)[0]
+
+        def results():
+            """Results in request order, serialized one at a time."""
+            for index, national_id in enumerate(national_ids):
+                if index in errors:
+                    yield {"national_id": national_id, "error": errors[index]}
+                else:
+                    yield {"national_id": national_id, "data": national_id_info_to_dict(egy_infos[national_id])}
+
+        message = {"message": "Data processed successfully."}
+        if request.accepted_renderer.format == MessagePackRenderer.format:
+            with timed("national_id_batch", "serialize"):
+                return Response({"columns": batch_results_to_columns(national_ids, errors, egy_infos), **message})
+        # Large responses are encoded while they are sent rather than built in memory
+        if len(national_ids) >= getattr(settings, "NATIONAL_ID_BATCH_STREAM_THRESHOLD", 1000):
+            return StreamingHttpResponse(stream_json_list("results", results(), message), content_type="application/json")
+        with timed("national_id_batch", "serialize"):
+            return Response({"results": list(results()), **message}, status=200)
+
+
+@csrf_exempt
+@require_POST
+async def national_id_async(request):
+    """
+    Async (ASGI) version of NationalIDValidatorView with the same request and response contract.
+    Validation runs inline on the event loop; database access uses the async ORM.
+    Rate limited per IP address and per API key (NATIONAL_ID_RATE_LIMITS).
+    """
+    with timed("national_id_async", "request"):
+        return await _national_id_async(request)
+
+
+async def _national_id_async(request):
+    with timed("national_id_async", "api_key"):
+        has_permission = await CachedHasAPIKey().ahas_permission(request)
+    if not has_permission:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=403)
+
+    # Checked after the API key, like DRF's throttles
+    with timed("national_id_async", "rate_limit"):
+        retry_after = await acheck_rate_limits(request, "national_id_async")
+    if retry_after is not None:
+        return throttled_response(retry_after)
+
+    try:
+        body = json.loads(request.body)
+    except ValueError as exc:
+        return JsonResponse({"detail": f"JSON parse error - {exc}"}, status=400)
+    national_id = body.get("national_id") if isinstance(body, dict) else None
+
+    # Repeat lookups are served from the result cache
+    result_cache = get_result_cache()
+    with timed("national_id_async", "result_cache"):
+        data = await result_cache.aget(national_id) if result_cache is not None and isinstance(national_id, str) else None
+
+    if data is None:
+        with timed("national_id_async", "validate"):
+            is_valid, error_message = validate_national_id(national_id) if isinstance(national_id, str) else (
+                False, "Invalid format: National ID must be 14 digits."
+            )
+        count_validations("national_id_async", [error_message])
+        if not is_valid:
+            return JsonResponse({"error": error_message}, status=400)
+
+        # Extract data
+        with timed("national_id_async", "extract"):
+            extracted_data = extract_info(national_id)
 
         # Save extracted data to the model
-        egy_info, created = EGYNationalIDInfo.objects.get_or_create(
-            national_id=national_id,
-            defaults={
-                "birth_year": extracted_data["birth_year"],
-                "birth_month": extracted_data["birth_month"],
-                "birth_day": extracted_data["birth_day"],
-            },
-        )
+        with timed("national_id_async", "save"):
+            egy_info, created = await aget_or_create_national_id_info(national_id, extracted_data)
 
-        # Serialize and return data
-        egy_info_serializer = EGYNationalIDInfoSerializer(egy_info)
+        # Serialize data
+        with timed("national_id_async", "serialize"):
+            data = national_id_info_to_dict(egy_info)
+        if result_cache is not None:
+            await result_cache.aset(national_id, data)
 
-        return Response({
-            "data": egy_info_serializer.data,
+    # Log API call
+    with timed("national_id_async", "log"):
+        await alog_api_call(request.META.get("REMOTE_ADDR"), national_id)
+
+    with timed("national_id_async", "render"):
+        return JsonResponse({
+            "data": data,
             "message": "Data processed successfully.",
         }, status=200)
+
+
+class MetricsView(APIView):
+    """
+    Prometheus metrics of this process: stage durations of the national ID
+    endpoints and validation outcomes by error type (NATIONAL_ID_METRICS).
+    """
+    permission_classes = [CachedHasAPIKey]
+
+    def get(self, request):
+        metrics = get_metrics()
+        return HttpResponse(
+            metrics.render() if metrics is not None else "",
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -0,0 +1,62 @@
+"""
+Latency of API key authentication with and without the verified-key cache.
+
+Requests go to the cheapest authenticated endpoint (the result cache stats), so
+the difference between the runs is the cost of verifying the key: a database
+lookup by prefix plus hashing the key. "legacy_hasher" stores the key with
+Django's default password hasher (PBKDF2), as keys created by older versions of
+djangorestframework-api-key are, and keeps it that way between requests.
+
+Run from the project directory:  python -m benchmarks.bench_api_key [--requests N]
+"""
+import argparse
+import json
+import time
+from unittest.mock import patch
+
+from benchmarks.common import api_key, setup_django, summarize
+
+
+def run(authorization, requests):
+    from django.test import Client
+
+    client = Client()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        response = client.get("/api/national-id/cache/stats/", HTTP_AUTHORIZATION=authorization)
+        latencies.append(time.perf_counter() - request_started)
+        assert response.status_code == 200, response.content
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.hashers import make_password
+    from django.test.utils import override_settings
+    from rest_framework_api_key.models import APIKey
+
+    authorization = api_key()
+    legacy_authorization = api_key()
+    key = legacy_authorization.partition(" ")[2]
+    APIKey.objects.filter(prefix=key.partition(".")[0]).update(hashed_key=make_password(key))
+
+    results = {}
+    # Verifying a legacy hash upgrades it to the fast hasher on save; skip the save
+    with patch.object(APIKey, "save"):
+        for name, enabled in (("uncached", False), ("cached", True)):
+            with override_settings(NATIONAL_ID_API_KEY_CACHE={"ENABLED": enabled}):
+                results[f"legacy_hasher_{name}"] = run(legacy_authorization, max(args.requests // 10, 100))
+    for name, enabled in (("uncached", False), ("cached", True)):
+        with override_settings(NATIONAL_ID_API_KEY_CACHE={"ENABLED": enabled}):
+            results[name] = run(authorization, args.requests)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
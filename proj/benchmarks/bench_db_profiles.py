@@ -0,0 +1,100 @@
+"""
+Write throughput of the validator endpoint under each database profile.
+
+Concurrent clients POST distinct valid national IDs to /api/national-id/, so
+every request inserts an EGYNationalIDInfo row and an APILog row. Each profile
+runs in its own process, configured only through the environment as in
+production: SQLite with its defaults ("sqlite_default"), SQLite with WAL,
+synchronous=NORMAL, a busy timeout and mmap ("sqlite_tuned") and, with
+--postgresql, PostgreSQL with persistent connections ("postgresql_persistent")
+and with a psycopg connection pool ("postgresql_pooled"). PostgreSQL profiles
+connect with the DB_* environment variables and use a test database that is
+dropped afterwards.
+
+Run from the project directory:  python -m benchmarks.bench_db_profiles [--requests N] [--threads N] [--postgresql]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import api_key, setup_django, summarize, valid_national_ids
+
+
+PROFILES = {
+    "sqlite_default": {"DB_ENGINE": "sqlite", "SQLITE_TUNING": "0"},
+    "sqlite_tuned": {"DB_ENGINE": "sqlite", "SQLITE_TUNING": "1"},
+    "postgresql_persistent": {"DB_ENGINE": "postgresql", "DB_POOL": "0", "DB_CONN_MAX_AGE": "60"},
+    "postgresql_pooled": {"DB_ENGINE": "postgresql", "DB_POOL": "1"},
+}
+
+
+def run(requests, threads):
+    """
+    Sends `requests` validator requests from `threads` threads, each with its
+    own database connection, and returns the throughput and latencies.
+    """
+    setup_django(NATIONAL_ID_RESULT_CACHE={"ENABLED": False})
+    from django.db import connection
+    from django.test import Client
+
+    authorization = api_key()
+    national_ids = valid_national_ids(requests)
+    latencies = []
+    errors = []
+
+    def client(national_ids):
+        try:
+            http = Client()
+            for national_id in national_ids:
+                request_started = time.perf_counter()
+                response = http.post(
+                    "/api/national-id/", {"national_id": national_id}, HTTP_AUTHORIZATION=authorization,
+                )
+                latencies.append(time.perf_counter() - request_started)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=client, args=(national_ids[index::threads],)) for index in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    result = summarize(latencies, time.perf_counter() - started)
+    result["errors"] = len(errors)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--postgresql", action="store_true", help="Also run the PostgreSQL profiles.")
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run(args.requests, args.threads)))
+        return
+
+    results = {}
+    for name, environ in PROFILES.items():
+        if name.startswith("postgresql") and not args.postgresql:
+            continue
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_profiles", "--profile", name,
+             "--requests", str(args.requests), "--threads", str(args.threads)],
+            env={**os.environ, **environ}, capture_output=True, text=True, check=True,
+        ).stdout
+        results[name] = json.loads(output.splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Microbenchmark of the per-call logging overhead of `validate_national_id`.
+
+"before" replays the logging the validator used to do on every call (three INFO
+f-strings through the root logger configured by `logging.basicConfig`), "after"
+is the validator's current level-guarded logging.
+
+Run from the project directory:  python -m benchmarks.bench_logging
+"""
+import logging
+import os
+import timeit
+
+from National_ID_Processing.helpers import validate_national_id
+
+
+NATIONAL_ID = "29001011234567"
+NUMBER = 100_000
+
+
+def legacy_logging(national_id):
+    """The logging calls `validate_national_id` made for a valid ID before."""
+    logging.info(f"Validating National ID: {national_id}")
+    logging.info(f"Gender: {'male'}")
+    logging.info("National ID is valid.")
+
+
+def per_call_us(statement):
+    return min(timeit.repeat(statement, number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+def main():
+    with open(os.devnull, "w") as devnull:
+        logging.basicConfig(stream=devnull, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+        root = logging.getLogger()
+        logging.getLogger("National_ID_Processing").setLevel(logging.WARNING)
+
+        validate = per_call_us(lambda: validate_national_id(NATIONAL_ID))
+        root.setLevel(logging.INFO)
+        legacy_emitted = per_call_us(lambda: legacy_logging(NATIONAL_ID))
+        root.setLevel(logging.WARNING)
+        legacy_filtered = per_call_us(lambda: legacy_logging(NATIONAL_ID))
+
+    print(f"validate_national_id (after, INFO filtered):  {validate:8.2f} us/call")
+    print(f"before, INFO emitted:                          {validate + legacy_emitted:8.2f} us/call "
+          f"(+{legacy_emitted:.2f} us logging)")
+    print(f"before, INFO filtered:                         {validate + legacy_filtered:8.2f} us/call "
+          f"(+{legacy_filtered:.2f} us logging)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Microbenchmark of the per-request overhead of the rate limiter.
+
+Each request is checked against the per-IP and per-API-key limits, from 100
+client IPs sharing one API key, with limits high enough that every request is
+allowed. "exact" writes every hit through to the shared cache (SYNC_INTERVAL 0),
+"batched" counts hits locally and syncs them every second. Both are measured on
+the local-memory cache and on the database cache used as the shared store.
+
+Run from the project directory:  python -m benchmarks.bench_ratelimit [--requests N]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import setup_django
+
+
+def per_request_us(cache_alias, sync_interval, requests):
+    from django.test import RequestFactory
+    from django.test.utils import override_settings
+    from National_ID_Processing.ratelimit import check_rate_limits
+
+    factory = RequestFactory()
+    clients = [
+        factory.post("/", REMOTE_ADDR=f"10.0.0.{index}", HTTP_AUTHORIZATION="Api-Key benchmark.secret")
+        for index in range(100)
+    ]
+    options = {
+        "CACHE_ALIAS": cache_alias,
+        "SYNC_INTERVAL": sync_interval,
+        "RATES": {"ip": "1000000/m", "api_key": "1000000/m"},
+    }
+    with override_settings(NATIONAL_ID_RATE_LIMITS=options):
+        started = time.perf_counter()
+        for index in range(requests):
+            assert check_rate_limits(clients[index % len(clients)], "benchmark") is None
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    results = {
+        f"{store}_{mode}_us": round(per_request_us(cache_alias, sync_interval, args.requests), 2)
+        for store, cache_alias in (("locmem", "default"), ("database", "shared"))
+        for mode, sync_interval in (("exact", 0), ("batched", 1.0))
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
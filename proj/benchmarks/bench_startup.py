@@ -0,0 +1,144 @@
+"""
+Cold start time of the validator: imports measured with python -X importtime.
+
+Each target is run --runs times in a fresh interpreter with -X importtime:
+importing the helpers alone (as a batch job does), django.setup() with the full
+settings and with the API-only profile (proj.settings_api), and django.setup()
+followed by loading the URLconf (which imports the views), the point at which a
+worker can serve its first request. For each target the fastest run is kept:
+the sum of the self times reported by -X importtime, the wall time of the
+interpreter and the number of modules loaded.
+
+Results are written as JSON (by default to benchmarks/results/startup-<commit>.json).
+Pass --compare with an earlier results file to print the change of every
+target; the exit status is 1 when one got slower by more than --threshold, or
+when the import time of the API worker exceeds --max-ms.
+
+Run from the project directory:  python -m benchmarks.bench_startup [--compare benchmarks/results/startup-<commit>.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.suite import RESULTS_DIR, git_commit
+
+
+SETUP = "import django; django.setup()"
+READY = SETUP + "; from django.urls import get_resolver; get_resolver().url_patterns"
+# name: (settings module, code)
+TARGETS = {
+    "helpers": (None, "import National_ID_Processing.helpers"),
+    "setup": ("proj.settings", SETUP),
+    "setup_api": ("proj.settings_api", SETUP),
+    "ready": ("proj.settings", READY),
+    "ready_api": ("proj.settings_api", READY),
+}
+BUDGETED_TARGET = "ready_api"
+
+
+def run_once(settings_module, code):
+    """
+    Runs `code` in a new interpreter and returns its import time (ms), wall time
+    (ms) and number of loaded modules.
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    if settings_module:
+        env["DJANGO_SETTINGS_MODULE"] = settings_module
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{code}; import sys; print(len(sys.modules))"],
+        capture_output=True, text=True, check=True, env=env,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    import_us = sum(
+        int(line.split(":", 1)[1].split("|")[0])
+        for line in completed.stderr.splitlines()
+        if line.startswith("import time:") and not line.rstrip().endswith("imported package")
+    )
+    return {"import_ms": import_us / 1000, "wall_ms": wall_ms, "modules": int(completed.stdout.split()[-1])}
+
+
+def measure(runs):
+    """
+    Runs every target `runs` times, interleaved so that background load affects
+    them alike, and keeps the fastest time of each.
+    """
+    samples = {name: [] for name in TARGETS}
+    for _ in range(runs):
+        for name, (settings_module, code) in TARGETS.items():
+            samples[name].append(run_once(settings_module, code))
+    return {
+        name: {metric: min(sample[metric] for sample in target_samples) for metric in ("import_ms", "wall_ms", "modules")}
+        for name, target_samples in samples.items()
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change of every target against `baseline` and returns the names
+    of those whose import or wall time grew by more than `threshold` (a fraction).
+    """
+    regressions = []
+    print(f"Compared with {baseline['commit']} ({baseline['created_at']}):")
+    for name, after in results["targets"].items():
+        before = baseline["targets"].get(name)
+        if not before:
+            print(f"  {name:12} {after['import_ms']:9.1f} ms  (new)")
+            continue
+        for metric in ("import_ms", "wall_ms"):
+            change = after[metric] / before[metric] - 1
+            slower = change > threshold
+            if slower:
+                regressions.append(f"{name}.{metric}")
+            print(f"  {name + '.' + metric:22} {before[metric]:9.1f} -> {after[metric]:9.1f}  {change:+7.1%}"
+                  f"{'  REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Interpreters started per target; the fastest is kept.")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/startup-<commit>.json).")
+    parser.add_argument("--compare", help="Earlier results file to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown reported as a regression (default: 0.1).")
+    parser.add_argument("--max-ms", type=float, help=f"Import time budget of the {BUDGETED_TARGET} target.")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "targets": measure(args.runs),
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+    import_ms = results["targets"][BUDGETED_TARGET]["import_ms"]
+    if args.max_ms is not None and import_ms > args.max_ms:
+        print(f"{BUDGETED_TARGET} imports took {import_ms:.1f} ms, over the budget of {args.max_ms:.1f} ms")
+        regressions.append(f"{BUDGETED_TARGET}.budget")
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Size and lookup latency of the national ID table before and after compact storage.
+
+Fills the EGYNationalIDInfo table as of migration 0005 (text national ID,
+separate birth year, month and day columns) with --rows synthetic IDs, measures
+the table and index sizes and the latency of lookups by national ID, applies the
+compact storage migrations (integer national ID, packed birth date) and measures
+again. After the migration, lookups are also timed through
+`get_or_create_national_id_info`, the path of the validator view.
+
+Run from the project directory:  python -m benchmarks.bench_storage [--rows N] [--lookups N]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+from benchmarks.common import setup_django, summarize, valid_national_ids
+
+
+OLD_SCHEMA = ("National_ID_Processing", "0005_egynationalidinfostats")
+
+
+def sizes(connection, table):
+    """Bytes used by the table and by each of its indexes."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("VACUUM")
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s", [table])
+            indexes = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+            pages = dict(cursor.fetchall())
+            return {"table": pages[table], "indexes": {index: pages[index] for index in indexes}}
+        cursor.execute(f"VACUUM FULL ANALYZE {table}")
+        cursor.execute("SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = %s::regclass", [table])
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT pg_relation_size(%s)", [table])
+        result = {"table": cursor.fetchone()[0], "indexes": {}}
+        for index in indexes:
+            cursor.execute("SELECT pg_relation_size(%s)", [index])
+            result["indexes"][index] = cursor.fetchone()[0]
+        return result
+
+
+def time_lookups(lookup, keys):
+    latencies = []
+    started = time.perf_counter()
+    for key in keys:
+        lookup_started = time.perf_counter()
+        lookup(key)
+        latencies.append(time.perf_counter() - lookup_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def time_select(connection, table, keys):
+    """Latency of `SELECT * ... WHERE national_id = %s`, through the unique index."""
+    with connection.cursor() as cursor:
+        def lookup(key):
+            cursor.execute(f"SELECT * FROM {table} WHERE national_id = %s", [key])
+            assert cursor.fetchone() is not None
+        return time_lookups(lookup, keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django(NATIONAL_ID_RESULT_CACHE={"ENABLED": False})
+    from django.core.management import call_command
+    from django.db import connection
+    from National_ID_Processing.helpers import extract_info
+    from National_ID_Processing.models import EGYNationalIDInfo
+    from National_ID_Processing.repository import get_or_create_national_id_info
+
+    table = EGYNationalIDInfo._meta.db_table
+    call_command("migrate", *OLD_SCHEMA, verbosity=0)
+    national_ids = valid_national_ids(args.rows, seed=3)
+    random.Random(4).shuffle(national_ids)
+    now = datetime.now(timezone.utc)
+    with connection.cursor() as cursor:
+        for start in range(0, len(national_ids), 10000):
+            rows = []
+            for national_id in national_ids[start:start + 10000]:
+                info = extract_info(national_id)
+                rows.append((national_id, info["birth_year"], info["birth_month"], info["birth_day"],
+                             info["gender"], info["governorate"], now))
+            cursor.executemany(
+                f"INSERT INTO {table} (national_id, birth_year, birth_month, birth_day, gender, governorate, created_at) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)", rows,
+            )
+
+    keys = random.Random(5).choices(national_ids, k=args.lookups)
+    results = {"vendor": connection.vendor, "rows": args.rows}
+    results["before"] = {"sizes": sizes(connection, table), "select": time_select(connection, table, keys)}
+
+    started = time.perf_counter()
+    call_command("migrate", verbosity=0)
+    results["migration_seconds"] = time.perf_counter() - started
+
+    results["after"] = {
+        "sizes": sizes(connection, table),
+        "select": time_select(connection, table, [int(key) for key in keys]),
+        "get_or_create": time_lookups(lambda key: get_or_create_national_id_info(key, extract_info(key)), keys),
+    }
+    for state in ("before", "after"):
+        sizes_ = results[state]["sizes"]
+        sizes_["total"] = sizes_["table"] + sum(sizes_["indexes"].values())
+    results["total_size_ratio"] = results["after"]["sizes"]["total"] / results["before"]["sizes"]["total"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
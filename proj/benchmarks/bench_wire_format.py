@@ -0,0 +1,129 @@
+"""
+Throughput of the validator endpoints with JSON and MessagePack bodies.
+
+Drives /api/national-id/ with --requests single-ID requests and
+/api/national-id/batch/ with --rounds requests of --batch-size IDs, in-process
+through Django's test client, once per wire format: JSON in and out (rows, and
+streamed for large batches), MessagePack in and out (columns), and for batches a
+packed body of 14-byte IDs with a MessagePack response. Every batch round sends
+the same IDs, stored by a warm-up request, so that only the wire format varies.
+Also times parsing and rendering alone for a batch, without the view, and reports
+the body sizes.
+
+Run from the project directory:  python -m benchmarks.bench_wire_format [--requests N] [--batch-size N] [--rounds N]
+"""
+import argparse
+import io
+import json
+import time
+
+import msgpack
+
+from benchmarks.common import api_key, setup_django, summarize, valid_national_ids
+
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+PACKED = "application/x-packed-national-ids"
+
+
+def encode(content_type, national_ids, single=False):
+    if single:
+        body = {"national_id": national_ids}
+        return json.dumps(body) if content_type == JSON else msgpack.packb(body)
+    if content_type == PACKED:
+        return "".join(national_ids).encode("ascii")
+    return json.dumps(national_ids) if content_type == JSON else msgpack.packb(national_ids)
+
+
+def send(client, url, body, content_type, accept, authorization):
+    """Posts `body` and returns the time until the whole response was read and its size."""
+    started = time.perf_counter()
+    response = client.post(url, body, content_type=content_type, HTTP_ACCEPT=accept, HTTP_AUTHORIZATION=authorization)
+    content = b"".join(response.streaming_content) if response.streaming else response.content
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, content[:200]
+    return elapsed, len(content)
+
+
+def run(client, url, bodies, content_type, accept, authorization):
+    latencies, sizes = [], []
+    started = time.perf_counter()
+    for body in bodies:
+        elapsed, size = send(client, url, body, content_type, accept, authorization)
+        latencies.append(elapsed)
+        sizes.append(size)
+    results = summarize(latencies, time.perf_counter() - started)
+    results["request_bytes"] = len(bodies[0])
+    results["response_bytes"] = sizes[0]
+    return results
+
+
+def codec_times(national_ids, rounds):
+    """
+    Parse and render times (ms) of a batch, without the view or the building of
+    the result dicts, which both layouts share.
+    """
+    from django.test import RequestFactory
+    from rest_framework.parsers import JSONParser
+    from National_ID_Processing.parsers import MessagePackParser, PackedNationalIDParser
+    from National_ID_Processing.renderers import MessagePackRenderer, ORJSONRenderer
+    from National_ID_Processing.serializers import batch_results_to_columns, national_id_info_to_dict
+    from National_ID_Processing.models import EGYNationalIDInfo
+
+    infos = EGYNationalIDInfo.objects.in_bulk(national_ids, field_name="national_id")
+    rows = {"results": [{"national_id": national_id, "data": national_id_info_to_dict(infos[national_id])}
+                        for national_id in national_ids]}
+    columns = {"columns": batch_results_to_columns(national_ids, {}, infos)}
+    parser_context = {"request": RequestFactory().post("/"), "encoding": "utf-8"}
+
+    def best(function):
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    bodies = {content_type: encode(content_type, national_ids) for content_type in (JSON, MSGPACK, PACKED)}
+    bodies[JSON] = bodies[JSON].encode()
+    return {
+        "parse_json_ms": best(lambda: JSONParser().parse(io.BytesIO(bodies[JSON]), JSON, parser_context)),
+        "parse_msgpack_ms": best(lambda: MessagePackParser().parse(io.BytesIO(bodies[MSGPACK]))),
+        "parse_packed_ms": best(lambda: list(PackedNationalIDParser().parse(io.BytesIO(bodies[PACKED])))),
+        "render_json_rows_ms": best(lambda: ORJSONRenderer().render(rows)),
+        "render_msgpack_columns_ms": best(lambda: MessagePackRenderer().render(columns)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="Single-ID requests per format.")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=10, help="Batch requests per format.")
+    args = parser.parse_args()
+
+    setup_django(NATIONAL_ID_RESULT_CACHE={"ENABLED": False}, NATIONAL_ID_BATCH_MAX_SIZE=args.batch_size)
+    from django.test import Client
+
+    client = Client()
+    authorization = api_key()
+    single_ids = valid_national_ids(args.requests * 2, seed=7)
+    batch_ids = valid_national_ids(args.batch_size, seed=8)
+    send(client, "/api/national-id/batch/", encode(PACKED, batch_ids), PACKED, JSON, authorization)  # warm-up
+
+    results = {"single": {}, "batch": {}}
+    for index, (content_type, accept) in enumerate(((JSON, JSON), (MSGPACK, MSGPACK))):
+        bodies = [encode(content_type, national_id, single=True)
+                  for national_id in single_ids[index * args.requests:(index + 1) * args.requests]]
+        results["single"][content_type] = run(client, "/api/national-id/", bodies, content_type, accept, authorization)
+    for content_type, accept in ((JSON, JSON), (MSGPACK, MSGPACK), (PACKED, MSGPACK)):
+        bodies = [encode(content_type, batch_ids)] * args.rounds
+        results["batch"][content_type] = run(client, "/api/national-id/batch/", bodies, content_type, accept, authorization)
+        results["batch"][content_type]["ids_per_second"] = args.batch_size * results["batch"][content_type]["throughput_rps"]
+    results["codec"] = codec_times(batch_ids, args.rounds)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
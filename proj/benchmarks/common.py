@@ -0,0 +1,116 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import atexit
+import os
+import random
+import statistics
+import tempfile
+
+from National_ID_Processing.governorates import GOVERNORATES, check_digit
+
+
+def setup_django(**overrides):
+    """
+    Configures Django against a fresh, migrated database (with the shared cache
+    table), with rate limiting disabled: an SQLite file in a temporary directory,
+    or a test database next to the configured PostgreSQL one (dropped on exit).
+    `overrides` replace settings.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "proj.settings")
+    import django
+    from django.conf import settings
+
+    sqlite = settings.DATABASES["default"]["ENGINE"].endswith("sqlite3")
+    if sqlite:
+        settings.DATABASES["default"]["NAME"] = os.path.join(tempfile.mkdtemp(prefix="national-id-bench-"), "db.sqlite3")
+    settings.NATIONAL_ID_RATE_LIMITS = {"ENABLED": False}
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["testserver"]
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connection
+    if sqlite:
+        call_command("migrate", verbosity=0)
+        call_command("createcachetable", verbosity=0)
+    else:
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        @atexit.register
+        def drop_test_db():
+            connection.close()
+            if hasattr(connection, "close_pool"):
+                connection.close_pool()  # pooled connections would keep the database in use
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def api_key():
+    """
+    Creates an API key and returns the Authorization header value.
+    """
+    from rest_framework_api_key.models import APIKey
+
+    _, key = APIKey.objects.create_key(name="benchmark")
+    return f"Api-Key {key}"
+
+
+def valid_national_ids(count, seed=0):
+    """
+    Returns `count` distinct valid national IDs born between 1950 and 2019.
+    """
+    rng = random.Random(seed)
+    governorate_codes = [code for code, name in enumerate(GOVERNORATES) if name is not None]
+    national_ids = set()
+    while len(national_ids) < count:
+        year = rng.randint(1950, 2019)
+        prefix = (
+            f"{2 if year < 2000 else 3}{year % 100:02d}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+            f"{rng.choice(governorate_codes):02d}{rng.randint(0, 9999):04d}"
+        )
+        national_ids.add(prefix + str(check_digit(prefix)))
+    return sorted(national_ids)
+
+
+def invalid_national_ids(count, seed=0):
+    """
+    Returns `count` invalid national IDs, cycling through every validation
+    error: bad format, century digit, month, day, February 29 on a non-leap
+    year, governorate code, check digit and a future birth date.
+    """
+    rng = random.Random(seed)
+    unassigned_code = next(code for code, name in enumerate(GOVERNORATES) if name is None)
+
+    def with_check_digit(prefix):
+        return prefix + str(check_digit(prefix))
+
+    corruptions = [
+        lambda national_id: national_id[:13],
+        lambda national_id: national_id[:12] + "X" + national_id[13],
+        lambda national_id: "4" + national_id[1:],
+        lambda national_id: with_check_digit(national_id[:3] + "13" + national_id[5:13]),
+        lambda national_id: with_check_digit(national_id[:5] + "32" + national_id[7:13]),
+        lambda national_id: with_check_digit("2010229" + national_id[7:13]),
+        lambda national_id: with_check_digit(national_id[:7] + f"{unassigned_code:02d}" + national_id[9:13]),
+        lambda national_id: national_id[:13] + str((int(national_id[13]) + 1) % 10),
+        lambda national_id: with_check_digit("399" + national_id[3:13]),
+    ]
+    valid = valid_national_ids(count, seed=rng.randrange(2 ** 32))
+    return [corruptions[index % len(corruptions)](national_id) for index, national_id in enumerate(valid)]
+
+
+def summarize(latencies, elapsed):
+    """
+    Returns throughput and latency percentiles (in milliseconds) for a run.
+    """
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
@@ -0,0 +1,78 @@
+"""
+Load test comparing the async (ASGI) national ID endpoint with the WSGI one.
+
+Both paths are driven in-process through Django's test clients: the WSGI view
+from a thread pool (one thread per in-flight request, like a threaded worker)
+and the async view from concurrent tasks on one event loop. Every request uses
+a distinct national ID, so each one validates, writes APILog and inserts an
+EGYNationalIDInfo row.
+
+Run from the project directory:  python -m benchmarks.load_asgi [--requests N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import api_key, setup_django, summarize, valid_national_ids
+
+
+def run_wsgi(national_ids, authorization, concurrency):
+    from django.test import Client
+
+    def call(national_id):
+        started = time.perf_counter()
+        response = Client().post(
+            "/api/national-id/", {"national_id": national_id}, content_type="application/json",
+            HTTP_AUTHORIZATION=authorization,
+        )
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(call, national_ids))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def run_asgi(national_ids, authorization, concurrency):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(national_id):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/national-id/async/", {"national_id": national_id}, content_type="application/json",
+                headers={"Authorization": authorization},
+            )
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(call(national_id) for national_id in national_ids))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    setup_django(NATIONAL_ID_RESULT_CACHE={"ENABLED": False})
+    authorization = api_key()
+    national_ids = valid_national_ids(2 * args.requests)
+
+    results = {
+        "wsgi": run_wsgi(national_ids[:args.requests], authorization, args.concurrency),
+        "asgi": asyncio.run(run_asgi(national_ids[args.requests:], authorization, args.concurrency)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmark suite for the validator stack, with results saved for comparison.
+
+Microbenchmarks time the helpers, the vectorized batch validator and the
+serializers on seeded synthetic valid and invalid national IDs, reporting the
+min / median / mean / stddev time per call over several rounds (like
+pytest-benchmark). The load test then drives /api/national-id/ in-process
+through Django's test client from a pool of threads, with a mix of new, repeated
+and invalid IDs, and reports throughput and p50/p95/p99 latencies.
+
+Results are written as JSON (by default to benchmarks/results/<commit>.json).
+Pass --compare with an earlier results file to print the change of every
+benchmark (the fastest round of microbenchmarks, the least noisy); the exit
+status is 1 when one got slower by more than --threshold.
+
+Run from the project directory:  python -m benchmarks.suite [--compare benchmarks/results/<commit>.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.common import api_key, invalid_national_ids, setup_django, summarize, valid_national_ids
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+ROUNDS = 7
+
+
+def time_per_call(function, rounds=ROUNDS):
+    """
+    Returns per-call statistics in microseconds, calibrating the number of
+    calls per round so that every round takes at least 0.2 seconds.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    samples = [elapsed / number * 1e6 for elapsed in timer.repeat(repeat=rounds, number=number)]
+    return {
+        "min_us": min(samples),
+        "median_us": statistics.median(samples),
+        "mean_us": statistics.mean(samples),
+        "stddev_us": statistics.stdev(samples),
+        "rounds": rounds,
+        "calls_per_round": number,
+    }
+
+
+def microbenchmarks(count):
+    from National_ID_Processing.helpers import extract_info, validate_national_id
+    from National_ID_Processing.models import APILog, EGYNationalIDInfo
+    from National_ID_Processing.renderers import ORJSONRenderer
+    from National_ID_Processing.serializers import APILogSerializer, EGYNationalIDInfoSerializer, national_id_info_to_dict
+    from rest_framework.renderers import JSONRenderer
+    from National_ID_Processing.vectorized import validate_national_ids
+
+    valid = valid_national_ids(count, seed=1)
+    invalid = invalid_national_ids(count, seed=2)
+    infos = [EGYNationalIDInfo.from_info(national_id, extract_info(national_id)) for national_id in valid[:100]]
+    for info in infos:
+        info.created_at = datetime.now(timezone.utc)
+    log = APILog(id=1, ip_address="127.0.0.1", national_id=valid[0], timestamp=datetime.now(timezone.utc))
+
+    batch = {"results": [{"national_id": info.national_id, "data": national_id_info_to_dict(info)} for info in infos]}
+    next_valid, next_invalid = itertools.cycle(valid).__next__, itertools.cycle(invalid).__next__
+    return {
+        "validate_national_id_valid": time_per_call(lambda: validate_national_id(next_valid())),
+        "validate_national_id_invalid": time_per_call(lambda: validate_national_id(next_invalid())),
+        "extract_info": time_per_call(lambda: extract_info(next_valid())),
+        "validate_national_ids_batch_1000": time_per_call(lambda: validate_national_ids(valid[:1000])),
+        "serialize_national_id_info": time_per_call(lambda: EGYNationalIDInfoSerializer(infos[0]).data),
+        "serialize_national_id_info_many_100": time_per_call(lambda: EGYNationalIDInfoSerializer(infos, many=True).data),
+        "serialize_api_log": time_per_call(lambda: APILogSerializer(log).data),
+        "national_id_info_to_dict": time_per_call(lambda: national_id_info_to_dict(infos[0])),
+        "render_json_100": time_per_call(lambda: JSONRenderer().render(batch)),
+        "render_orjson_100": time_per_call(lambda: ORJSONRenderer().render(batch)),
+    }
+
+
+def load_test(requests, concurrency):
+    """
+    Sends `requests` POSTs to /api/national-id/ from `concurrency` threads:
+    half new valid IDs, a quarter repeats of earlier ones and a quarter invalid.
+    """
+    from django.db import connection
+    from django.test import Client
+
+    authorization = api_key()
+    valid = valid_national_ids(requests // 2, seed=3)
+    invalid = invalid_national_ids(requests // 4, seed=4)
+    national_ids = valid + valid[:requests // 4] + invalid
+    expected = {national_id: 200 for national_id in valid} | {national_id: 400 for national_id in invalid}
+
+    def call(national_id):
+        started = time.perf_counter()
+        response = Client().post(
+            "/api/national-id/", {"national_id": national_id}, content_type="application/json",
+            HTTP_AUTHORIZATION=authorization,
+        )
+        elapsed = time.perf_counter() - started
+        connection.close()
+        assert response.status_code == expected[national_id], response.content
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(call, national_ids))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change of every benchmark against `baseline` and returns the
+    names of those that got slower by more than `threshold` (a fraction).
+    """
+    checks = [(f"micro.{name}", "min_us", True) for name in results["micro"]]
+    checks += [("load.throughput_rps", "throughput_rps", False)]
+    checks += [(f"load.{metric}", metric, True) for metric in ("p50_ms", "p95_ms", "p99_ms")]
+
+    regressions = []
+    print(f"Compared with {baseline['commit']} ({baseline['created_at']}):")
+    for name, metric, lower_is_better in checks:
+        section, _, key = name.partition(".")
+        before = baseline.get(section, {}).get(key)
+        after = results[section].get(key)
+        if section == "micro":
+            before, after = before and before[metric], after[metric]
+        if not before:
+            print(f"  {name:45} {after:12.2f}  (new)")
+            continue
+        change = after / before - 1
+        slower = change > threshold if lower_is_better else change < -threshold
+        if slower:
+            regressions.append(name)
+        print(f"  {name:45} {before:12.2f} -> {after:12.2f}  {change:+7.1%}{'  REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ids", type=int, default=10000, help="Synthetic IDs per microbenchmark.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", help="Earlier results file to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown reported as a regression (default: 0.1).")
+    args = parser.parse_args()
+
+    setup_django(NATIONAL_ID_RESULT_CACHE={"ENABLED": False})
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "micro": microbenchmarks(args.ids),
+        "load": load_test(args.requests, args.concurrency),
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Python client of the national ID validator API, with a sync (`Client`) and an
+asyncio (`AsyncClient`) flavour:
+
+    from national_id_client import Client
+
+    with Client("https://validator.example.com", api_key) as client:
+        result = client.validate("29001011234564")
+        if result.is_valid:
+            print(result.data["governorate"])
+
+It only depends on the standard library and on the validation helpers of
+National_ID_Processing, which do not import Django.
+"""
+from .aio import AsyncClient
+from .base import APIError, ClientError, ValidationResult
+from .client import Client
+
+__all__ = ["APIError", "AsyncClient", "Client", "ClientError", "ValidationResult"]
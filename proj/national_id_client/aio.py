@@ -0,0 +1,195 @@
+import asyncio
+import ssl
+
+from .base import RETRY_STATUSES, BaseClient, ClientError
+
+
+# Errors of a kept-alive connection that the server closed while it was idle
+_STALE_CONNECTION_ERRORS = (ConnectionError, asyncio.IncompleteReadError)
+
+
+async def read_response(reader):
+    """
+    Reads an HTTP/1.1 response and returns its status, its headers (with
+    lowercase names), its body and whether the connection can be reused.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("The server closed the connection.")
+    version, status = status_line.decode("latin-1").split(None, 2)[:2]
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)  # CRLF
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass  # trailers
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return int(status), headers, bytes(body), keep_alive
+
+
+class AsyncClient(BaseClient):
+    """
+    asyncio client of the validator API, with the same behaviour as `Client`:
+    a pool of at most `max_connections` keep-alive connections (and requests in
+    flight), `validate` calls gathered into batch requests for up to
+    `batch_delay` seconds, `validate_many` batches sent concurrently, retries
+    after Retry-After or an exponential backoff, and local pre-validation.
+
+    Use it as an async context manager, or await `aclose`.
+    """
+
+    def __init__(self, base_url, api_key, **options):
+        super().__init__(base_url, api_key, **options)
+        self._idle = []
+        self._slots = asyncio.Semaphore(self.max_connections)
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def validate(self, national_id):
+        """
+        Validates one national ID and returns its ValidationResult, as part of
+        the next batch request.
+        """
+        result = self.check_locally(national_id)
+        if result is not None:
+            return result
+        if self._closed:
+            raise ClientError("The client is closed.")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((national_id, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+        return await future
+
+    async def validate_many(self, national_ids):
+        """
+        Validates many national IDs and returns their ValidationResults, in order.
+        """
+        national_ids = list(national_ids)
+        results, batches = self.plan(national_ids)
+        sent = await asyncio.gather(*(
+            self._post_batch([national_id for _, national_id in batch]) for batch in batches
+        ))
+        for batch, batch_results in zip(batches, sent):
+            for (index, _), result in zip(batch, batch_results):
+                results[index] = result
+        return results
+
+    async def aclose(self):
+        """
+        Sends the pending `validate` calls, then closes the connections.
+        """
+        self._closed = True
+        self._flush()
+        await asyncio.gather(*self._tasks)
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            await writer.wait_closed()
+
+    def _flush(self):
+        """Sends the pending `validate` calls, in batches of `batch_size`."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.batch_size):
+            task = asyncio.ensure_future(self._send_pending(pending[start:start + self.batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_pending(self, batch):
+        try:
+            results = await self._post_batch([national_id for national_id, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _post_batch(self, national_ids):
+        body = self.batch_body(national_ids)
+        attempt = 0
+        while True:
+            try:
+                status, headers, payload = await self._request("POST", self.BATCH_PATH, body)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                if attempt == self.max_retries:
+                    raise ClientError(f"Request to {self.host}:{self.port} failed: {exc!r}") from exc
+                delay = self.retry_delay(attempt)
+            else:
+                if status not in RETRY_STATUSES or attempt == self.max_retries:
+                    return self.batch_results(status, payload)
+                delay = self.retry_delay(attempt, headers.get("retry-after"))
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _connect(self):
+        self.connections_opened += 1
+        return await asyncio.open_connection(
+            self.host, self.port, ssl=ssl.create_default_context() if self.https else None,
+        )
+
+    async def _request(self, method, path, body):
+        """
+        Sends one request on a pooled connection and returns its status, its
+        headers and its body. A kept-alive connection closed by the server is
+        replaced once by a new one. As with the sockets of `Client`, `timeout`
+        applies to connecting and to the exchange, not to the wait for a free
+        connection.
+        """
+        async with self._slots:
+            reused = bool(self._idle)
+            reader, writer = self._idle.pop() if reused else await asyncio.wait_for(self._connect(), self.timeout)
+            try:
+                try:
+                    response = await asyncio.wait_for(self._send(reader, writer, method, path, body), self.timeout)
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    writer.close()
+                    reader, writer = await asyncio.wait_for(self._connect(), self.timeout)
+                    response = await asyncio.wait_for(self._send(reader, writer, method, path, body), self.timeout)
+            except BaseException:
+                writer.close()
+                raise
+            status, headers, payload, keep_alive = response
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, headers, payload
+
+    async def _send(self, reader, writer, method, path, body):
+        self.requests_sent += 1
+        head = [f"{method} {self.path_prefix}{path} HTTP/1.1"]
+        head += [f"{name}: {value}" for name, value in self.headers.items()]
+        head.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        return await read_response(reader)
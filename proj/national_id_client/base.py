@@ -0,0 +1,136 @@
+import json
+import time
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from National_ID_Processing.errors import ERROR_MESSAGES, INVALID_FORMAT
+from National_ID_Processing.helpers import validate_national_id
+
+
+# Responses retried after their Retry-After delay (or the backoff delay)
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class ClientError(Exception):
+    """The API could not be reached, even after retries."""
+
+
+class APIError(ClientError):
+    """The API answered with an error status; `payload` is its decoded body."""
+
+    def __init__(self, status, payload):
+        detail = payload.get("error") or payload.get("detail") if isinstance(payload, dict) else None
+        super().__init__(f"HTTP {status}: {detail or payload}")
+        self.status = status
+        self.payload = payload
+
+
+class ValidationResult(NamedTuple):
+    """
+    The result of one national ID: the extracted `data` of a valid ID, or the
+    `error` message of an invalid one. `local` is True when the ID was rejected
+    by the local pre-validation without asking the API.
+    """
+    national_id: object
+    data: dict = None
+    error: str = None
+    local: bool = False
+
+    @property
+    def is_valid(self):
+        return self.error is None
+
+
+class BaseClient:
+    """
+    Configuration and the transport-independent parts of the sync and asyncio
+    clients: local pre-validation, batch request bodies, response decoding and
+    retry delays.
+    """
+    BATCH_PATH = "/api/national-id/batch/"
+
+    def __init__(self, base_url, api_key, max_connections=10, timeout=10.0, batch_size=500, batch_delay=0.005,
+                 max_retries=3, backoff_factor=0.5, max_backoff=60.0, prevalidate=True):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Expected an http:// or https:// base URL, got '{base_url}'.")
+        if max_connections < 1 or batch_size < 1:
+            raise ValueError("max_connections and batch_size must be at least 1.")
+        self.https = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.https else 80)
+        self.path_prefix = url.path.rstrip("/")
+        self.headers = {
+            "Host": url.netloc,
+            "Authorization": f"Api-Key {api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.prevalidate = prevalidate
+        # Counters, for monitoring and tests
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    def check_locally(self, national_id):
+        """
+        Returns the result of an ID that is certainly invalid (it fails the same
+        checks as on the server), or None when the API has to be asked.
+        """
+        if not self.prevalidate:
+            return None
+        if not isinstance(national_id, str):
+            return ValidationResult(national_id, error=ERROR_MESSAGES[INVALID_FORMAT], local=True)
+        is_valid, error_message = validate_national_id(national_id)
+        return None if is_valid else ValidationResult(national_id, error=error_message, local=True)
+
+    def plan(self, national_ids):
+        """
+        Returns the results of `national_ids` with those rejected locally filled
+        in (None elsewhere), and the batches of (index, national ID) to send.
+        """
+        results = [self.check_locally(national_id) for national_id in national_ids]
+        remote = [(index, national_id) for index, national_id in enumerate(national_ids) if results[index] is None]
+        return results, [remote[start:start + self.batch_size] for start in range(0, len(remote), self.batch_size)]
+
+    def batch_body(self, national_ids):
+        return json.dumps(list(national_ids)).encode()
+
+    def batch_results(self, status, body):
+        """Decodes the response of a batch request, raising APIError on an error status."""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = body.decode("utf-8", "replace")
+        if status != 200:
+            raise APIError(status, payload)
+        return [
+            ValidationResult(result["national_id"], data=result.get("data"), error=result.get("error"))
+            for result in payload["results"]
+        ]
+
+    def retry_delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retry number `attempt` (from 0): the Retry-After
+        header (seconds or an HTTP date) when given, else an exponential backoff,
+        at most `max_backoff`.
+        """
+        delay = None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    pass
+        if delay is None:
+            delay = self.backoff_factor * 2 ** attempt
+        return min(max(delay, 0.0), self.max_backoff)
@@ -0,0 +1,176 @@
+import http.client
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .base import RETRY_STATUSES, BaseClient, ClientError
+
+
+# Errors of a kept-alive connection that the server closed while it was idle
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionError)
+
+
+class Client(BaseClient):
+    """
+    Thread-safe client of the validator API.
+
+    Requests go through a pool of at most `max_connections` keep-alive
+    connections, which also bounds the number of requests in flight. Calls to
+    `validate` from any number of threads are gathered for up to `batch_delay`
+    seconds (or until `batch_size` IDs are waiting) and sent as one batch
+    request; `validate_many` sends its IDs in batches of `batch_size`,
+    concurrently. Throttled (429) and unavailable (502, 503, 504) responses and
+    connection errors are retried up to `max_retries` times, after the
+    Retry-After delay when the server gives one. With `prevalidate`, IDs that
+    fail the local validation are answered without a request.
+
+    Use it as a context manager, or call `close`.
+    """
+
+    def __init__(self, base_url, api_key, **options):
+        super().__init__(base_url, api_key, **options)
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._executor = ThreadPoolExecutor(self.max_connections, thread_name_prefix="national-id-client")
+        self._pending = []
+        self._condition = threading.Condition()
+        self._batcher = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def validate(self, national_id, timeout=None):
+        """
+        Validates one national ID and returns its ValidationResult, as part of
+        the next batch request.
+        """
+        result = self.check_locally(national_id)
+        if result is not None:
+            return result
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise ClientError("The client is closed.")
+            self._pending.append((national_id, future))
+            if self._batcher is None:
+                self._batcher = threading.Thread(target=self._run_batcher, name="national-id-batcher", daemon=True)
+                self._batcher.start()
+            self._condition.notify()
+        return future.result(timeout)
+
+    def validate_many(self, national_ids):
+        """
+        Validates many national IDs and returns their ValidationResults, in order.
+        """
+        national_ids = list(national_ids)
+        results, batches = self.plan(national_ids)
+        sent = self._executor.map(self._post_batch, [[national_id for _, national_id in batch] for batch in batches])
+        for batch, batch_results in zip(batches, sent):
+            for (index, _), result in zip(batch, batch_results):
+                results[index] = result
+        return results
+
+    def close(self):
+        """
+        Sends the pending `validate` calls, then closes the connections.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._batcher is not None:
+            self._batcher.join()
+        self._executor.shutdown()
+        while self._idle:
+            self._idle.pop().close()
+
+    def _run_batcher(self):
+        """
+        Batcher thread: waits for a first pending call, then up to `batch_delay`
+        seconds for more, and hands the batch to the executor.
+        """
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self.batch_delay
+                while len(self._pending) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            self._executor.submit(self._send_pending, batch)
+
+    def _send_pending(self, batch):
+        try:
+            results = self._post_batch([national_id for national_id, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _post_batch(self, national_ids):
+        body = self.batch_body(national_ids)
+        attempt = 0
+        while True:
+            try:
+                status, retry_after, payload = self._request("POST", self.BATCH_PATH, body)
+            except (OSError, http.client.HTTPException) as exc:
+                if attempt == self.max_retries:
+                    raise ClientError(f"Request to {self.host}:{self.port} failed: {exc!r}") from exc
+                delay = self.retry_delay(attempt)
+            else:
+                if status not in RETRY_STATUSES or attempt == self.max_retries:
+                    return self.batch_results(status, payload)
+                delay = self.retry_delay(attempt, retry_after)
+            time.sleep(delay)
+            attempt += 1
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.connections_opened += 1
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method, path, body):
+        """
+        Sends one request on a pooled connection and returns its status, its
+        Retry-After header and its body. A kept-alive connection closed by the
+        server is replaced once by a new one.
+        """
+        with self._slots:
+            try:
+                connection, reused = self._idle.pop(), True
+            except IndexError:
+                connection, reused = self._connect(), False
+            try:
+                try:
+                    response = self._send(connection, method, path, body)
+                except _STALE_CONNECTION_ERRORS:
+                    if not reused:
+                        raise
+                    connection.close()
+                    connection = self._connect()
+                    response = self._send(connection, method, path, body)
+                payload = response.read()
+            except BaseException:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._idle.append(connection)
+            return response.status, response.getheader("Retry-After"), payload
+
+    def _send(self, connection, method, path, body):
+        self.requests_sent += 1
+        connection.request(method, self.path_prefix + path, body=body, headers=self.headers)
+        return connection.getresponse()
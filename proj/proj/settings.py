@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Load environment variables from the .env file
@@ -55,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'National_ID_Processing.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,10 +64,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'drf_api_logger.middleware.api_logger_middleware.APILoggerMiddleware', # Add here
-
 ]
 
+# Batched APILog writes from a background thread (see NATIONAL_ID_API_LOG_PIPELINE).
+# When enabled it replaces the drf_api_logger middleware, so every request does
+# at most one logging write.
+API_LOG_PIPELINE = os.environ.get('API_LOG_PIPELINE', '0') == '1'
+
+if not API_LOG_PIPELINE:
+    MIDDLEWARE.append('drf_api_logger.middleware.api_logger_middleware.APILoggerMiddleware')
+
 ROOT_URLCONF = 'proj.urls'
 
 TEMPLATES = [
@@ -90,11 +98,59 @@ WSGI_APPLICATION = 'proj.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql uses PostgreSQL (requires psycopg), configured by the DB_NAME,
+# DB_USER, DB_PASSWORD, DB_HOST and DB_PORT environment variables. Connections are
+# kept open for DB_CONN_MAX_AGE seconds or, with DB_POOL=1, taken from a psycopg
+# connection pool of DB_POOL_MIN_SIZE to DB_POOL_MAX_SIZE connections per process
+# (requires psycopg[pool]). Otherwise SQLite is used, tuned by NATIONAL_ID_SQLITE.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'national_id'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            # The pool keeps connections itself; Django must close its own after each request
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': not DB_POOL,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+                    'timeout': 10,
+                },
+            } if DB_POOL else {},
+        }
     }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # A file rather than the default shared in-memory database, which fails
+            # concurrent writers with "table is locked" instead of waiting for them
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported DB_ENGINE {DB_ENGINE!r}: use 'sqlite' or 'postgresql'.")
+
+# PRAGMAs run on every new SQLite connection. WAL lets readers run alongside the
+# single writer, synchronous=NORMAL syncs the WAL at checkpoints rather than on
+# every commit (still safe against corruption), writers wait up to BUSY_TIMEOUT
+# milliseconds for the lock, and up to MMAP_SIZE bytes of the file are memory-mapped.
+# Set SQLITE_TUNING=0 for SQLite's defaults.
+NATIONAL_ID_SQLITE = {
+    "ENABLED": os.environ.get('SQLITE_TUNING', '1') == '1',
+    "JOURNAL_MODE": "WAL",
+    "SYNCHRONOUS": "NORMAL",
+    "BUSY_TIMEOUT": 5000,
+    "MMAP_SIZE": 256 * 1024 * 1024,
 }
 
 
@@ -118,8 +174,21 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
-        "rest_framework_api_key.permissions.HasAPIKey",
-    ]
+        "National_ID_Processing.permissions.CachedHasAPIKey",
+    ],
+    # Same bytes as DRF's JSONRenderer, encoded with orjson; MessagePack for
+    # clients that send Accept: application/msgpack
+    "DEFAULT_RENDERER_CLASSES": [
+        "National_ID_Processing.renderers.ORJSONRenderer",
+        "National_ID_Processing.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "National_ID_Processing.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 # Internationalization
@@ -143,4 +212,145 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-DRF_API_LOGGER_DATABASE = True  # Default to False
\ No newline at end of file
+DRF_API_LOGGER_DATABASE = True  # Default to False
+# Maximum number of national IDs accepted by the batch endpoint in one request
+NATIONAL_ID_BATCH_MAX_SIZE = 10000
+# Batch responses of at least this many national IDs are streamed while they are encoded
+NATIONAL_ID_BATCH_STREAM_THRESHOLD = 1000
+
+# Logging
+# Validation records from the helpers are logged through the "National_ID_Processing"
+# logger; national IDs are masked (see NATIONAL_ID_LOG_VISIBLE_DIGITS) and rejected
+# IDs are rate limited. Set NATIONAL_ID_LOG_LEVEL=DEBUG to trace every validation.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "simple": {
+            "format": "%(asctime)s - %(levelname)s - %(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "simple",
+        },
+    },
+    "loggers": {
+        "National_ID_Processing": {
+            "handlers": ["console"],
+            "level": os.environ.get("NATIONAL_ID_LOG_LEVEL", "WARNING"),
+        },
+        "National_ID_Processing.profiling": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# "default" is local to each process. "shared" is seen by every worker process: Redis
+# when REDIS_URL is set (requires the redis package), otherwise a database table
+# created with `python manage.py createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    } if os.environ.get("REDIS_URL") else {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "national_id_shared_cache",
+    },
+}
+
+# Sliding-window rate limits per client IP and per API key, counted in the
+# CACHE_ALIAS cache. Each process counts hits locally and adds them to the shared
+# counters every SYNC_INTERVAL seconds, or sooner as a limit gets close; with 0,
+# every request is written through. A DatabaseCache cannot increment atomically,
+# so with one the counters are kept in the RateLimitCounter table instead.
+NATIONAL_ID_RATE_LIMITS = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "shared",
+    "SYNC_INTERVAL": 1.0,
+    "RATES": {
+        "ip": "10/m",
+        "api_key": "600/m",
+    },
+}
+
+# Verified API keys are remembered in each process for TTL seconds, so repeat
+# callers skip the key lookup and hashing. Each cached key is checked against a
+# version kept in the SHARED_CACHE_ALIAS cache, which saving or deleting the key
+# replaces, so revoking a key takes effect at once in every process. With None,
+# revocations reach other processes only within TTL seconds.
+NATIONAL_ID_API_KEY_CACHE = {
+    "ENABLED": True,
+    "MAX_SIZE": 1000,
+    "TTL": 30,
+    "SHARED_CACHE_ALIAS": "shared",
+}
+
+# Read-through cache of validation results in front of the validator view.
+# SHARED_CACHE_ALIAS names an entry of CACHES used as a second, cross-process tier.
+NATIONAL_ID_RESULT_CACHE = {
+    "ENABLED": True,
+    "MAX_SIZE": 10000,
+    "TTL": 300,
+    "SHARED_CACHE_ALIAS": None,
+}
+
+# APILog records are queued in memory and written with bulk_create once
+# BATCH_SIZE records are waiting or FLUSH_INTERVAL seconds have passed. When the
+# queue is full, a request waits at most PUT_TIMEOUT seconds in total, however many
+# records it logs, before the records that do not fit are dropped.
+NATIONAL_ID_API_LOG_PIPELINE = {
+    "ENABLED": API_LOG_PIPELINE,
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 1.0,
+    "MAX_QUEUE_SIZE": 10000,
+    "PUT_TIMEOUT": 0.05,
+}
+
+# Batches of at least INLINE_THRESHOLD national IDs are validated in a pool of
+# WORKERS processes, split into chunks of MIN_CHUNK_SIZE to MAX_CHUNK_SIZE IDs.
+# The default, 1, validates every batch in-process. Each web server worker process
+# starts its own pool, so N gunicorn/uvicorn workers with WORKERS=W run N x W
+# validator processes on the host: opt in with NATIONAL_ID_VALIDATION_WORKERS
+# (0 for one per CPU) on hosts running few web workers, e.g. a single ASGI worker
+# or the ingestion command.
+NATIONAL_ID_VALIDATION_EXECUTOR = {
+    "ENABLED": True,
+    "WORKERS": int(os.environ.get("NATIONAL_ID_VALIDATION_WORKERS", "1")),
+    "INLINE_THRESHOLD": 2000,
+    "MIN_CHUNK_SIZE": 500,
+    "MAX_CHUNK_SIZE": 20000,
+}
+
+# Counts of stored national IDs per birth year, month, gender and governorate,
+# kept up to date as IDs are stored and deleted and served at
+# /api/national-id/stats/. Run `manage.py rebuild_national_id_stats` after
+# enabling it on an existing database, or after rows were changed by raw SQL.
+NATIONAL_ID_STATS = {
+    "ENABLED": True,
+}
+
+# Per-process duration histograms of each stage of the national ID endpoints (API
+# key check, rate limits, validation, database writes, serialization, ...) and
+# counts of validation outcomes, served in the Prometheus format at /metrics.
+NATIONAL_ID_METRICS = {
+    "ENABLED": True,
+}
+
+# Requests sent with the HEADER header set to 1 are profiled with cProfile or
+# pyinstrument (PROFILER; requires the pyinstrument package), SAMPLE_RATE of them
+# at most. Reports are logged by the "National_ID_Processing.profiling" logger at
+# INFO level and, when DIRECTORY is set, saved there (named in X-Profile-File).
+NATIONAL_ID_PROFILING = {
+    "ENABLED": os.environ.get("NATIONAL_ID_PROFILING", "0") == "1",
+    "HEADER": "X-Profile",
+    "SAMPLE_RATE": 0.1,
+    "PROFILER": "cprofile",
+    "DIRECTORY": os.environ.get("NATIONAL_ID_PROFILE_DIR"),
+}
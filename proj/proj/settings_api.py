@@ -0,0 +1,44 @@
+"""
+API-only settings profile, for worker processes and batch jobs that only serve
+or use the national ID API:
+
+    DJANGO_SETTINGS_MODULE=proj.settings_api gunicorn proj.wsgi
+
+Same as proj.settings (and configured by the same environment variables),
+without the admin, auth, sessions, messages, static files, templates, the
+browsable API and the drf_api_logger request log, so that workers start faster
+and import less. APILog rows are still written by the views. Serve the admin
+and the homepage from a separate deployment with proj.settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import MIDDLEWARE, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    'National_ID_Processing.apps.NationalIdProcessingConfig',
+    'rest_framework_api_key',
+]
+
+_REMOVED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'drf_api_logger.middleware.api_logger_middleware.APILoggerMiddleware',
+}
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in _REMOVED_MIDDLEWARE]
+
+ROOT_URLCONF = 'proj.urls_api'
+
+TEMPLATES = []
+
+# API keys are the only credentials: no session or basic authentication, no
+# browsable API, and request.user is None instead of an AnonymousUser
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "UNAUTHENTICATED_USER": None,
+    "DEFAULT_RENDERER_CLASSES": [
+        "National_ID_Processing.renderers.ORJSONRenderer",
+        "National_ID_Processing.renderers.MessagePackRenderer",
+    ],
+}
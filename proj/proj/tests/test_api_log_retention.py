@@ -0,0 +1,108 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from National_ID_Processing.admin import APILogAdmin
+from National_ID_Processing.models import APILog, APILogDailyRollup
+
+
+def create_log(ip_address, national_id="29001011234564", days_ago=0):
+    log = APILog.objects.create(ip_address=ip_address, national_id=national_id)
+    if days_ago:
+        timestamp = datetime.now(timezone.utc) - timedelta(days=days_ago)
+        APILog.objects.filter(pk=log.pk).update(timestamp=timestamp)
+    return log
+
+
+class RollupAPILogsTests(TestCase):
+    def rollup(self, **options):
+        call_command("rollup_api_logs", stdout=StringIO(), **options)
+
+    def rollups(self):
+        return {(rollup.day, rollup.ip_address): rollup.calls for rollup in APILogDailyRollup.objects.all()}
+
+    def test_old_rows_are_rolled_up_in_chunks(self):
+        """Rows older than --keep-days become daily per-IP counts and are deleted."""
+        for ip_address, days_ago in [("10.0.0.1", 100), ("10.0.0.1", 100), ("10.0.0.2", 100), ("10.0.0.1", 95)]:
+            create_log(ip_address, days_ago=days_ago)
+        recent = create_log("10.0.0.1", days_ago=10)
+        today = datetime.now(timezone.utc).date()
+
+        self.rollup(keep_days=90, chunk_size=2)
+
+        self.assertEqual(list(APILog.objects.all()), [recent])
+        self.assertEqual(self.rollups(), {
+            (today - timedelta(days=100), "10.0.0.1"): 2,
+            (today - timedelta(days=100), "10.0.0.2"): 1,
+            (today - timedelta(days=95), "10.0.0.1"): 1,
+        })
+
+        # Later runs add to the existing daily counts
+        create_log("10.0.0.2", days_ago=100)
+        self.rollup(keep_days=5)
+        self.assertFalse(APILog.objects.exists())
+        self.assertEqual(self.rollups()[(today - timedelta(days=100), "10.0.0.2")], 2)
+        self.assertEqual(self.rollups()[(today - timedelta(days=10), "10.0.0.1")], 1)
+
+    def test_dry_run_and_arguments(self):
+        """--dry-run only reports; invalid arguments are rejected."""
+        create_log("10.0.0.1", days_ago=100)
+        stdout = StringIO()
+        call_command("rollup_api_logs", dry_run=True, stdout=stdout)
+        self.assertIn("1 API log rows", stdout.getvalue())
+        self.assertEqual(APILog.objects.count(), 1)
+
+        with self.assertRaises(CommandError):
+            self.rollup(chunk_size=0)
+
+    def test_indexes(self):
+        """APILog is indexed for timestamp filters and national ID lookups."""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, APILog._meta.db_table)
+        indexed = [tuple(constraint["columns"]) for constraint in constraints.values() if constraint["index"]]
+        self.assertIn(("national_id", "timestamp"), indexed)
+        self.assertIn(("timestamp",), indexed)
+
+
+class APILogAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        self.logs = [create_log("10.0.0.1", national_id=f"2900101123456{index}") for index in range(5)]
+        self.url = "/admin/National_ID_Processing/apilog/"
+
+    def test_keyset_pagination(self):
+        """Pages follow the primary key cursor, newest first, without counting rows."""
+        with patch.object(APILogAdmin, "list_per_page", 2), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual([log.pk for log in response.context["cl"].result_list], [self.logs[4].pk, self.logs[3].pk])
+        self.assertNotIn("COUNT(", " ".join(query["sql"] for query in queries if "apilog" in query["sql"]))
+        self.assertContains(response, f"?before={self.logs[3].pk}")
+
+        with patch.object(APILogAdmin, "list_per_page", 2):
+            response = self.client.get(self.url, {"before": self.logs[1].pk})
+        changelist = response.context["cl"]
+        self.assertEqual([log.pk for log in changelist.result_list], [self.logs[0].pk])
+        self.assertIsNone(changelist.next_cursor)
+        self.assertContains(response, "First page")
+
+    def test_search(self):
+        """Searches match national IDs exactly or by prefix."""
+        response = self.client.get(self.url, {"q": "29001011234562"})
+        self.assertEqual([log.pk for log in response.context["cl"].result_list], [self.logs[2].pk])
+
+        response = self.client.get(self.url, {"q": " 2900101 "})
+        self.assertEqual(len(response.context["cl"].result_list), 5)
+        response = self.client.get(self.url, {"q": "1123456"})
+        self.assertEqual(len(response.context["cl"].result_list), 0)
+
+    def test_rollup_admin(self):
+        """Daily rollups are listed in the admin."""
+        APILogDailyRollup.objects.create(day=date(2024, 1, 1), ip_address="10.0.0.1", calls=3)
+        response = self.client.get("/admin/National_ID_Processing/apilogdailyrollup/")
+        self.assertContains(response, "10.0.0.1")
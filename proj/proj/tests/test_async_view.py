@@ -0,0 +1,97 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.models import APILog, EGYNationalIDInfo
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.result_cache import get_result_cache
+
+
+class NationalIDAsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+        get_result_cache().clear()
+        _, key = APIKey.objects.create_key(name="test")
+        self.authorization = f"Api-Key {key}"
+        _, revoked_key = APIKey.objects.create_key(name="revoked", revoked=True)
+        self.revoked_authorization = f"Api-Key {revoked_key}"
+        self.url = "/api/national-id/async/"
+
+    async def post(self, body):
+        return await self.async_client.post(
+            self.url, body, content_type="application/json", headers={"Authorization": self.authorization}
+        )
+
+    async def test_same_contract_as_sync_view(self):
+        """Valid IDs return the same payload as the sync view and are stored and logged."""
+        response = await self.post({"national_id": "29001011234564"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["message"], "Data processed successfully.")
+
+        sync_response = await self.async_client.post(
+            "/api/national-id/", {"national_id": "29001011234564"}, content_type="application/json",
+            headers={"Authorization": self.authorization},
+        )
+        self.assertEqual(response.json(), sync_response.json())
+
+        self.assertEqual(await EGYNationalIDInfo.objects.acount(), 1)
+        self.assertEqual(await APILog.objects.acount(), 2)
+
+    async def test_shared_cache_and_log_pipeline(self):
+        """The shared cache tier and the log pipeline are used without blocking calls."""
+        pipeline = Mock()
+        cache_options = {"SHARED_CACHE_ALIAS": "default"}
+        with self.settings(NATIONAL_ID_RESULT_CACHE=cache_options), \
+                patch("National_ID_Processing.log_pipeline.get_api_log_pipeline", return_value=pipeline):
+            first = await self.post({"national_id": "29001011234564"})
+            get_result_cache().clear()
+            second = await self.post({"national_id": "29001011234564"})
+
+        self.assertEqual(first.json(), second.json())
+        pipeline.submit.assert_called_with("127.0.0.1", "29001011234564", wait=False)
+
+        with self.settings(NATIONAL_ID_RESULT_CACHE={"ENABLED": False}):
+            response = await self.post({"national_id": "29001011234564"})
+        self.assertEqual(response.status_code, 200)
+
+    async def test_invalid_requests(self):
+        """Invalid IDs and bodies return 400 errors."""
+        bodies = (
+            {"national_id": "29013231234567"}, {"national_id": 123}, {}, ["29001011234564"],
+            {"national_id": "29001011234564\n"},
+            {"national_id": "2\u0669\u0660\u0660\u0661\u0660\u0661\u0661\u0662\u0663\u0664\u0665\u0666\u0664"},
+        )
+        for body in bodies:
+            with self.subTest(body=body):
+                response = await self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+        response = await self.post("not json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("detail", response.json())
+
+    async def test_authentication(self):
+        """Missing, unknown or revoked API keys are rejected."""
+        prefix = self.authorization.partition(".")[0]
+        authorizations = ("", "Api-Key unknown.key", "Bearer token", f"{prefix}.wrong-secret", self.revoked_authorization)
+        for authorization in authorizations:
+            with self.subTest(authorization=authorization):
+                response = await self.async_client.post(
+                    self.url, {"national_id": "29001011234564"}, content_type="application/json",
+                    headers={"Authorization": authorization},
+                )
+                self.assertEqual(response.status_code, 403)
+
+    async def test_rate_limit_and_method(self):
+        """Only POST is allowed and each IP is limited to 10 requests per minute."""
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+        for _ in range(10):
+            await self.post({"national_id": "29001011234564"})
+        response = await self.post({"national_id": "29001011234564"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
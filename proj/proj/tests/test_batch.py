@@ -0,0 +1,93 @@
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.models import APILog, EGYNationalIDInfo
+from National_ID_Processing.ratelimit import reset_rate_limits
+
+
+class NationalIDBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+        _, key = APIKey.objects.create_key(name="test")
+        self.authorization = f"Api-Key {key}"
+        self.url = "/api/national-id/batch/"
+
+    def test_json_array_results_in_order(self):
+        """Valid and invalid IDs are reported in request order with per-item errors."""
+        ids = ["29001011234564", "2900101123456", {"national_id": "32402292234565"}, 12345]
+        response = self.client.post(
+            self.url, json.dumps(ids), content_type="application/json", HTTP_AUTHORIZATION=self.authorization
+        )
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()["results"]
+        self.assertEqual([result["national_id"] for result in results], ["29001011234564", "2900101123456", "32402292234565", 12345])
+        self.assertEqual(results[0]["data"]["birth_year"], 1990)
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2]["data"]["birth_year"], 2024)
+        self.assertIn("error", results[3])
+
+        self.assertEqual(APILog.objects.count(), 2)
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 2)
+
+    def test_ndjson_body_and_existing_rows(self):
+        """NDJSON bodies are accepted and already stored IDs are not duplicated."""
+        EGYNationalIDInfo.objects.create(national_id="29001011234564", birth_date=date(1990, 1, 1))
+        body = '"29001011234564"\n\n{"national_id": "29001011234564"}\n"29013231234567"\n'
+        response = self.client.post(
+            self.url, body, content_type="application/x-ndjson", HTTP_AUTHORIZATION=self.authorization
+        )
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["data"], results[1]["data"])
+        self.assertIn("error", results[2])
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 1)
+        self.assertEqual(APILog.objects.count(), 2)
+
+    def test_non_ascii_digits_and_newlines(self):
+        """IDs with other digits or a trailing newline are invalid, even once their digits are stored."""
+        ids = ["30002020100017", "3\u0660\u0660\u0660\u0662\u0660\u0662\u0660\u0661\u0660\u0660\u0660\u0661\u0667", "30002020100017\n"]
+        for _ in range(2):
+            response = self.client.post(
+                self.url, json.dumps(ids), content_type="application/json", HTTP_AUTHORIZATION=self.authorization
+            )
+            self.assertEqual(response.status_code, 200)
+            results = response.json()["results"]
+            self.assertEqual(results[0]["data"]["birth_year"], 2000)
+            self.assertIn("error", results[1])
+            self.assertIn("error", results[2])
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 1)
+
+    def test_invalid_bodies(self):
+        """Bodies that are not a non-empty list, or that are too large, are rejected."""
+        for body in ['{"national_id": "29001011234564"}', "[]"]:
+            with self.subTest(body=body):
+                response = self.client.post(
+                    self.url, body, content_type="application/json", HTTP_AUTHORIZATION=self.authorization
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+        response = self.client.post(
+            self.url, '"29001011234564"\nnot json\n', content_type="application/x-ndjson",
+            HTTP_AUTHORIZATION=self.authorization,
+        )
+        self.assertEqual(response.status_code, 400)
+
+        with self.settings(NATIONAL_ID_BATCH_MAX_SIZE=2):
+            response = self.client.post(
+                self.url, json.dumps(["29001011234564"] * 3), content_type="application/json",
+                HTTP_AUTHORIZATION=self.authorization,
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_api_key(self):
+        """The batch endpoint is protected by the API key permission."""
+        response = self.client.post(self.url, json.dumps(["29001011234564"]), content_type="application/json")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,59 @@
+import time
+from datetime import date, datetime
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from National_ID_Processing import birthdates
+from National_ID_Processing.birthdates import INVALID_DAY, INVALID_LEAP_DAY, birth_ordinal, today_ordinal
+from National_ID_Processing.helpers import is_leap_year, validate_national_id
+
+
+class BirthDateTableTests(SimpleTestCase):
+    def test_table_matches_calendar(self):
+        """Every (century, YY, MM, DD) slot matches the calendar."""
+        for century_digit, base_year in (("2", 1900), ("3", 2000)):
+            for yy in range(100):
+                year = base_year + yy
+                for month in range(1, 13):
+                    for day in range(32):
+                        with self.subTest(year=year, month=month, day=day):
+                            try:
+                                expected = date(year, month, day).toordinal()
+                            except ValueError:
+                                leap_day = month == 2 and day == 29 and not is_leap_year(year)
+                                expected = INVALID_LEAP_DAY if leap_day else INVALID_DAY
+                            self.assertEqual(birth_ordinal(century_digit, yy, month, day), expected)
+
+    def test_today_ordinal_refreshes_daily(self):
+        """Today's ordinal is cached until the next local midnight."""
+        self.assertEqual(today_ordinal(), date.today().toordinal())
+
+        noon = time.mktime(datetime(2025, 1, 7, 12).timetuple())
+        midnight = time.mktime(datetime(2025, 1, 8).timetuple())
+        with patch.object(birthdates, "_today_ordinal", 0), \
+                patch.object(birthdates, "_today_expires_at", 0.0), \
+                patch.object(birthdates, "date", wraps=date) as mock_date, \
+                patch("National_ID_Processing.birthdates.time.time") as mock_time:
+            mock_date.today.return_value = date(2025, 1, 7)
+            mock_time.return_value = noon
+            self.assertEqual(today_ordinal(), date(2025, 1, 7).toordinal())
+            mock_time.return_value = midnight - 1
+            self.assertEqual(today_ordinal(), date(2025, 1, 7).toordinal())
+            self.assertEqual(mock_date.today.call_count, 1)
+
+            mock_date.today.return_value = date(2025, 1, 8)
+            mock_time.return_value = midnight
+            self.assertEqual(today_ordinal(), date(2025, 1, 8).toordinal())
+
+    def test_future_check_uses_current_date(self):
+        """The future-date check compares against `current_date` when given, else today."""
+        self.assertEqual(validate_national_id("32501071234569", current_date=datetime(2025, 1, 7)), (True, None))
+        self.assertFalse(validate_national_id("32501081234567", current_date=datetime(2025, 1, 7))[0])
+        self.assertFalse(validate_national_id("39912311234567")[0])
+
+    def test_is_leap_year(self):
+        """Leap years follow the Gregorian rules."""
+        self.assertTrue(is_leap_year(2000))
+        self.assertTrue(is_leap_year(2024))
+        self.assertFalse(is_leap_year(1900))
+        self.assertFalse(is_leap_year(2023))
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.result_cache import get_result_cache
+from national_id_client import APIError, AsyncClient, Client, ClientError, ValidationResult
+from national_id_client.aio import read_response
+
+
+VALID_IDS = ["29001011234564", "32402292234565", "32501071234569"]
+BAD_CHECK_DIGIT = "29001011234565"
+
+
+def closed_port():
+    """A local port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ClientTestMixin:
+    def setUp(self):
+        self.reset_rate_limits()
+        get_result_cache().clear()
+        self.api_key = APIKey.objects.create_key(name="client")[1]
+
+    def reset_rate_limits(self):
+        reset_rate_limits()
+        caches["default"].clear()  # the counters of NATIONAL_ID_RATE_LIMITS without a CACHE_ALIAS
+
+
+@override_settings(NATIONAL_ID_RATE_LIMITS={"ENABLED": False})
+class ClientTests(ClientTestMixin, LiveServerTestCase):
+    def client_for(self, **options):
+        client = Client(self.live_server_url, self.api_key, **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_validate_micro_batches(self):
+        """Concurrent validate() calls are sent as one batch request over a kept-alive connection."""
+        client = self.client_for(batch_size=7, batch_delay=0.5, prevalidate=False)
+        national_ids = VALID_IDS * 4 + [BAD_CHECK_DIGIT, "123"]
+        with ThreadPoolExecutor(len(national_ids)) as pool:
+            results = list(pool.map(client.validate, national_ids))
+
+        self.assertEqual([result.national_id for result in results], national_ids)
+        self.assertEqual(results[0].data["birth_year"], 1990)
+        self.assertEqual(results[2].data["governorate"], "Dakahlia")
+        self.assertEqual(results[-2], ValidationResult(BAD_CHECK_DIGIT, error="Invalid check digit in National ID."))
+        self.assertEqual(results[-1].error, "Invalid format: National ID must be 14 digits.")
+        # Two full batches
+        self.assertEqual(client.requests_sent, 2)
+
+        self.assertTrue(client.validate(VALID_IDS[1]).is_valid)
+        self.assertEqual(client.requests_sent, 3)
+        self.assertLessEqual(client.connections_opened, 2)
+
+    def test_validate_many(self):
+        client = self.client_for(batch_size=2, max_connections=2)
+        national_ids = VALID_IDS + [None, BAD_CHECK_DIGIT, "09001011234564"]
+        results = client.validate_many(national_ids)
+        self.assertEqual([result.national_id for result in results], national_ids)
+        self.assertEqual([result.is_valid for result in results], [True, True, True, False, False, False])
+        # IDs that are certainly invalid are not sent
+        self.assertEqual([result.local for result in results], [False] * 3 + [True] * 3)
+        self.assertEqual(results[4].error, "Invalid check digit in National ID.")
+        self.assertEqual(client.requests_sent, 2)
+        self.assertLessEqual(client.connections_opened, 2)
+
+        self.assertTrue(client.validate("123").local)
+        self.assertEqual(client.requests_sent, 2)
+
+        # Without pre-validation every ID is sent
+        with Client(self.live_server_url, self.api_key, prevalidate=False) as client:
+            self.assertEqual(client.validate(None).error, "Invalid format: National ID must be 14 digits.")
+        self.assertEqual(client.requests_sent, 1)
+
+    @override_settings(NATIONAL_ID_BATCH_STREAM_THRESHOLD=2)
+    def test_streamed_response(self):
+        """Streamed batch responses are read to the end of the connection, which is then replaced."""
+        client = self.client_for(batch_size=2)
+        results = client.validate_many(VALID_IDS)
+        self.assertEqual([result.data["birth_year"] for result in results], [1990, 2024, 2025])
+        self.assertEqual(client.connections_opened, 2)
+
+    def test_stale_connection(self):
+        """A kept-alive connection closed by the server is replaced."""
+        client = self.client_for()
+        client.validate_many(VALID_IDS[:1])
+        client._idle[0].sock.shutdown(socket.SHUT_RDWR)
+        self.assertTrue(client.validate_many(VALID_IDS[1:2])[0].is_valid)
+        self.assertEqual(client.connections_opened, 2)
+
+    @override_settings(NATIONAL_ID_RATE_LIMITS={"RATES": {"api_key": "1/m"}})
+    def test_retry_after(self):
+        """Throttled requests are retried after the Retry-After delay."""
+        client = self.client_for(max_retries=2)
+        client.validate_many(VALID_IDS[:1])
+        with patch("national_id_client.client.time.sleep", side_effect=lambda delay: self.reset_rate_limits()) as sleep:
+            self.assertTrue(client.validate_many(VALID_IDS[1:2])[0].is_valid)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertGreaterEqual(sleep.call_args[0][0], 1)
+
+        with patch("national_id_client.client.time.sleep") as sleep:
+            with self.assertRaises(APIError) as error:
+                client.validate(VALID_IDS[2])
+        self.assertEqual(error.exception.status, 429)
+        self.assertIn("throttled", str(error.exception))
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_errors(self):
+        client = Client(self.live_server_url, "wrong key")
+        with self.assertRaises(APIError) as error:
+            client.validate_many(VALID_IDS)
+        self.assertEqual(error.exception.status, 403)
+
+        client = Client(f"http://127.0.0.1:{closed_port()}/", self.api_key, max_retries=1)
+        with patch("national_id_client.client.time.sleep") as sleep:
+            with self.assertRaises(ClientError):
+                client.validate(VALID_IDS[0])
+        sleep.assert_called_once_with(0.5)
+        client.close()
+        with self.assertRaises(ClientError):
+            client.validate(VALID_IDS[0])
+
+        for base_url in ("ftp://example.com", "example.com"):
+            with self.assertRaises(ValueError):
+                Client(base_url, self.api_key)
+        with self.assertRaises(ValueError):
+            Client(self.live_server_url, self.api_key, batch_size=0)
+
+
+@override_settings(NATIONAL_ID_RATE_LIMITS={"ENABLED": False})
+class AsyncClientTests(ClientTestMixin, LiveServerTestCase):
+    async def test_validate_micro_batches(self):
+        async with AsyncClient(self.live_server_url, self.api_key, batch_size=4, batch_delay=0.05) as client:
+            national_ids = VALID_IDS * 2 + ["2900101123456x", BAD_CHECK_DIGIT]
+            results = await asyncio.gather(*map(client.validate, national_ids))
+            self.assertEqual([result.national_id for result in results], national_ids)
+            self.assertEqual(results[1].data["birth_day"], 29)
+            self.assertEqual(results[-1], ValidationResult(BAD_CHECK_DIGIT, error="Invalid check digit in National ID.", local=True))
+            # 6 IDs sent: a full batch of 4 at once, then 2 after the delay
+            self.assertEqual(client.requests_sent, 2)
+
+            # Sent on close; a call cancelled by its caller is dropped from the batch
+            pending = asyncio.ensure_future(client.validate(VALID_IDS[0]))
+            cancelled = asyncio.ensure_future(client.validate(VALID_IDS[1]))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+        self.assertTrue((await pending).is_valid)
+        self.assertTrue(cancelled.cancelled())
+        self.assertLessEqual(client.connections_opened, 2)
+        with self.assertRaises(ClientError):
+            await client.validate(VALID_IDS[0])
+
+    async def test_validate_many(self):
+        async with AsyncClient(self.live_server_url, self.api_key, batch_size=2, max_connections=1, prevalidate=False) as client:
+            results = await client.validate_many(VALID_IDS + [None])
+            self.assertEqual([result.is_valid for result in results], [True, True, True, False])
+            self.assertEqual((client.requests_sent, client.connections_opened), (2, 1))
+
+            # A kept-alive connection closed by the server is replaced
+            client._idle[0][1].transport.abort()
+            await asyncio.sleep(0)
+            self.assertTrue((await client.validate_many(VALID_IDS[:1]))[0].is_valid)
+            self.assertEqual(client.connections_opened, 2)
+
+    @override_settings(NATIONAL_ID_RATE_LIMITS={"RATES": {"api_key": "1/m"}})
+    async def test_retry_after(self):
+        async with AsyncClient(self.live_server_url, self.api_key, max_retries=1) as client:
+            await client.validate_many(VALID_IDS[:1])
+            with patch("national_id_client.aio.asyncio.sleep") as sleep:
+                with self.assertRaises(APIError) as error:
+                    await client.validate(VALID_IDS[1])
+            self.assertEqual(error.exception.status, 429)
+            self.assertGreaterEqual(sleep.call_args[0][0], 1)
+
+    @override_settings(NATIONAL_ID_BATCH_STREAM_THRESHOLD=2)
+    async def test_streamed_response(self):
+        async with AsyncClient(self.live_server_url, self.api_key, batch_size=2) as client:
+            results = await client.validate_many(VALID_IDS)
+        self.assertEqual([result.data["birth_year"] for result in results], [1990, 2024, 2025])
+        self.assertEqual(client.connections_opened, 2)
+
+    async def test_errors(self):
+        async with AsyncClient(f"http://127.0.0.1:{closed_port()}", self.api_key, max_retries=1, backoff_factor=0) as client:
+            cancelled = asyncio.ensure_future(client.validate(VALID_IDS[0]))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            with self.assertRaises(ClientError):
+                await client.validate_many(VALID_IDS)
+            self.assertEqual(client.connections_opened, 2)
+
+        # A server closing new connections at once
+        server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+        async with server, AsyncClient(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}", self.api_key,
+                                       max_retries=0) as client:
+            with self.assertRaises(ClientError) as error:
+                await client.validate(VALID_IDS[0])
+            self.assertIsInstance(error.exception.__cause__, ConnectionResetError)
+
+        async with AsyncClient(self.live_server_url, "wrong key") as client:
+            with self.assertRaises(APIError) as error:
+                await client.validate(VALID_IDS[0])
+        self.assertEqual(error.exception.status, 403)
+
+    async def test_timeout_excludes_waiting_for_a_connection(self):
+        """Requests queued for the only connection of a slow server are not timed out while they wait."""
+        async def slow_server(reader, writer):
+            try:
+                while headers := await reader.readuntil(b"\r\n\r\n"):
+                    length = int(headers.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                    national_ids = json.loads(await reader.readexactly(length))
+                    await asyncio.sleep(0.3)
+                    body = json.dumps({"results": [{"national_id": national_id} for national_id in national_ids]}).encode()
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        server = await asyncio.start_server(slow_server, "127.0.0.1", 0)
+        async with server, AsyncClient(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}", self.api_key,
+                                       batch_size=1, max_connections=1, timeout=1, max_retries=0,
+                                       prevalidate=False) as client:
+            results = await client.validate_many((VALID_IDS * 3)[:8])
+            self.assertEqual(len(results), 8)
+            self.assertEqual((client.requests_sent, client.connections_opened), (8, 1))
+
+            # The exchange itself is still timed
+            client.timeout = 0.1
+            with self.assertRaises(ClientError) as error:
+                await client.validate_many(VALID_IDS[:1])
+            self.assertIsInstance(error.exception.__cause__, asyncio.TimeoutError)
+
+
+class ProtocolTests(SimpleTestCase):
+    async def read(self, data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_response(reader)
+
+    async def test_read_response(self):
+        """Responses with a length, chunked or delimited by the end of the connection are read."""
+        self.assertEqual(
+            await self.read(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}"),
+            (200, {"content-length": "2"}, b"{}", True),
+        )
+        self.assertEqual(
+            await self.read(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3;x=y\r\n[1,\r\n2\r\n2]\r\n0\r\nX-Trailer: 1\r\n\r\n"),
+            (200, {"transfer-encoding": "chunked"}, b"[1,2]", True),
+        )
+        self.assertEqual(
+            await self.read(b"HTTP/1.0 503 Service Unavailable\r\nRetry-After: 1\r\n\r\nbusy"),
+            (503, {"retry-after": "1"}, b"busy", False),
+        )
+        with self.assertRaises(ConnectionResetError):
+            await self.read(b"")
+
+    def test_retry_delay(self):
+        client = Client("http://localhost", "key", backoff_factor=0.5, max_backoff=10)
+        self.assertEqual(client.retry_delay(0, "3"), 3)
+        self.assertEqual(client.retry_delay(0, "120"), 10)
+        self.assertEqual(client.retry_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+        self.assertEqual(client.retry_delay(2, "soon"), 2)
+        self.assertEqual(client.retry_delay(1), 1)
+
+    def test_batch_results(self):
+        client = Client("https://localhost:8443/prefix/", "key")
+        self.assertEqual((client.port, client.path_prefix), (8443, "/prefix"))
+        with self.assertRaises(APIError) as error:
+            client.batch_results(502, b"<html>Bad gateway</html>")
+        self.assertEqual(str(error.exception), "HTTP 502: <html>Bad gateway</html>")
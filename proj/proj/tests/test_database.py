@@ -0,0 +1,65 @@
+import os
+import runpy
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from National_ID_Processing.signals import configure_sqlite_connection
+
+
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "settings.py")
+
+
+def load_settings(**environ):
+    with patch.dict(os.environ, environ):
+        return runpy.run_path(SETTINGS_PATH)
+
+
+def pragmas(cursor):
+    values = {}
+    for pragma in ("journal_mode", "synchronous", "busy_timeout", "mmap_size"):
+        cursor.execute(f"PRAGMA {pragma}")
+        values[pragma] = cursor.fetchone()[0]
+    return values
+
+
+class SQLiteTuningTests(TestCase):
+    def test_pragmas(self):
+        """New SQLite connections use WAL, synchronous=NORMAL, a busy timeout and mmap."""
+        with connection.cursor() as cursor:
+            self.assertEqual(pragmas(cursor), {
+                "journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "mmap_size": 256 * 1024 * 1024,
+            })
+
+    def test_disabled_and_other_vendors(self):
+        """Nothing runs when tuning is disabled or the database is not SQLite."""
+        with patch.object(connection, "cursor") as cursor:
+            with override_settings(NATIONAL_ID_SQLITE={"ENABLED": False}):
+                configure_sqlite_connection(sender=None, connection=connection)
+            with patch.object(connection, "vendor", "postgresql"):
+                configure_sqlite_connection(sender=None, connection=connection)
+        cursor.assert_not_called()
+
+
+class DatabaseProfileTests(TestCase):
+    def test_sqlite_profile(self):
+        config = load_settings(DB_ENGINE="sqlite", SQLITE_TUNING="0")
+        self.assertEqual(config["DATABASES"]["default"]["ENGINE"], "django.db.backends.sqlite3")
+        self.assertFalse(config["NATIONAL_ID_SQLITE"]["ENABLED"])
+
+    def test_postgresql_profiles(self):
+        """PostgreSQL keeps connections open, or pools them with DB_POOL=1."""
+        database = load_settings(DB_ENGINE="postgresql", DB_NAME="ids", DB_CONN_MAX_AGE="300")["DATABASES"]["default"]
+        self.assertEqual(
+            (database["ENGINE"], database["NAME"], database["CONN_MAX_AGE"], database["OPTIONS"]),
+            ("django.db.backends.postgresql", "ids", 300, {}),
+        )
+
+        database = load_settings(DB_ENGINE="postgresql", DB_POOL="1", DB_POOL_MAX_SIZE="20")["DATABASES"]["default"]
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual((database["OPTIONS"]["pool"]["min_size"], database["OPTIONS"]["pool"]["max_size"]), (2, 20))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ImproperlyConfigured):
+            load_settings(DB_ENGINE="oracle")
@@ -0,0 +1,81 @@
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+from National_ID_Processing import executor
+from National_ID_Processing.executor import ValidationExecutor, _validate_records, get_validation_executor, validate_many
+from National_ID_Processing.helpers import validate_national_id
+
+
+NATIONAL_IDS = [
+    "29001011234564", "32402292234565", "29001011234565", "29001019934565", "29013231234567",
+    "39912311234567", "12345678901234", "2900101123456", "٢٩٠٠١٠١١٢٣٤٥٦٤", "", 29001011234564, None,
+]
+
+
+class ValidationExecutorTests(SimpleTestCase):
+    def expected(self, national_ids):
+        return [
+            validate_national_id(national_id) if isinstance(national_id, str)
+            else (False, "Invalid format: National ID must be 14 digits.")
+            for national_id in national_ids
+        ]
+
+    def test_worker_pool_keeps_order(self):
+        """Large batches are validated by the workers with the same results, in order."""
+        pool_executor = ValidationExecutor(workers=2, inline_threshold=0, min_chunk_size=2)
+        self.addCleanup(pool_executor.shutdown)
+        national_ids = NATIONAL_IDS * 5
+
+        self.assertEqual(pool_executor.validate_many(national_ids), self.expected(national_ids))
+        self.assertIsNotNone(pool_executor._pool)
+
+        # A forked process starts its own pool
+        pool = pool_executor._pool
+        pool_executor._pid = -1
+        self.assertEqual(pool_executor.validate_many(iter(national_ids)), self.expected(national_ids))
+        self.assertIsNot(pool_executor._pool, pool)
+        pool.shutdown()
+
+    def test_small_batches_stay_in_process(self):
+        """Batches under the threshold, or with a single worker, never start the pool."""
+        for inline_executor in (ValidationExecutor(workers=4), ValidationExecutor(workers=1, inline_threshold=0)):
+            with patch.object(inline_executor, "_get_pool") as get_pool:
+                self.assertEqual(inline_executor.validate_many(NATIONAL_IDS), self.expected(NATIONAL_IDS))
+            get_pool.assert_not_called()
+
+    def test_broken_pool_falls_back_to_in_process(self):
+        """A broken worker pool is discarded and the batch is validated in-process."""
+        broken_executor = ValidationExecutor(workers=2, inline_threshold=0)
+        pool = Mock()
+        pool.submit.side_effect = BrokenProcessPool()
+        with patch.object(broken_executor, "_get_pool", return_value=pool), self.assertLogs(executor.logger, "ERROR"):
+            self.assertEqual(broken_executor.validate_many(NATIONAL_IDS), self.expected(NATIONAL_IDS))
+
+    def test_chunk_size(self):
+        """Chunks aim at four per worker, within the configured bounds."""
+        sizing_executor = ValidationExecutor(workers=8, min_chunk_size=500, max_chunk_size=20000)
+        self.assertEqual(sizing_executor.chunk_size(1000), 500)
+        self.assertEqual(sizing_executor.chunk_size(100000), 3125)
+        self.assertEqual(sizing_executor.chunk_size(10000000), 20000)
+
+    def test_validate_records(self):
+        """Workers return one error code per packed record."""
+        self.assertEqual(_validate_records(b"2900101123456429001011234565"), bytes([0, 7]))
+
+    def test_settings(self):
+        """validate_many uses the configured executor, or validates in-process when disabled."""
+        with self.settings(NATIONAL_ID_VALIDATION_EXECUTOR={"WORKERS": 3, "INLINE_THRESHOLD": 10}):
+            configured = get_validation_executor()
+            self.assertEqual((configured.workers, configured.inline_threshold), (3, 10))
+            self.assertEqual(validate_many(NATIONAL_IDS[:2]), [(True, None), (True, None)])
+
+        # In-process unless more workers are asked for, since every web worker has its own pool
+        with self.settings(NATIONAL_ID_VALIDATION_EXECUTOR={}):
+            self.assertEqual(get_validation_executor().workers, 1)
+        with patch("National_ID_Processing.executor.os.cpu_count", return_value=6):
+            self.assertEqual(ValidationExecutor(workers=0).workers, 6)
+
+        with self.settings(NATIONAL_ID_VALIDATION_EXECUTOR={"ENABLED": False}):
+            self.assertIsNone(get_validation_executor())
+            self.assertEqual(validate_many(NATIONAL_IDS), self.expected(NATIONAL_IDS))
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.exports import EXPORTS, ExportStream, export_queryset
+from National_ID_Processing.helpers import extract_info
+from National_ID_Processing.models import APILog, EGYNationalIDInfo
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.repository import save_national_id_infos
+
+
+NATIONAL_IDS = ["29001011234564", "32402292234565", "32501071234569"]
+
+
+def create_rows():
+    save_national_id_infos({national_id: extract_info(national_id) for national_id in NATIONAL_IDS})
+    EGYNationalIDInfo.objects.filter(national_id=NATIONAL_IDS[0]).update(
+        created_at=datetime(2024, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc),
+    )
+    APILog.objects.create(ip_address="10.0.0.1", national_id=NATIONAL_IDS[0])
+    APILog.objects.create(ip_address="10.0.0.2", national_id=NATIONAL_IDS[1])
+
+
+class ExportStreamTests(TestCase):
+    def setUp(self):
+        create_rows()
+
+    def export(self, dataset, file_format, params=None, after=None, chunk_size=2):
+        export = EXPORTS[dataset]
+        stream = ExportStream(export_queryset(export, params or {}, after=after), export.fields, file_format, chunk_size)
+        return stream, list(stream)
+
+    def test_csv(self):
+        """CSV exports have a header and one line per row, written a chunk at a time."""
+        stream, chunks = self.export("national-ids", "csv")
+        self.assertEqual(len(chunks), 3)  # header, 2 rows, 1 row
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual([row["national_id"] for row in rows], NATIONAL_IDS)
+        self.assertEqual(rows[0]["created_at"], "2024-01-01T12:00:00.500000Z")
+        self.assertEqual((rows[1]["birth_year"], rows[1]["gender"]), ("2024", "female"))
+        self.assertEqual((stream.rows, stream.last_pk), (3, int(rows[-1]["id"])))
+
+    def test_ndjson_filters_and_resume(self):
+        """Filters narrow the rows and `after` resumes after a primary key."""
+        stream, chunks = self.export("national-ids", "ndjson", {"birth_year_min": "2000", "birth_month_max": "2"})
+        rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+        self.assertEqual([row["national_id"] for row in rows], [NATIONAL_IDS[1], NATIONAL_IDS[2]])
+
+        stream, chunks = self.export("national-ids", "ndjson", after=rows[0]["id"])
+        self.assertEqual([json.loads(line)["national_id"] for line in b"".join(chunks).splitlines()], [NATIONAL_IDS[2]])
+
+        stream, chunks = self.export("national-ids", "ndjson", {"created_before": "2024-01-02T00:00:00Z"})
+        self.assertEqual([json.loads(line)["national_id"] for line in b"".join(chunks).splitlines()], [NATIONAL_IDS[0]])
+
+        stream, chunks = self.export("api-logs", "ndjson", {"ip_address": "10.0.0.2", "created_after": "2000-01-01"})
+        self.assertEqual([json.loads(line)["national_id"] for line in b"".join(chunks).splitlines()], [NATIONAL_IDS[1]])
+
+    def test_invalid_parameters(self):
+        for params, after in (({"birth_year_min": "x"}, None), ({"created_after": "yesterday"}, None), ({}, "x")):
+            with self.assertRaises(ValueError):
+                export_queryset(EXPORTS["national-ids"], params, after=after)
+        with self.assertRaises(ValueError):
+            ExportStream(EGYNationalIDInfo.objects.all(), ("id",), "xml")
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        create_rows()
+        _, key = APIKey.objects.create_key(name="test")
+        self.headers = {"HTTP_AUTHORIZATION": f"Api-Key {key}"}
+
+    def test_streams_exports(self):
+        response = self.client.get("/api/export/national-ids.csv", {"birth_year_max": "1999"}, **self.headers)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="national-ids.csv"')
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([row["national_id"] for row in rows], [NATIONAL_IDS[0]])
+
+        response = self.client.get("/api/export/api-logs.ndjson", **self.headers)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 2)
+
+    def test_errors(self):
+        self.assertEqual(self.client.get("/api/export/national-ids.csv").status_code, 403)
+        self.assertEqual(self.client.get("/api/export/users.csv", **self.headers).status_code, 404)
+        self.assertEqual(self.client.get("/api/export/national-ids.xml", **self.headers).status_code, 404)
+        response = self.client.get("/api/export/national-ids.csv", {"after": "abc"}, **self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid resume token 'abc'."})
+
+
+class ExportDataCommandTests(TestCase):
+    def setUp(self):
+        create_rows()
+
+    def test_export_to_file_and_stdout(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "national-ids.csv")
+            stderr = StringIO()
+            call_command("export_data", "national-ids", path, chunk_size=1, birth_year_min="2000", stderr=stderr)
+            with open(path, newline="") as exported:
+                rows = list(csv.DictReader(exported))
+        self.assertEqual([row["national_id"] for row in rows], NATIONAL_IDS[1:])
+        self.assertIn(f"Exported 2 rows; resume token (last id): {rows[-1]['id']}.", stderr.getvalue())
+
+        stdout = StringIO()
+        first_log = APILog.objects.order_by("pk").first()
+        call_command("export_data", "api-logs", "-", format="ndjson", after=first_log.pk, stdout=stdout, stderr=StringIO())
+        self.assertEqual(len(stdout.getvalue().splitlines()), 1)
+
+    def test_invalid_arguments(self):
+        for args, options in (
+            (["national-ids", "out.txt"], {}),
+            (["national-ids", "out.csv"], {"chunk_size": 0}),
+            (["api-logs", "out.csv"], {"birth_year_min": "1990"}),
+            (["national-ids", "out.csv"], {"created_after": "not a date"}),
+        ):
+            with self.assertRaises(CommandError):
+                call_command("export_data", *args, stderr=StringIO(), **options)
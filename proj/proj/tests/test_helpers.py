@@ -4,12 +4,15 @@ from unittest.mock import Mock
 from datetime import datetime
 from rest_framework_api_key.models import APIKey
 from National_ID_Processing.helpers import validate_national_id, extract_info
+from National_ID_Processing.ratelimit import reset_rate_limits
 import pytest 
 from django.urls import reverse
 
 
 class NationalIDTests(TestCase):
     def setUp(self):
+        reset_rate_limits()
+
         # Generate an API key for testing
         self.api_key, _ = APIKey.objects.create_key(name="test")
         self.api_key = str(self.api_key)
@@ -30,8 +33,8 @@ class NationalIDTests(TestCase):
 
         # Test data: Valid IDs
         self.valid_ids = [
-            {"id": "29001011234567", "description": "Valid National ID, male"},
-            {"id": "32402292234568", "description": "Valid leap year date (February 29th), female"},
+            {"id": "29001011234564", "description": "Valid National ID, male"},
+            {"id": "32402292234565", "description": "Valid leap year date (February 29th), female"},
 
         ]
 
@@ -108,8 +111,38 @@ class NationalIDTests(TestCase):
                 self.assertIn("birth_day", result)
                 self.assertIn("gender", result)
 
+    def test_structural_checks(self):
+        """Test governorate code and check digit validation and extraction."""
+        cases = [
+            ("29001019934565", "Invalid governorate code in National ID."),
+            ("29001011234565", "Invalid check digit in National ID."),
+        ]
+        for national_id, expected_error in cases:
+            with self.subTest(national_id=national_id):
+                self.assertEqual(validate_national_id(national_id), (False, expected_error))
+
+        result = extract_info(self.valid_ids[0]["id"])
+        self.assertEqual(result["governorate_code"], 12)
+        self.assertEqual(result["governorate"], "Dakahlia")
+        self.assertEqual(result["serial"], "3456")
+        self.assertEqual(result["check_digit"], 4)
+
     def test_index_view(self):
         """Test the index view renders the correct template."""
         response = self.client.get(reverse('index'))  # Assuming the URL name for `index` is 'index'
         self.assertEqual(response.status_code, 200, "Index view should return a 200 status code")
         self.assertTemplateUsed(response, 'index.html', "Index view should use 'index.html' template")
+
+    def test_non_ascii_digits_and_newlines(self):
+        """Other scripts' digits and a trailing newline are invalid formats, also once the same ASCII ID is stored."""
+        arabic_indic = "3\u0660\u0660\u0660\u0662\u0660\u0662\u0660\u0661\u0660\u0660\u0660\u0661\u0667"
+        for national_id in (arabic_indic, "30002020100017\n"):
+            self.assertEqual(validate_national_id(national_id), (False, "Invalid format: National ID must be 14 digits."))
+
+        _, key = APIKey.objects.create_key(name="test")
+        for national_id in ("30002020100017", arabic_indic, "30002020100017\n") * 2:
+            with self.subTest(national_id=national_id):
+                response = self.client.post(
+                    "/api/national-id/", {"national_id": national_id}, HTTP_AUTHORIZATION=f"Api-Key {key}", format="json",
+                )
+                self.assertEqual(response.status_code, 200 if national_id == "30002020100017" else 400)
@@ -0,0 +1,119 @@
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from National_ID_Processing.management.commands.ingest_national_ids import validate_chunk
+from National_ID_Processing.models import EGYNationalIDInfo
+from National_ID_Processing.stats import distribution
+
+
+class IngestNationalIDsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.national_ids = ["29001011234564", "29013231234567", "32402292234565", "29001011234564", "123"]
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write_csv(self, name, national_ids):
+        with open(self.path(name), "w", newline="") as input_file:
+            writer = csv.writer(input_file)
+            writer.writerow(["name", "national_id"])
+            writer.writerows([["someone", national_id] for national_id in national_ids])
+        return self.path(name)
+
+    def ingest(self, *args, **options):
+        call_command("ingest_national_ids", *args, stdout=StringIO(), **options)
+
+    def read_output(self, path):
+        with open(path, newline="") as output_file:
+            return list(csv.DictReader(output_file))
+
+    def test_csv_ingestion(self):
+        """Every ID gets an output row and valid IDs are upserted once."""
+        input_path = self.write_csv("ids.csv", self.national_ids)
+        output_path = self.path("results.csv")
+        EGYNationalIDInfo.objects.create(national_id="29001011234564", birth_date=date(1, 1, 1))
+
+        self.ingest(input_path, output_path, chunk_size=2)
+
+        rows = self.read_output(output_path)
+        self.assertEqual([row["national_id"] for row in rows], self.national_ids)
+        self.assertEqual([row["valid"] for row in rows], ["True", "False", "True", "True", "False"])
+        self.assertEqual(rows[2]["governorate"], "Beni Suef")
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 2)
+        self.assertEqual(EGYNationalIDInfo.objects.get(national_id="29001011234564").birth_year, 1990)
+        # The overwritten row moved to its new bucket
+        self.assertEqual(distribution(["birth_year"])[0], [{"birth_year": 1990, "count": 1}, {"birth_year": 2024, "count": 1}])
+
+        with open(output_path + ".checkpoint") as checkpoint_file:
+            self.assertEqual(json.load(checkpoint_file)["offset"], 5)
+
+    def test_resume_from_checkpoint(self):
+        """A resumed run drops partial output and continues after the checkpoint."""
+        input_path = self.write_csv("ids.csv", self.national_ids)
+        self.ingest(input_path, self.path("expected.csv"), chunk_size=2)
+
+        output_path = self.path("results.csv")
+        self.ingest(self.write_csv("head.csv", self.national_ids[:2]), output_path, chunk_size=2)
+        with open(output_path, "a") as output_file:
+            output_file.write("partial,row\n")
+        EGYNationalIDInfo.objects.all().delete()
+
+        self.ingest(input_path, output_path, chunk_size=2)
+        self.assertEqual(self.read_output(output_path), self.read_output(self.path("expected.csv")))
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 2)
+
+        EGYNationalIDInfo.objects.all().delete()
+        self.ingest(self.write_csv("head.csv", self.national_ids[:2]), output_path, chunk_size=2, restart=True)
+        self.assertEqual(len(self.read_output(output_path)), 2)
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 1)
+
+    def test_ndjson_with_workers(self):
+        """NDJSON input is validated in worker processes, keeping input order."""
+        input_path = self.path("ids.jsonl")
+        with open(input_path, "w") as input_file:
+            input_file.write('"29001011234564"\n\n{"national_id": "32402292234565"}\n29001011234564\nnot json\n')
+        output_path = self.path("results.ndjson")
+
+        self.ingest(input_path, output_path, chunk_size=1, workers=2)
+
+        with open(output_path) as output_file:
+            rows = [json.loads(line) for line in output_file]
+        self.assertEqual([row["valid"] for row in rows], [True, True, False, False])
+        self.assertEqual(rows[3]["national_id"], "not json")
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 2)
+        self.assertEqual(validate_chunk([29001011234564])[0]["error"], "Invalid format: National ID must be 14 digits.")
+
+    def test_parquet(self):
+        """Parquet files are read in record batches through pyarrow."""
+        batch = Mock()
+        batch.column.return_value.to_pylist.return_value = ["29001011234564", "123"]
+        pyarrow = Mock()
+        pyarrow.parquet.ParquetFile.return_value.iter_batches.return_value = [batch]
+        output_path = self.path("results.csv")
+
+        with patch.dict(sys.modules, {"pyarrow": pyarrow, "pyarrow.parquet": pyarrow.parquet}):
+            self.ingest(self.path("ids.parquet"), output_path, column="id")
+
+        pyarrow.parquet.ParquetFile.return_value.iter_batches.assert_called_once_with(columns=["id"])
+        self.assertEqual([row["valid"] for row in self.read_output(output_path)], ["True", "False"])
+
+    def test_errors(self):
+        """Unknown formats, missing columns and missing pyarrow are reported."""
+        with self.assertRaises(CommandError):
+            self.ingest(self.path("ids.txt"), self.path("results.csv"))
+        with self.assertRaises(CommandError):
+            self.ingest(self.write_csv("ids.csv", []), self.path("results.csv"), column="id")
+        with patch.dict(sys.modules, {"pyarrow": None, "pyarrow.parquet": None}), self.assertRaises(CommandError):
+            self.ingest(self.path("ids.parquet"), self.path("results.csv"))
@@ -0,0 +1,109 @@
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache, caches
+from django.test import TestCase, TransactionTestCase
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.log_pipeline import APILogPipeline, get_api_log_pipeline
+from National_ID_Processing.models import APILog
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.result_cache import get_result_cache
+
+
+class APILogPipelineTests(TestCase):
+    def test_flush_writes_in_batches(self):
+        """Queued records are written with one bulk insert per batch."""
+        pipeline = APILogPipeline(batch_size=2)
+        for index in range(5):
+            self.assertTrue(pipeline.submit("127.0.0.1", f"2900101123456{index}", start=False))
+
+        with patch.object(APILog.objects, "bulk_create", wraps=APILog.objects.bulk_create) as bulk_create:
+            pipeline.flush()
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 2, 1])
+        self.assertEqual(APILog.objects.count(), 5)
+        self.assertEqual(pipeline.written, 5)
+
+    def test_backpressure_drops_records(self):
+        """Records are dropped, not queued without bound, when the queue is full."""
+        pipeline = APILogPipeline(max_queue_size=1, put_timeout=0)
+        self.assertTrue(pipeline.submit("127.0.0.1", "29001011234564", start=False))
+        self.assertFalse(pipeline.submit("127.0.0.1", "29001011234564", start=False))
+        self.assertEqual(pipeline.dropped, 1)
+
+    def test_backpressure_deadline_per_batch(self):
+        """A batch waits for room once, then drops the records that do not fit."""
+        pipeline = APILogPipeline(max_queue_size=2, put_timeout=0.05)
+        national_ids = [f"2900101123456{index}" for index in range(10)]
+        started = time.monotonic()
+        self.assertEqual(pipeline.submit_many("127.0.0.1", national_ids, start=False), 2)
+        self.assertLess(time.monotonic() - started, 0.05 * 4)
+        self.assertEqual(pipeline.dropped, 8)
+
+        pipeline.flush()
+        self.assertEqual(list(APILog.objects.order_by("pk").values_list("national_id", flat=True)), national_ids[:2])
+
+    def test_write_failures_are_counted(self):
+        """A failing batch is logged and counted instead of killing the writer."""
+        pipeline = APILogPipeline()
+        pipeline.submit("127.0.0.1", "29001011234564", start=False)
+        with patch.object(APILog.objects, "bulk_create", side_effect=RuntimeError), \
+                self.assertLogs("National_ID_Processing.log_pipeline", level="ERROR"):
+            pipeline.flush()
+        self.assertEqual(pipeline.failed, 1)
+
+
+class APILogPipelineThreadTests(TransactionTestCase):
+    def test_background_thread_and_shutdown_flush(self):
+        """The writer thread flushes on the time threshold and on shutdown."""
+        pipeline = APILogPipeline(batch_size=3, flush_interval=0.05)
+        for index in range(7):
+            pipeline.submit("127.0.0.1", f"2900101123456{index}")
+
+        deadline = time.monotonic() + 5
+        while pipeline.written < 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pipeline.written, 7)
+
+        pipeline.submit("127.0.0.1", "29001011234564")
+        pipeline.stop()
+        self.assertEqual(APILog.objects.count(), 8)
+        self.assertIsNone(pipeline._thread)
+
+    def test_restart_after_fork(self):
+        """A forked process starts its own writer thread with an empty queue."""
+        pipeline = APILogPipeline(flush_interval=0.05)
+        pipeline.stop()
+        pipeline.start()
+        parent_queue = pipeline._queue
+        self.addCleanup(pipeline._thread.join)
+        self.addCleanup(pipeline._stopping.set)
+
+        with patch("National_ID_Processing.log_pipeline.os.getpid", return_value=-1):
+            pipeline.start()
+            self.assertIsNot(pipeline._queue, parent_queue)
+            self.assertEqual(pipeline._pid, -1)
+            pipeline.stop()
+
+    def test_views_log_through_the_pipeline(self):
+        """With the pipeline enabled, views queue their APILog records."""
+        cache.clear()
+        caches["shared"].clear()
+        reset_rate_limits()
+        get_result_cache().clear()
+        _, key = APIKey.objects.create_key(name="test")
+        options = {"ENABLED": True, "FLUSH_INTERVAL": 0.05}
+
+        with self.settings(NATIONAL_ID_API_LOG_PIPELINE=options):
+            pipeline = get_api_log_pipeline()
+            self.assertIs(get_api_log_pipeline(), pipeline)
+            self.client.post(
+                "/api/national-id/", {"national_id": "29001011234564"}, content_type="application/json",
+                HTTP_AUTHORIZATION=f"Api-Key {key}",
+            )
+            self.client.post(
+                "/api/national-id/batch/", ["29001011234564", "32402292234565"], content_type="application/json",
+                HTTP_AUTHORIZATION=f"Api-Key {key}",
+            )
+        # Leaving the settings override stops the pipeline, flushing its queue
+        self.assertEqual(APILog.objects.count(), 3)
+        self.assertEqual(pipeline.written, 3)
@@ -0,0 +1,73 @@
+import logging
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from National_ID_Processing import helpers, logging_utils
+from National_ID_Processing.helpers import validate_national_id
+from National_ID_Processing.logging_utils import RateLimitedLogger, mask_national_id
+
+
+class MaskNationalIDTests(SimpleTestCase):
+    def test_mask_national_id(self):
+        """Only the configured number of trailing digits stay visible."""
+        self.assertEqual(mask_national_id("29001011234567", visible_digits=4), "**********4567")
+        self.assertEqual(mask_national_id("29001011234567", visible_digits=0), "*" * 14)
+        self.assertEqual(mask_national_id("123", visible_digits=4), "123")
+        self.assertEqual(mask_national_id(None), "None")
+
+    def test_configure(self):
+        """`configure` changes the default number of visible digits."""
+        self.addCleanup(logging_utils.configure, logging_utils.MASK_VISIBLE_DIGITS)
+        logging_utils.configure(mask_visible_digits=2)
+        self.assertEqual(mask_national_id("29001011234567"), "************67")
+        logging_utils.configure()
+        self.assertEqual(logging_utils.MASK_VISIBLE_DIGITS, 2)
+
+
+class RateLimitedLoggerTests(SimpleTestCase):
+    def test_records_over_the_limit_are_suppressed(self):
+        """Records over the limit are dropped and reported in the next interval."""
+        logger = logging.getLogger("test.rate_limited")
+        rate_limited = RateLimitedLogger(logger, max_records=2, interval=60.0)
+
+        with patch("National_ID_Processing.logging_utils.time.monotonic", return_value=100.0):
+            with self.assertLogs(logger, level="WARNING") as logs:
+                for _ in range(5):
+                    rate_limited.warning("rejected %s", "id")
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(rate_limited.suppressed, 3)
+
+        with patch("National_ID_Processing.logging_utils.time.monotonic", return_value=200.0):
+            with self.assertLogs(logger, level="ERROR") as logs:
+                rate_limited.error("rejected %s", "id")
+        self.assertEqual(logs.output[0], "ERROR:test.rate_limited:3 similar log records were suppressed.")
+        self.assertEqual(rate_limited.suppressed, 0)
+
+    def test_disabled_level_is_skipped(self):
+        """Nothing is counted when the level is disabled."""
+        logger = logging.getLogger("test.rate_limited.disabled")
+        logger.setLevel(logging.CRITICAL)
+        self.addCleanup(logger.setLevel, logging.NOTSET)
+        rate_limited = RateLimitedLogger(logger, max_records=1)
+
+        rate_limited.error("rejected")
+        self.assertEqual(rate_limited.emitted, 0)
+
+
+class HelpersLoggingTests(SimpleTestCase):
+    def test_rejected_ids_are_masked(self):
+        """Validated and rejected IDs are logged masked, with structured fields."""
+        error_logger = RateLimitedLogger(helpers.logger)
+        with patch.object(helpers, "error_logger", error_logger):
+            with self.assertLogs("National_ID_Processing.helpers", level="DEBUG") as logs:
+                validate_national_id("29001011234564")
+                validate_national_id("29013231234567")
+        self.assertEqual(len(logs.records), 5)
+        self.assertTrue(all("2900101" not in line for line in logs.output))
+        rejected = logs.records[-1]
+        self.assertEqual(rejected.validation_error, "Invalid month in National ID.")
+        self.assertEqual(rejected.national_id, "**********4567")
+
+    def test_no_root_logger_configuration(self):
+        """Importing the helpers does not configure the root logger."""
+        self.assertEqual(logging.getLogger().level, logging.WARNING)
@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.test import AsyncClient, SimpleTestCase, TestCase, modify_settings, override_settings
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.metrics import Metrics, count_validations, get_metrics, timed
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.result_cache import get_result_cache
+
+
+class MetricsTests(SimpleTestCase):
+    def test_render(self):
+        """Stage histograms and validation counts are rendered in the Prometheus format."""
+        metrics = Metrics(buckets=(0.1, 0.01))
+        with patch("National_ID_Processing.metrics.time.perf_counter", side_effect=[0.0, 0.005, 1.0, 1.5]):
+            with metrics.timed("national_id", "validate"):
+                pass
+            with metrics.timed("national_id", "validate"):
+                pass
+        metrics.count_validations("national_id", [None, None, "Invalid check digit in National ID.", "unknown"])
+
+        self.assertEqual(metrics.render().splitlines()[2:], [
+            'national_id_stage_seconds_bucket{view="national_id",stage="validate",le="0.01"} 1',
+            'national_id_stage_seconds_bucket{view="national_id",stage="validate",le="0.1"} 1',
+            'national_id_stage_seconds_bucket{view="national_id",stage="validate",le="+Inf"} 2',
+            'national_id_stage_seconds_sum{view="national_id",stage="validate"} 0.505',
+            'national_id_stage_seconds_count{view="national_id",stage="validate"} 2',
+            "# HELP national_id_validations_total National IDs validated, by outcome.",
+            "# TYPE national_id_validations_total counter",
+            'national_id_validations_total{view="national_id",result="invalid_check_digit"} 1',
+            'national_id_validations_total{view="national_id",result="invalid_format"} 1',
+            'national_id_validations_total{view="national_id",result="valid"} 2',
+        ])
+
+    def test_disabled(self):
+        """Disabled metrics record nothing and cost a no-op context manager."""
+        with override_settings(NATIONAL_ID_METRICS={"ENABLED": False}):
+            self.assertIsNone(get_metrics())
+            with timed("national_id", "validate") as timer:
+                self.assertIsNone(timer)
+            count_validations("national_id", [None])
+
+
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        get_result_cache().clear()
+        _, key = APIKey.objects.create_key(name="test")
+        self.headers = {"HTTP_AUTHORIZATION": f"Api-Key {key}"}
+
+    @override_settings(NATIONAL_ID_METRICS={"ENABLED": True})
+    def test_endpoints_are_instrumented(self):
+        """Every stage of the national ID endpoints is timed and outcomes are counted."""
+        self.client.post("/api/national-id/", {"national_id": "29001011234564"}, **self.headers)
+        self.client.post("/api/national-id/", {"national_id": "29001011234565"}, **self.headers)
+        self.client.post("/api/national-id/batch/", ["32402292234565", "29013231234567"], content_type="application/json", **self.headers)
+
+        response = self.client.get("/metrics", **self.headers)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        body = response.content.decode()
+        for stage in ("request", "api_key", "rate_limit", "result_cache", "validate", "extract", "save", "serialize", "log", "render"):
+            self.assertIn(f'national_id_stage_seconds_count{{view="national_id",stage="{stage}"}}', body)
+        self.assertIn('national_id_stage_seconds_count{view="national_id",stage="validate"} 2', body)
+        self.assertIn('national_id_validations_total{view="national_id",result="valid"} 1', body)
+        self.assertIn('national_id_validations_total{view="national_id",result="invalid_check_digit"} 1', body)
+        self.assertIn('national_id_validations_total{view="national_id_batch",result="invalid_month"} 1', body)
+
+    async def test_async_endpoint_is_instrumented(self):
+        with override_settings(NATIONAL_ID_METRICS={"ENABLED": True}):
+            await self.async_client.post(
+                "/api/national-id/async/", {"national_id": "29001011234564"}, content_type="application/json",
+                headers={"Authorization": self.headers["HTTP_AUTHORIZATION"]},
+            )
+            body = get_metrics().render()
+        self.assertIn('national_id_stage_seconds_count{view="national_id_async",stage="save"} 1', body)
+        self.assertIn('national_id_validations_total{view="national_id_async",result="valid"} 1', body)
+
+    def test_metrics_view(self):
+        """/metrics requires an API key and is empty when metrics are disabled."""
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with override_settings(NATIONAL_ID_METRICS={"ENABLED": False}):
+            response = self.client.get("/metrics", **self.headers)
+        self.assertEqual((response.status_code, response.content), (200, b""))
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+
+    def test_profiles_requests_with_the_header(self):
+        """Requests sent with X-Profile: 1 are profiled, logged and saved."""
+        with tempfile.TemporaryDirectory() as directory:
+            profiling = {"ENABLED": True, "SAMPLE_RATE": 1.0, "DIRECTORY": directory}
+            with override_settings(NATIONAL_ID_PROFILING=profiling), \
+                    self.assertLogs("National_ID_Processing.profiling", "INFO") as logs:
+                response = self.client.get("/", HTTP_X_PROFILE="1")
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response["X-Profile-File"].endswith(".prof"))
+            self.assertEqual(os.listdir(directory), [response["X-Profile-File"]])
+        self.assertIn("Profile of GET /", logs.output[0])
+
+    def test_skips_unsampled_requests(self):
+        for profiling, headers in (
+            ({"ENABLED": False}, {"HTTP_X_PROFILE": "1"}),
+            ({"ENABLED": True}, {}),
+            ({"ENABLED": True, "SAMPLE_RATE": 0.0}, {"HTTP_X_PROFILE": "1"}),
+        ):
+            with override_settings(NATIONAL_ID_PROFILING=profiling):
+                response = self.client.get("/", **headers)
+            self.assertNotIn("X-Profile-File", response)
+
+    def test_pyinstrument(self):
+        """PROFILER "pyinstrument" saves an HTML report."""
+        pyinstrument = MagicMock()
+        pyinstrument.Profiler.return_value.output_text.return_value = "text report"
+        pyinstrument.Profiler.return_value.output_html.return_value = "<html></html>"
+        with tempfile.TemporaryDirectory() as directory, patch.dict(sys.modules, {"pyinstrument": pyinstrument}):
+            profiling = {"ENABLED": True, "PROFILER": "pyinstrument", "DIRECTORY": directory}
+            with override_settings(NATIONAL_ID_PROFILING=profiling), self.assertLogs("National_ID_Processing.profiling", "INFO"):
+                response = self.client.get("/", HTTP_X_PROFILE="1")
+            with open(os.path.join(directory, response["X-Profile-File"])) as report:
+                self.assertEqual(report.read(), "<html></html>")
+        pyinstrument.Profiler.assert_called_once_with(async_mode="enabled")
+
+    @modify_settings(MIDDLEWARE={"remove": "drf_api_logger.middleware.api_logger_middleware.APILoggerMiddleware"})
+    async def test_async_requests(self):
+        """Without sync-only middleware, requests are profiled on the event loop."""
+        client = AsyncClient()
+        with override_settings(NATIONAL_ID_PROFILING={"ENABLED": True}), \
+                self.assertLogs("National_ID_Processing.profiling", "INFO"):
+            response = await client.get("/", headers={"X-Profile": "1"})
+        self.assertEqual(response.status_code, 200)
+        with override_settings(NATIONAL_ID_PROFILING={"ENABLED": False}):
+            response = await client.get("/")
+        self.assertEqual(response.status_code, 200)
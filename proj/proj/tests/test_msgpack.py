@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import msgpack
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.models import APILog, EGYNationalIDInfo
+from National_ID_Processing.parsers import PackedNationalIDs
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.renderers import MessagePackRenderer
+from National_ID_Processing.result_cache import get_result_cache
+
+
+MSGPACK = "application/msgpack"
+PACKED = "application/x-packed-national-ids"
+
+
+class PackedNationalIDsTests(SimpleTestCase):
+    def test_records(self):
+        """Records are read from the body in place and validated like the scalar validator."""
+        body = bytearray(b"29001011234564" + b"2900101123456\xe9" + b"32402292234565")
+        packed = PackedNationalIDs(body)
+        self.assertEqual(len(packed), 3)
+        self.assertEqual(list(packed), ["29001011234564", "2900101123456é", "32402292234565"])
+        self.assertEqual([packed[index] for index in range(3)], list(packed))
+        self.assertEqual(packed[-1], "32402292234565")
+        with self.assertRaises(IndexError):
+            packed[3]
+        self.assertEqual(packed.validate(), [
+            (True, None), (False, "Invalid format: National ID must be 14 digits."), (True, None),
+        ])
+
+        # The records share the body's memory
+        body[:2] = b"30"
+        self.assertEqual(packed[0], "30001011234564")
+
+        with self.assertRaises(ValueError):
+            PackedNationalIDs(b"2900101123456")
+
+    def test_renderer(self):
+        data = {"created_at": datetime(2024, 2, 29, tzinfo=timezone.utc), "amount": Decimal("1.10"), "none": None}
+        self.assertEqual(msgpack.unpackb(MessagePackRenderer().render(data)), {
+            "created_at": "2024-02-29T00:00:00Z", "amount": 1.1, "none": None,
+        })
+        self.assertEqual(MessagePackRenderer().render(None), b"")
+
+
+class MessagePackAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+        get_result_cache().clear()
+        _, key = APIKey.objects.create_key(name="test")
+        self.headers = {"HTTP_AUTHORIZATION": f"Api-Key {key}", "HTTP_ACCEPT": MSGPACK}
+
+    def post(self, url, body, content_type=MSGPACK):
+        if content_type == MSGPACK:
+            body = msgpack.packb(body)
+        response = self.client.post(url, body, content_type=content_type, **self.headers)
+        if response["Content-Type"] == MSGPACK:
+            response.data_ = msgpack.unpackb(response.content)
+        return response
+
+    def test_single(self):
+        response = self.post("/api/national-id/", {"national_id": "29001011234564"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data_["data"]["governorate"], "Dakahlia")
+
+        response = self.post("/api/national-id/", {"national_id": "2900101123456"})
+        self.assertEqual((response.status_code, response.data_), (400, {"error": "Invalid format: National ID must be 14 digits."}))
+
+        response = self.post("/api/national-id/", b"\xc1", content_type=MSGPACK + "x")
+        self.assertEqual(response.status_code, 415)
+        response = self.client.post("/api/national-id/", b"\xc1", content_type=MSGPACK, **self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("MessagePack parse error", msgpack.unpackb(response.content)["detail"])
+
+    def test_batch_columns(self):
+        """MessagePack batch responses hold one list per field, in request order."""
+        response = self.post("/api/national-id/batch/", ["29001011234564", {"national_id": "32402292234565"}, 12345, "29001011234564"])
+        self.assertEqual(response.status_code, 200)
+        columns = response.data_["columns"]
+        self.assertEqual(list(columns), [
+            "national_id", "error", "birth_year", "birth_month", "birth_day", "gender", "governorate", "created_at",
+        ])
+        self.assertEqual(columns["national_id"], ["29001011234564", "32402292234565", 12345, "29001011234564"])
+        self.assertEqual(columns["error"], [None, None, "Invalid format: National ID must be 14 digits.", None])
+        self.assertEqual(columns["birth_year"], [1990, 2024, None, 1990])
+        self.assertEqual(columns["gender"], ["female", "female", None, "female"])
+        self.assertEqual(response.data_["message"], "Data processed successfully.")
+        self.assertEqual(APILog.objects.count(), 3)
+
+    def test_packed_batch(self):
+        """Packed bodies are validated in place; JSON clients get the usual rows."""
+        body = b"29001011234564" + b"29013231234567" + b"32501071234569"
+        response = self.post("/api/national-id/batch/", body, content_type=PACKED)
+        self.assertEqual(response.status_code, 200)
+        columns = response.data_["columns"]
+        self.assertEqual(columns["national_id"], ["29001011234564", "29013231234567", "32501071234569"])
+        self.assertEqual(columns["error"], [None, "Invalid month in National ID.", None])
+        self.assertEqual(columns["birth_day"], [1, None, 7])
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 2)
+
+        response = self.client.post(
+            "/api/national-id/batch/", body[:14], content_type=PACKED, HTTP_AUTHORIZATION=self.headers["HTTP_AUTHORIZATION"],
+        )
+        self.assertEqual(response.json()["results"][0]["data"]["birth_year"], 1990)
+
+        for body in (b"", body[:20]):
+            response = self.post("/api/national-id/batch/", body, content_type=PACKED)
+            self.assertEqual(response.status_code, 400)
+        self.assertIn("multiple of 14 bytes", response.data_["detail"])
+
+        with self.settings(NATIONAL_ID_BATCH_MAX_SIZE=2):
+            response = self.post("/api/national-id/batch/", b"29001011234564" * 3, content_type=PACKED)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing import permissions
+from National_ID_Processing.permissions import CachedHasAPIKey, get_api_key_cache
+from National_ID_Processing.result_cache import ResultCache
+
+
+class CachedHasAPIKeyTests(TestCase):
+    def setUp(self):
+        get_api_key_cache().clear()
+        caches["shared"].clear()
+        self.api_key, self.key = APIKey.objects.create_key(name="test")
+        self.permission = CachedHasAPIKey()
+
+    def request(self, key):
+        return RequestFactory().get("/", HTTP_AUTHORIZATION=f"Api-Key {key}")
+
+    def has_permission(self, key):
+        return self.permission.has_permission(self.request(key), Mock())
+
+    def test_verified_keys_are_cached(self):
+        """A verified key is checked again without its lookup and hashing."""
+        # The first verification gives the key a version, the second caches it
+        self.assertTrue(self.has_permission(self.key))
+        self.assertIsNone(get_api_key_cache().get(self.api_key.prefix))
+        self.assertTrue(self.has_permission(self.key))
+        with self.assertNumQueries(1), patch.object(APIKey.objects, "get_from_key") as get_from_key:
+            # The only query reads the key's version from the shared (database) cache
+            self.assertTrue(self.has_permission(self.key))
+        get_from_key.assert_not_called()
+
+        # Another secret for the same prefix is verified, and rejected
+        prefix = self.key.partition(".")[0]
+        self.assertFalse(self.has_permission(f"{prefix}.wrong-secret"))
+        self.assertFalse(self.has_permission("unknown key"))
+        self.assertFalse(self.permission.has_permission(RequestFactory().get("/"), Mock()))
+        # Unknown keys leave nothing in the shared cache
+        self.assertIsNone(caches["shared"].get(permissions._version_key("unknown key")))
+
+    def test_revoked_and_deleted_keys(self):
+        """Revoking or deleting a key drops it from the cache."""
+        self.assertTrue(self.has_permission(self.key))
+        self.assertTrue(self.has_permission(self.key))
+        self.api_key.revoked = True
+        self.api_key.save()
+        self.assertFalse(self.has_permission(self.key))
+
+        other, other_key = APIKey.objects.create_key(name="other")
+        self.assertTrue(self.has_permission(other_key))
+        self.assertTrue(self.has_permission(other_key))
+        other.delete()
+        self.assertFalse(self.has_permission(other_key))
+
+    def test_revoked_in_another_process(self):
+        """A key revoked in another process, with its own cache, is rejected at once."""
+        self.assertTrue(self.has_permission(self.key))
+        self.assertTrue(self.has_permission(self.key))
+        with patch.object(permissions, "_api_key_cache", ResultCache(max_size=10, ttl=30)):
+            self.api_key.revoked = True
+            self.api_key.save()
+        self.assertIsNotNone(get_api_key_cache().get(self.api_key.prefix))
+        self.assertFalse(self.has_permission(self.key))
+
+    def test_shared_cache(self):
+        """Keys are verified every time while the shared cache fails; without one, the local cache is trusted."""
+        with patch.object(caches["shared"], "get", side_effect=ConnectionError), \
+                patch.object(caches["shared"], "add", side_effect=ConnectionError), \
+                patch.object(permissions, "error_logger") as error_logger:
+            self.assertTrue(self.has_permission(self.key))
+            self.assertTrue(self.has_permission(self.key))
+            self.assertIsNone(get_api_key_cache().get(self.api_key.prefix))
+        self.assertEqual(error_logger.error.call_count, 4)
+
+        # Creating and revoking keys still works; this process drops the key at once
+        other, other_key = APIKey.objects.create_key(name="other")
+        self.assertTrue(self.has_permission(other_key))
+        self.assertTrue(self.has_permission(other_key))
+        with patch.object(caches["shared"], "delete", side_effect=ConnectionError), \
+                patch.object(permissions, "error_logger") as error_logger:
+            APIKey.objects.create_key(name="another")
+            other.revoked = True
+            other.save()
+            self.assertFalse(self.has_permission(other_key))
+        self.assertEqual(error_logger.error.call_count, 2)
+
+        with self.settings(NATIONAL_ID_API_KEY_CACHE={"SHARED_CACHE_ALIAS": None}):
+            self.assertTrue(self.has_permission(self.key))
+            with self.assertNumQueries(0):
+                self.assertTrue(self.has_permission(self.key))
+            self.api_key.delete()
+            self.assertFalse(self.has_permission(self.key))
+
+    def test_expiry(self):
+        """Keys stop being accepted from the cache once their expiry date passes."""
+        self.api_key.expiry_date = timezone.now() + timedelta(minutes=1)
+        self.api_key.save()
+        self.assertTrue(self.has_permission(self.key))
+        self.assertTrue(self.has_permission(self.key))
+
+        with patch("django.utils.timezone.now", return_value=timezone.now() + timedelta(minutes=2)):
+            self.assertFalse(self.has_permission(self.key))
+
+    async def test_async(self):
+        """The async check uses the same cache, and verifies keys off the event loop."""
+        request = self.request(self.key)
+        self.assertTrue(await self.permission.ahas_permission(request))
+        self.assertTrue(await self.permission.ahas_permission(request))
+        with patch.object(APIKey.objects, "get_from_key") as get_from_key:
+            self.assertTrue(await self.permission.ahas_permission(request))
+        get_from_key.assert_not_called()
+        with patch.object(permissions, "sync_to_async", wraps=permissions.sync_to_async) as wrapped:
+            self.assertFalse(await self.permission.ahas_permission(self.request("unknown.key")))
+        self.assertEqual(wrapped.call_args[0][0], self.permission._verify)
+        self.assertFalse(await self.permission.ahas_permission(self.request("unknown.key")))
+        prefix = self.key.partition(".")[0]
+        self.assertFalse(await self.permission.ahas_permission(self.request(f"{prefix}.wrong-secret")))
+        self.assertFalse(await self.permission.ahas_permission(RequestFactory().get("/")))
+
+    def test_disabled(self):
+        """Without the cache every request is verified against the database."""
+        with self.settings(NATIONAL_ID_API_KEY_CACHE={"ENABLED": False}):
+            self.assertIsNone(get_api_key_cache())
+            self.assertTrue(self.has_permission(self.key))
+            with self.assertNumQueries(1):
+                self.assertTrue(self.has_permission(self.key))
+            self.api_key.delete()
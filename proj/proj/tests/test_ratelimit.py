@@ -0,0 +1,229 @@
+import threading
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing import ratelimit
+from National_ID_Processing.models import RateLimitCounter
+from National_ID_Processing.ratelimit import (
+    CacheCounters, DatabaseCounters, SlidingWindowLimiter, get_rate_limiters, parse_rate, rate_limit,
+    reset_rate_limits,
+)
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def limiter(self, limit=10, window=60, sync_interval=1.0, **kwargs):
+        return SlidingWindowLimiter(limit, window, cache_alias="default", sync_interval=sync_interval, **kwargs)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/m"), (10, 60))
+        self.assertEqual(parse_rate("1000/hour"), (1000, 3600))
+
+    def test_limit_and_retry_after(self):
+        """The limit is enforced within a window and Retry-After covers the wait."""
+        limiter = self.limiter()
+        results = [limiter.hit("client", now=6000 + second) for second in range(11)]
+        self.assertEqual(results[:10], [None] * 10)
+        # 10 hits in this window: wait for the next one, then for 1/10 of the
+        # previous window to slide out
+        self.assertEqual(results[10], 60 - 10 + 6)
+
+        # Halfway through the next window, half of the previous hits still count
+        self.assertEqual([limiter.hit("client", now=6090) for _ in range(6)], [None] * 5 + [6])
+        self.assertIsNone(limiter.hit("other", now=6090))
+
+    def test_processes_share_counters(self):
+        """Limiters in different processes see each other's hits through the cache."""
+        first, second = self.limiter(sync_interval=0), self.limiter(sync_interval=0)
+        allowed = [(first if index % 2 else second).hit("client", now=6000) for index in range(12)]
+        self.assertEqual(allowed.count(None), 10)
+        self.assertEqual(cache.get("national-id-rl:client:100"), 10)
+
+    def test_hits_are_batched(self):
+        """Hits are counted locally and synced with the cache in batches."""
+        limiter = self.limiter(limit=1000)
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            for _ in range(100):
+                self.assertIsNone(limiter.hit("client", now=6000))
+        self.assertEqual(get_many.call_count, 1)
+        limiter.hit("client", now=6001)
+        self.assertEqual(cache.get("national-id-rl:client:100"), 100)
+
+        # Close to the limit, syncs come sooner; the overshoot is bounded by the
+        # hits other processes have not synced yet
+        other = self.limiter(limit=1000)
+        cache.incr("national-id-rl:client:100", 880)
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            self.assertEqual([other.hit("client", now=6002) for _ in range(21)], [None] * 20 + [59])
+        self.assertEqual(get_many.call_count, 6)
+        self.assertEqual(limiter.hit("client", now=6002), 59)
+        self.assertEqual(cache.get("national-id-rl:client:100"), 1001)
+
+    def test_cache_failures_fail_open(self):
+        """Hits are allowed on local counts when the cache is unavailable, which is logged once."""
+        limiter = self.limiter(limit=2, sync_interval=0)
+        with patch.object(cache, "get_many", side_effect=ConnectionError), \
+                patch.object(cache, "add", side_effect=ConnectionError), \
+                patch.object(ratelimit, "logger") as logger:
+            self.assertEqual([limiter.hit("client", now=6000) for _ in range(3)], [None, None, 90])
+        logger.critical.assert_called_once()
+        with patch.object(ratelimit, "logger") as logger:
+            limiter.hit("client", now=6070)
+            limiter.hit("client", now=6130)
+        logger.warning.assert_called_once_with("Rate limit counters are shared again.")
+
+        write_through = self.limiter(limit=5, sync_interval=0)
+        with patch.object(cache, "add", side_effect=ConnectionError), patch.object(ratelimit, "logger") as logger:
+            self.assertIsNone(async_to_sync(write_through.ahit)("async"))
+        logger.critical.assert_called_once()
+        window = write_through._windows["async"]
+        self.assertEqual((window.current, window.pending), (0, 1))
+
+        batched = self.limiter(limit=2)
+        batched.hit("other", now=6000)
+        with patch.object(cache, "add", side_effect=ConnectionError), patch.object(ratelimit, "logger"):
+            self.assertIsNone(batched.hit("other", now=6002))
+        self.assertEqual(batched._windows["other"].pending, 2)
+
+    def test_slow_store_does_not_hold_the_lock(self):
+        """While one key waits for the shared counters, other keys, and that key's own hits, are not blocked."""
+        limiter = self.limiter()
+        limiter.hit("slow", now=6000)
+        reading, release = threading.Event(), threading.Event()
+        get_many = cache.get_many
+
+        def slow_get_many(keys):
+            if "slow" in keys[0]:
+                reading.set()
+                release.wait(5)
+            return get_many(keys)
+
+        with patch.object(cache, "get_many", side_effect=slow_get_many):
+            thread = threading.Thread(target=limiter.hit, args=("slow",), kwargs={"now": 6002})
+            thread.start()
+            self.assertTrue(reading.wait(5))
+            self.assertIsNone(limiter.hit("fast", now=6002))
+            self.assertIsNone(async_to_sync(limiter.ahit)("fast"))
+            self.assertIsNone(limiter.hit("slow", now=6002))
+            self.assertTrue(thread.is_alive())
+            release.set()
+            thread.join()
+
+        # The hit counted during the sync is kept next to the synced count
+        self.assertEqual((limiter._windows["slow"].current, limiter._windows["slow"].pending), (1, 2))
+        self.assertEqual(cache.get("national-id-rl:slow:100"), 1)
+
+    def test_max_keys(self):
+        """Only the most recently synced keys are kept in memory."""
+        limiter = self.limiter(max_keys=2)
+        for key in ("a", "b", "c"):
+            limiter.hit(key, now=6000)
+        self.assertEqual(list(limiter._windows), ["b", "c"])
+
+
+class RateLimitViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+        _, key = APIKey.objects.create_key(name="test")
+        self.authorization = f"Api-Key {key}"
+
+    def post(self, url="/api/national-id/", **extra):
+        return self.client.post(
+            url, {"national_id": "29001011234564"}, content_type="application/json",
+            HTTP_AUTHORIZATION=self.authorization, **extra
+        )
+
+    def test_per_ip_limit(self):
+        """Each IP gets 10 requests per minute per view, then 429 with Retry-After."""
+        for _ in range(10):
+            self.assertEqual(self.post().status_code, 200)
+        response = self.post()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+        self.assertEqual(self.post(REMOTE_ADDR="10.0.0.2").status_code, 200)
+        self.assertEqual(self.post("/api/national-id/async/").status_code, 200)
+
+    def test_per_api_key_limit(self):
+        """An API key is limited across every IP it is used from."""
+        with self.settings(NATIONAL_ID_RATE_LIMITS={"RATES": {"ip": "10/m", "api_key": "2/m"}}):
+            statuses = [self.post(REMOTE_ADDR=f"10.0.0.{index}").status_code for index in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+            self.assertEqual(self.post("/api/national-id/async/").status_code, 200)
+            self.assertEqual(self.post("/api/national-id/async/").status_code, 200)
+            self.assertEqual(self.post("/api/national-id/async/").status_code, 429)
+
+    def test_index_and_decorated_async_views(self):
+        """Function views, sync or async, are limited by the rate_limit decorator."""
+        statuses = [self.client.get("/").status_code for _ in range(11)]
+        self.assertEqual(statuses, [200] * 10 + [429])
+
+        @rate_limit("test")
+        async def view(request):
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        with self.settings(NATIONAL_ID_RATE_LIMITS={"RATES": {"api_key": "5/m", "ip": "1/m"}}):
+            self.assertEqual(async_to_sync(view)(request).status_code, 200)
+            self.assertEqual(async_to_sync(view)(request).status_code, 429)
+
+    def test_settings(self):
+        """Rate limiting can be disabled; limiters are rebuilt when settings change."""
+        self.assertEqual([scope for scope, limiter in get_rate_limiters()], ["ip", "api_key"])
+        # The shared cache is a DatabaseCache, whose incr is not atomic
+        self.assertIsInstance(get_rate_limiters()[0][1].counters, DatabaseCounters)
+        self.assertIsInstance(SlidingWindowLimiter(1, 60).counters, CacheCounters)
+        with self.settings(NATIONAL_ID_RATE_LIMITS={"ENABLED": False}):
+            self.assertEqual(get_rate_limiters(), [])
+            for _ in range(11):
+                self.assertEqual(self.post().status_code, 200)
+        limiters = get_rate_limiters()
+        with self.settings(NATIONAL_ID_BATCH_MAX_SIZE=1):
+            self.assertIs(get_rate_limiters(), limiters)
+
+
+
+class DatabaseCountersTests(TransactionTestCase):
+    def limiter(self, **kwargs):
+        return SlidingWindowLimiter(1000, 60, cache_alias="shared", sync_interval=0, **kwargs)
+
+    def test_concurrent_writers(self):
+        """Limiters of different processes writing the same window at once lose no hits."""
+        barrier = threading.Barrier(2)
+
+        def writer():
+            limiter = self.limiter()
+            barrier.wait()
+            try:
+                for _ in range(50):
+                    limiter.hit("client", now=6000)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(RateLimitCounter.objects.get(key="national-id-rl:client:100").count, 100)
+        self.assertEqual(self.limiter().counters.get_many(["national-id-rl:client:100", "missing"]),
+                         {"national-id-rl:client:100": 100})
+
+    def test_fallback_and_expiry(self):
+        """Databases without INSERT ... ON CONFLICT update with F(); expired counters are deleted."""
+        counters = DatabaseCounters(purge_interval=0)
+        with patch.object(connection, "vendor", "mysql"):
+            counters.add("a", 2, timeout=60)
+            counters.add("a", 3, timeout=60)
+        counters.add("b", 1, timeout=-1)
+        self.assertEqual(counters.get_many(["a", "b"]), {"a": 5})
+        counters.add("c", 1, timeout=60)
+        self.assertEqual(sorted(RateLimitCounter.objects.values_list("key", flat=True)), ["a", "c"])
@@ -0,0 +1,106 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.helpers import extract_info
+from National_ID_Processing.models import EGYNationalIDInfo
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.renderers import ORJSONRenderer, dumps, stream_json_list
+from National_ID_Processing.repository import get_or_create_national_id_info
+from National_ID_Processing.result_cache import get_result_cache
+from National_ID_Processing.serializers import EGYNationalIDInfoSerializer, national_id_info_to_dict
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_same_bytes_as_json_renderer(self):
+        """orjson output is byte-identical to DRF's JSONRenderer."""
+        data = {
+            "text": "أحمد     \x00 \x1f \" \\ / é",
+            "numbers": [0, -1, 2 ** 63 - 1, 0.5, True, False, None],
+            "nested": {"list": [{"a": []}, {}]},
+            "datetime": datetime(2024, 2, 29, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "date": date(2024, 2, 29),
+            "decimal": Decimal("1.10"),
+            "lazy": gettext_lazy("This field is required."),
+            "error": ErrorDetail("Invalid.", code="invalid"),
+            1: "non-string key",
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(dumps(data), JSONRenderer().render(data))
+
+    def test_fallbacks(self):
+        """Indented output and values orjson cannot encode use the stdlib encoder."""
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render(None), b"")
+        self.assertEqual(
+            renderer.render({"a": [1]}, "application/json; indent=2"),
+            JSONRenderer().render({"a": [1]}, "application/json; indent=2"),
+        )
+        self.assertEqual(renderer.render({"big": 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_stream_json_list(self):
+        """Streamed lists join into the same document as a single encoding."""
+        items = [{"national_id": str(index), "data": {"n": index}} for index in range(50)]
+        extra = {"message": "Data processed successfully."}
+        with patch("National_ID_Processing.renderers.STREAM_CHUNK_SIZE", 100):
+            chunks = list(stream_json_list("results", iter(items), extra))
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(b"".join(chunks), dumps({"results": items, **extra}))
+
+        self.assertEqual(b"".join(stream_json_list("results", [], {})), b'{"results":[]}')
+
+
+class NationalIDInfoToDictTests(TestCase):
+    def test_same_data_as_serializer(self):
+        """The plain dict matches the ModelSerializer output, including key order."""
+        egy_info, _ = get_or_create_national_id_info("29001011234564", extract_info("29001011234564"))
+        egy_info.created_at = datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+        expected = EGYNationalIDInfoSerializer(egy_info).data
+        self.assertEqual(list(national_id_info_to_dict(egy_info).items()), list(expected.items()))
+
+        with override_settings(TIME_ZONE="Africa/Cairo"):
+            self.assertEqual(national_id_info_to_dict(egy_info), EGYNationalIDInfoSerializer(egy_info).data)
+            self.assertTrue(national_id_info_to_dict(egy_info)["created_at"].endswith("+02:00"))
+
+        for created_at in (None, datetime(2024, 1, 2, 3, 4, 5)):
+            egy_info.created_at = created_at
+            self.assertEqual(national_id_info_to_dict(egy_info), EGYNationalIDInfoSerializer(egy_info).data)
+
+
+class ResponseBytesTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        get_result_cache().clear()
+        _, key = APIKey.objects.create_key(name="test")
+        self.headers = {"HTTP_AUTHORIZATION": f"Api-Key {key}"}
+
+    def expected_bytes(self, national_id):
+        return EGYNationalIDInfoSerializer(EGYNationalIDInfo.objects.get(national_id=national_id)).data
+
+    def test_validator_response(self):
+        """The validator returns the bytes DRF's serializer and renderer produced."""
+        response = self.client.post("/api/national-id/", {"national_id": "29001011234564"}, **self.headers)
+        self.assertEqual(response.content, JSONRenderer().render({
+            "data": self.expected_bytes("29001011234564"), "message": "Data processed successfully.",
+        }))
+
+    def test_streamed_batch_response(self):
+        """Large batches are streamed with the same bytes as small ones."""
+        body = ["29001011234564", "29001011234565", {"national_id": "32402292234565"}, "29001011234564"]
+        response = self.client.post("/api/national-id/batch/", body, content_type="application/json", **self.headers)
+        self.assertFalse(response.streaming)
+
+        with override_settings(NATIONAL_ID_BATCH_STREAM_THRESHOLD=1):
+            streamed = self.client.post("/api/national-id/batch/", body, content_type="application/json", **self.headers)
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(streamed["Content-Type"], "application/json")
+        self.assertEqual(b"".join(streamed.streaming_content), response.content)
+        self.assertEqual(
+            json.loads(response.content)["results"][2]["data"], json.loads(json.dumps(self.expected_bytes("32402292234565"))),
+        )
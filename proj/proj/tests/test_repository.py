@@ -0,0 +1,100 @@
+import threading
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from National_ID_Processing.helpers import extract_info
+from National_ID_Processing.models import EGYNationalIDInfo
+from National_ID_Processing.repository import (
+    aget_or_create_national_id_info, get_or_create_national_id_info, save_national_id_infos,
+)
+
+
+NATIONAL_IDS = ["29001011234564", "32402292234565", "32501071234569"]
+
+
+class RepositoryTests(TestCase):
+    def test_get_or_create(self):
+        """A new ID is inserted and counted in the statistics; an existing one is read back."""
+        with self.assertNumQueries(2):
+            created_info, created = get_or_create_national_id_info(NATIONAL_IDS[0], extract_info(NATIONAL_IDS[0]))
+        self.assertTrue(created)
+        self.assertEqual(created_info, EGYNationalIDInfo.objects.get(national_id=NATIONAL_IDS[0]))
+        self.assertEqual((created_info.birth_year, created_info.governorate), (1990, "Dakahlia"))
+
+        with self.assertNumQueries(2):
+            existing_info, created = get_or_create_national_id_info(NATIONAL_IDS[0], extract_info(NATIONAL_IDS[0]))
+        self.assertFalse(created)
+        self.assertEqual(existing_info.pk, created_info.pk)
+        self.assertEqual(existing_info.created_at, created_info.created_at)
+
+    def test_batch(self):
+        """Batches insert new IDs and read back only the existing ones."""
+        get_or_create_national_id_info(NATIONAL_IDS[1], extract_info(NATIONAL_IDS[1]))
+        with self.assertNumQueries(3):
+            rows, created = save_national_id_infos({national_id: extract_info(national_id) for national_id in NATIONAL_IDS})
+        self.assertEqual(set(rows), set(NATIONAL_IDS))
+        self.assertEqual(created, {NATIONAL_IDS[0], NATIONAL_IDS[2]})
+        self.assertEqual(EGYNationalIDInfo.objects.count(), 3)
+        self.assertEqual(save_national_id_infos({}), ({}, set()))
+
+    def test_insert_batches(self):
+        """Inserts are split to stay under the parameter limit; created rows match the stored ones."""
+        with patch.object(connection.ops, "bulk_batch_size", return_value=2), self.assertNumQueries(4):  # 2 inserts, 2 stats upserts
+            rows, created = save_national_id_infos({national_id: extract_info(national_id) for national_id in NATIONAL_IDS})
+        self.assertEqual(created, set(NATIONAL_IDS))
+        for national_id, row in rows.items():
+            stored = EGYNationalIDInfo.objects.get(pk=row.pk)
+            self.assertEqual((stored.national_id, stored.birth_date, stored.created_at),
+                             (national_id, row.birth_date, row.created_at))
+            self.assertFalse(row._state.adding)
+
+    def test_fallback_without_returning(self):
+        """Databases without INSERT ... RETURNING use bulk_create and a fetch."""
+        get_or_create_national_id_info(NATIONAL_IDS[1], extract_info(NATIONAL_IDS[1]))
+        with patch.object(connection, "vendor", "mysql"):
+            rows, created = save_national_id_infos({national_id: extract_info(national_id) for national_id in NATIONAL_IDS})
+            self.assertEqual(created, {NATIONAL_IDS[0], NATIONAL_IDS[2]})
+            self.assertEqual(get_or_create_national_id_info(NATIONAL_IDS[0], extract_info(NATIONAL_IDS[0]))[1], False)
+        self.assertEqual({national_id: row.pk for national_id, row in rows.items()}, dict(
+            EGYNationalIDInfo.objects.values_list("national_id", "pk")
+        ))
+
+    async def test_async(self):
+        info, created = await aget_or_create_national_id_info(NATIONAL_IDS[0], extract_info(NATIONAL_IDS[0]))
+        self.assertTrue(created)
+        self.assertEqual(await EGYNationalIDInfo.objects.acount(), 1)
+
+
+class RepositoryConcurrencyTests(TransactionTestCase):
+    def test_concurrent_writers(self):
+        """Many threads writing the same IDs all get the same rows and no errors."""
+        infos = {national_id: extract_info(national_id) for national_id in NATIONAL_IDS}
+        barrier = threading.Barrier(16)
+        results, errors = [], []
+
+        def write():
+            try:
+                barrier.wait()
+                for _ in range(10):
+                    rows, created = save_national_id_infos(infos)
+                    results.append({national_id: row.pk for national_id, row in rows.items()})
+                    for national_id in NATIONAL_IDS:
+                        row, created = get_or_create_national_id_info(national_id, infos[national_id])
+                        results.append({national_id: row.pk})
+            except Exception as exc:  # pragma: no cover (reported by the assertion below)
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=write) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        stored = dict(EGYNationalIDInfo.objects.values_list("national_id", "pk"))
+        self.assertEqual(len(stored), 3)
+        for result in results:
+            self.assertEqual(result, {national_id: stored[national_id] for national_id in result})
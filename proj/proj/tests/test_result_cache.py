@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.models import APILog, EGYNationalIDInfo
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.result_cache import ResultCache, get_result_cache
+
+
+class ResultCacheTests(SimpleTestCase):
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted once the cache is full."""
+        result_cache = ResultCache(max_size=2, ttl=60)
+        result_cache.set("a", {"value": 1})
+        result_cache.set("b", {"value": 2})
+        self.assertEqual(result_cache.get("a"), {"value": 1})
+        result_cache.set("c", {"value": 3})
+
+        self.assertIsNone(result_cache.get("b"))
+        self.assertEqual(result_cache.get("a"), {"value": 1})
+        self.assertEqual(result_cache.get("c"), {"value": 3})
+        self.assertEqual(
+            result_cache.stats(),
+            {"size": 2, "max_size": 2, "ttl": 60, "hits": 3, "shared_hits": 0, "misses": 1, "evictions": 1, "expirations": 0},
+        )
+
+    def test_ttl_expiration(self):
+        """Entries older than the TTL are misses."""
+        result_cache = ResultCache(ttl=10)
+        with patch("National_ID_Processing.result_cache.time.monotonic", return_value=100.0):
+            result_cache.set("a", {"value": 1})
+        with patch("National_ID_Processing.result_cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(result_cache.get("a"))
+        self.assertEqual(result_cache.stats()["expirations"], 1)
+
+    def test_shared_tier(self):
+        """Local misses are read through the shared Django cache."""
+        shared = caches["default"]
+        shared.clear()
+        writer = ResultCache(shared_cache=shared)
+        reader = ResultCache(shared_cache=shared)
+
+        writer.set("a", {"value": 1})
+        self.assertEqual(reader.get("a"), {"value": 1})
+        self.assertEqual(reader.get("a"), {"value": 1})
+        self.assertEqual((reader.shared_hits, reader.hits), (1, 1))
+
+        writer.delete("a")
+        reader.clear()
+        self.assertIsNone(reader.get("a"))
+
+    def test_settings(self):
+        """The process-wide cache follows NATIONAL_ID_RESULT_CACHE."""
+        with self.settings(NATIONAL_ID_RESULT_CACHE={"MAX_SIZE": 5, "TTL": 1, "SHARED_CACHE_ALIAS": "default"}):
+            result_cache = get_result_cache()
+            self.assertIs(get_result_cache(), result_cache)
+            self.assertEqual((result_cache.max_size, result_cache.ttl), (5, 1))
+            self.assertIs(result_cache.shared_cache, caches["default"])
+        with self.settings(NATIONAL_ID_RESULT_CACHE={"ENABLED": False}):
+            self.assertIsNone(get_result_cache())
+
+
+class ResultCacheViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+        get_result_cache().clear()
+        _, key = APIKey.objects.create_key(name="test")
+        self.authorization = f"Api-Key {key}"
+
+    def post(self, national_id):
+        return self.client.post(
+            "/api/national-id/", {"national_id": national_id}, HTTP_AUTHORIZATION=self.authorization,
+            content_type="application/json",
+        )
+
+    def test_repeat_lookup_skips_validation_and_info_queries(self):
+        """A cached result is returned without touching EGYNationalIDInfo."""
+        first = self.post("29001011234564")
+        with CaptureQueriesContext(connection) as queries:
+            second = self.post("29001011234564")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json(), second.json())
+        self.assertFalse([query for query in queries if "egynationalidinfo" in query["sql"].lower()])
+        self.assertEqual(APILog.objects.count(), 2)
+        self.assertEqual(get_result_cache().stats()["hits"], 1)
+
+    def test_invalidation_and_disabled_cache(self):
+        """Changing a stored row drops its cached result; caching can be disabled."""
+        self.post("29001011234564")
+        EGYNationalIDInfo.objects.filter(national_id="29001011234564").get().delete()
+        self.assertIsNone(get_result_cache().get("29001011234564"))
+
+        with self.settings(NATIONAL_ID_RESULT_CACHE={"ENABLED": False}):
+            self.assertEqual(self.post("29001011234564").status_code, 200)
+            EGYNationalIDInfo.objects.get(national_id="29001011234564").save()
+            response = self.client.get("/api/national-id/cache/stats/", HTTP_AUTHORIZATION=self.authorization)
+        self.assertEqual(response.json(), {"enabled": False})
+
+        response = self.client.get("/api/national-id/cache/stats/", HTTP_AUTHORIZATION=self.authorization)
+        self.assertEqual(response.json()["hits"], 0)
@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.result_cache import get_result_cache
+from proj import settings_api
+
+
+def loaded_modules(code, settings_module=None):
+    """Runs `code` in a new interpreter and returns the names of the modules it loaded."""
+    env = {name: value for name, value in os.environ.items() if not name.startswith(("DJANGO_", "COV_CORE_"))}
+    if settings_module:
+        env["DJANGO_SETTINGS_MODULE"] = settings_module
+    completed = subprocess.run(
+        [sys.executable, "-c", f"{code}; import json, sys; print(json.dumps(sorted(sys.modules)))"],
+        capture_output=True, text=True, check=True, cwd=settings.BASE_DIR, env=env,
+    )
+    return set(json.loads(completed.stdout))
+
+
+class ImportGraphTests(SimpleTestCase):
+    def test_helpers_import_no_django(self):
+        """Batch jobs can validate IDs without importing Django or numpy."""
+        modules = loaded_modules("import National_ID_Processing.helpers")
+        self.assertNotIn("django", modules)
+        self.assertNotIn("numpy", modules)
+
+    def test_setup_imports_no_numpy(self):
+        """numpy is only imported by the first vectorized batch."""
+        modules = loaded_modules("import django; django.setup()", "proj.settings")
+        self.assertNotIn("numpy", modules)
+        self.assertIn("django.contrib.admin", modules)
+
+    def test_api_profile(self):
+        """The API-only profile loads neither the admin, auth, sessions, messages nor the request logger."""
+        modules = loaded_modules("import django; django.setup()", "proj.settings_api")
+        for module in ("django.contrib.admin", "django.contrib.auth.models", "django.contrib.sessions",
+                       "django.contrib.messages", "drf_api_logger"):
+            self.assertNotIn(module, modules)
+
+        # Loading the views readies the worker for its first request
+        modules = loaded_modules(
+            "import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns",
+            "proj.settings_api",
+        )
+        self.assertIn("National_ID_Processing.views", modules)
+        for module in ("numpy", "django.contrib.sessions", "drf_api_logger", "cProfile"):
+            self.assertNotIn(module, modules)
+
+
+@override_settings(
+    ROOT_URLCONF=settings_api.ROOT_URLCONF,
+    MIDDLEWARE=settings_api.MIDDLEWARE,
+    REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+)
+class APIProfileTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        get_result_cache().clear()
+        _, key = APIKey.objects.create_key(name="test")
+        self.headers = {"HTTP_AUTHORIZATION": f"Api-Key {key}"}
+
+    def test_serves_api_only(self):
+        response = self.client.post(
+            "/api/national-id/", {"national_id": "29001011234564"}, content_type="application/json", **self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["governorate"], "Dakahlia")
+
+        response = self.client.post("/api/national-id/", {"national_id": "29001011234564"}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get("/", **self.headers).status_code, 404)
+        self.assertEqual(self.client.get("/admin/", **self.headers).status_code, 404)
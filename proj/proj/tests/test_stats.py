@@ -0,0 +1,121 @@
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework_api_key.models import APIKey
+from National_ID_Processing.helpers import extract_info
+from National_ID_Processing.management.commands.ingest_national_ids import Command as IngestCommand, validate_chunk
+from National_ID_Processing.models import EGYNationalIDInfo, EGYNationalIDInfoStats
+from National_ID_Processing.ratelimit import reset_rate_limits
+from National_ID_Processing.repository import save_national_id_infos
+from National_ID_Processing.stats import add_to_stats, distribution, rebuild_stats
+
+
+NATIONAL_IDS = ["29001011234564", "32402292234565", "32501071234569"]
+
+
+def save_all():
+    return save_national_id_infos({national_id: extract_info(national_id) for national_id in NATIONAL_IDS})
+
+
+def stored_buckets():
+    return sorted(EGYNationalIDInfoStats.objects.filter(count__gt=0).values_list(
+        "century", "birth_year", "birth_month", "gender", "governorate", "count",
+    ))
+
+
+class StatsTests(TestCase):
+    def test_counts_follow_writes(self):
+        """Inserted IDs are counted once, and deleted ones are removed."""
+        save_all()
+        save_all()
+        self.assertEqual(stored_buckets(), [
+            (19, 1990, 1, "female", "Dakahlia", 1),
+            (20, 2024, 2, "female", "Beni Suef", 1),
+            (20, 2025, 1, "female", "Dakahlia", 1),
+        ])
+        self.assertEqual(distribution(["century"]), ([{"century": 19, "count": 1}, {"century": 20, "count": 2}], 3))
+        self.assertEqual(distribution(["governorate"], {"century": 20}), (
+            [{"governorate": "Beni Suef", "count": 1}, {"governorate": "Dakahlia", "count": 1}], 2,
+        ))
+
+        EGYNationalIDInfo.objects.filter(national_id=NATIONAL_IDS[1]).delete()
+        EGYNationalIDInfo.objects.create(
+            national_id="29001010134574", birth_date=date(1990, 1, 1), gender="male", governorate="Cairo",
+        )
+        self.assertEqual(distribution(["birth_year"])[0], [{"birth_year": 1990, "count": 2}, {"birth_year": 2025, "count": 1}])
+
+    def test_fallback_increments(self):
+        """Databases without INSERT ... ON CONFLICT update existing buckets and create the others."""
+        with patch.object(connection, "vendor", "mysql"):
+            add_to_stats({(1990, 1, "male", "Cairo"): 2})
+            add_to_stats({(1990, 1, "male", "Cairo"): -1, (2001, 5, "female", "Giza"): 1, (2001, 6, "male", "Giza"): 0})
+        self.assertEqual(stored_buckets(), [(19, 1990, 1, "male", "Cairo", 1), (20, 2001, 5, "female", "Giza", 1)])
+
+    @override_settings(NATIONAL_ID_STATS={"ENABLED": False})
+    def test_disabled_and_rebuild(self):
+        """Nothing is counted when disabled; a rebuild recomputes every bucket."""
+        save_all()
+        EGYNationalIDInfo.objects.filter(national_id=NATIONAL_IDS[0]).delete()
+        IngestCommand().upsert(validate_chunk(["29001011234564"]))
+        EGYNationalIDInfo.objects.filter(national_id=NATIONAL_IDS[0]).delete()
+        self.assertEqual(EGYNationalIDInfoStats.objects.count(), 0)
+
+        EGYNationalIDInfoStats.objects.create(century=19, birth_year=1950, birth_month=1, gender="male", governorate="Cairo", count=5)
+        self.assertEqual(rebuild_stats(), 2)
+        self.assertEqual(distribution(["birth_year"])[1], 2)
+
+        stdout = StringIO()
+        call_command("rebuild_national_id_stats", stdout=stdout)
+        self.assertEqual(stdout.getvalue().strip(), "Rebuilt 2 statistics buckets.")
+
+
+class StatsViewTests(TestCase):
+    def setUp(self):
+        reset_rate_limits()
+        save_all()
+        _, key = APIKey.objects.create_key(name="test")
+        self.headers = {"HTTP_AUTHORIZATION": f"Api-Key {key}"}
+        self.url = "/api/national-id/stats/"
+
+    def test_distribution(self):
+        response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.json(), {"total": 3, "group_by": ["birth_year"], "buckets": [
+            {"birth_year": 1990, "count": 1}, {"birth_year": 2024, "count": 1}, {"birth_year": 2025, "count": 1},
+        ]})
+
+        response = self.client.get(self.url, {"group_by": "century,governorate", "gender": "female", "birth_month": "1"}, **self.headers)
+        self.assertEqual(response.json()["buckets"], [
+            {"century": 19, "governorate": "Dakahlia", "count": 1}, {"century": 20, "governorate": "Dakahlia", "count": 1},
+        ])
+
+    def test_errors(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        for params in ({"group_by": "national_id"}, {"group_by": "gender,gender"}, {"century": "twenty"}):
+            self.assertEqual(self.client.get(self.url, params, **self.headers).status_code, 400)
+
+
+class StatsAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        save_all()
+
+    def test_dashboard(self):
+        """The statistics change list shows the distributions."""
+        response = self.client.get("/admin/National_ID_Processing/egynationalidinfostats/")
+        self.assertContains(response, "By century (3 national IDs)")
+        self.assertContains(response, "<td>20xx</td><td>2</td>", html=True)
+
+    def test_list_filters(self):
+        """National ID filters list the values from the statistics and filter the rows."""
+        url = "/admin/National_ID_Processing/egynationalidinfo/"
+        response = self.client.get(url)
+        self.assertContains(response, "2024 (1)")
+        self.assertContains(response, "Beni Suef (1)")
+
+        response = self.client.get(url, {"birth_year": "2025"})
+        self.assertEqual([info.national_id for info in response.context["cl"].result_list], [NATIONAL_IDS[2]])
@@ -0,0 +1,151 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from National_ID_Processing.fields import NationalIDField, PackedDateField
+from National_ID_Processing.helpers import extract_info
+from National_ID_Processing.models import EGYNationalIDInfo
+from National_ID_Processing.repository import save_national_id_infos
+from National_ID_Processing.storage import COMPACT_COLUMNS_MIGRATION, COMPACT_STORAGE_MIGRATION
+
+
+NATIONAL_IDS = ["29001011234564", "32402292234565", "32501071234569"]
+
+
+class CompactFieldTests(TestCase):
+    def setUp(self):
+        save_national_id_infos({national_id: extract_info(national_id) for national_id in NATIONAL_IDS})
+
+    def test_stored_as_integers(self):
+        """National IDs and birth dates are stored as integers and read back unchanged."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT national_id, birth_date FROM {EGYNationalIDInfo._meta.db_table} ORDER BY id")
+            self.assertEqual(cursor.fetchall()[0], (29001011234564, 19900101))
+        info = EGYNationalIDInfo.objects.get(national_id=NATIONAL_IDS[1])
+        self.assertEqual((info.national_id, info.birth_date), (NATIONAL_IDS[1], date(2024, 2, 29)))
+        self.assertEqual((info.birth_year, info.birth_month, info.birth_day), (2024, 2, 29))
+
+    def test_lookups(self):
+        """Birth date parts can be filtered on, year comparisons as ranges of the column."""
+        infos = EGYNationalIDInfo.objects.order_by("pk")
+        self.assertIn("BETWEEN", str(infos.filter(birth_date__year=2024).query))
+        self.assertEqual(list(infos.filter(birth_date__year__gte=2024).values_list("national_id", flat=True)), NATIONAL_IDS[1:])
+        self.assertEqual(infos.filter(birth_date__year__gt=2024).count(), 1)
+        self.assertEqual(infos.filter(birth_date__year__lt=2024, birth_date__year__lte=1990).count(), 1)
+        self.assertEqual(infos.filter(birth_date__month=1, birth_date__day=7).get().national_id, NATIONAL_IDS[2])
+        self.assertEqual(infos.filter(birth_date__gte="2024-02-29").count(), 2)
+        self.assertEqual(list(infos.values_list("birth_date__year", flat=True)), [1990, 2024, 2025])
+        for national_id in ("2900101123456x", "3\u0660\u0660\u0660\u0662\u0660\u0662\u0660\u0661\u0660\u0660\u0660\u0661\u0667"):
+            with self.assertRaises(ValueError):
+                infos.filter(national_id=national_id).exists()
+
+    def test_conversions(self):
+        national_id_field = EGYNationalIDInfo._meta.get_field("national_id")
+        birth_date_field = EGYNationalIDInfo._meta.get_field("birth_date")
+        self.assertEqual(national_id_field.to_python(29001011234564), NATIONAL_IDS[0])
+        self.assertIsNone(national_id_field.to_python(None))
+        self.assertEqual(birth_date_field.to_python(20240229), date(2024, 2, 29))
+        self.assertEqual(birth_date_field.to_python("2024-02-29"), date(2024, 2, 29))
+        self.assertIsNone(birth_date_field.to_python(None))
+        with self.assertRaises(ValueError):
+            birth_date_field.to_python("yesterday")
+
+        info = EGYNationalIDInfo.objects.get(national_id=NATIONAL_IDS[0])
+        self.assertEqual(national_id_field.value_to_string(info), NATIONAL_IDS[0])
+        self.assertEqual(birth_date_field.value_to_string(info), "1990-01-01")
+        self.assertEqual(birth_date_field.value_to_string(EGYNationalIDInfo()), "")
+
+        self.assertEqual(NationalIDField().formfield().clean("29001011234564"), "29001011234564")
+        with self.assertRaises(ValidationError):
+            NationalIDField().formfield().clean("09001011234564")
+        with self.assertRaises(ValidationError):
+            NationalIDField().formfield().clean("2900101123456\u0664")
+        self.assertEqual(PackedDateField().formfield().clean("1990-01-01"), date(1990, 1, 1))
+
+    def test_admin(self):
+        """The admin searches national IDs by prefix and edits them as text."""
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        url = "/admin/National_ID_Processing/egynationalidinfo/"
+        for term, expected in (("325", NATIONAL_IDS[2:]), (NATIONAL_IDS[0], NATIONAL_IDS[:1]), ("29x", []), ("", NATIONAL_IDS)):
+            response = self.client.get(url, {"q": term})
+            self.assertEqual(sorted(info.national_id for info in response.context["cl"].result_list), expected)
+
+        info = EGYNationalIDInfo.objects.get(national_id=NATIONAL_IDS[0])
+        response = self.client.get(f"{url}{info.pk}/change/")
+        self.assertContains(response, f'value="{NATIONAL_IDS[0]}"')
+        self.assertContains(response, 'value="1990-01-01"')
+
+
+class CompactStorageMigrationTests(TransactionTestCase):
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([target])
+        return executor.loader.project_state(target).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes("National_ID_Processing")[0])
+
+    def test_backfill_and_migrate(self):
+        """Rows stored in the old columns are backfilled, migrated and restored on revert."""
+        apps = self.migrate(COMPACT_COLUMNS_MIGRATION)
+        OldInfo = apps.get_model("National_ID_Processing", "EGYNationalIDInfo")
+        for national_id in NATIONAL_IDS[:2]:
+            info = extract_info(national_id)
+            OldInfo.objects.create(national_id=national_id, gender=info["gender"], governorate=info["governorate"], **{
+                field: info[field] for field in ("birth_year", "birth_month", "birth_day")
+            })
+
+        stdout = StringIO()
+        call_command("backfill_compact_storage", chunk_size=1, stdout=stdout)
+        self.assertIn("Done: 2 rows backfilled.", stdout.getvalue())
+        self.assertEqual(OldInfo.objects.filter(compact_national_id__isnull=True).count(), 0)
+
+        # Rows written after the backfill are filled by the migration
+        info = extract_info(NATIONAL_IDS[2])
+        OldInfo.objects.create(national_id=NATIONAL_IDS[2], birth_year=2025, birth_month=1, birth_day=7,
+                               gender=info["gender"], governorate=info["governorate"])
+        self.migrate(COMPACT_STORAGE_MIGRATION)
+        self.assertEqual(
+            sorted((info.national_id, info.birth_date) for info in EGYNationalIDInfo.objects.all()),
+            [(NATIONAL_IDS[0], date(1990, 1, 1)), (NATIONAL_IDS[1], date(2024, 2, 29)), (NATIONAL_IDS[2], date(2025, 1, 7))],
+        )
+
+        apps = self.migrate(COMPACT_COLUMNS_MIGRATION)
+        OldInfo = apps.get_model("National_ID_Processing", "EGYNationalIDInfo")
+        self.assertEqual(
+            sorted(OldInfo.objects.values_list("national_id", "birth_year", "birth_month", "birth_day")),
+            [(NATIONAL_IDS[0], 1990, 1, 1), (NATIONAL_IDS[1], 2024, 2, 29), (NATIONAL_IDS[2], 2025, 1, 7)],
+        )
+
+        # Rolled back to the original layout, the rows are intact
+        apps = self.migrate(("National_ID_Processing", "0005_egynationalidinfostats"))
+        OriginalInfo = apps.get_model("National_ID_Processing", "EGYNationalIDInfo")
+        self.assertNotIn("birth_date", {field.name for field in OriginalInfo._meta.get_fields()})
+        with connection.cursor() as cursor:
+            columns = {column.name for column in connection.introspection.get_table_description(
+                cursor, OriginalInfo._meta.db_table,
+            )}
+        self.assertEqual(columns & {"compact_national_id", "birth_date"}, set())
+        self.assertEqual(
+            sorted(OriginalInfo.objects.values_list("national_id", "birth_year", "birth_month", "birth_day")),
+            [(NATIONAL_IDS[0], 1990, 1, 1), (NATIONAL_IDS[1], 2024, 2, 29), (NATIONAL_IDS[2], 2025, 1, 7)],
+        )
+
+    def test_command_checks_migration_state(self):
+        stdout = StringIO()
+        call_command("backfill_compact_storage", stdout=stdout)
+        self.assertIn("already applied", stdout.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("backfill_compact_storage", chunk_size=0)
+
+        self.migrate(("National_ID_Processing", "0005_egynationalidinfostats"))
+        with self.assertRaises(CommandError):
+            call_command("backfill_compact_storage")
@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime
+
+import numpy as np
+from django.test import SimpleTestCase
+from National_ID_Processing.governorates import CHECK_DIGIT_WEIGHTS
+from National_ID_Processing.helpers import validate_national_id, extract_info
+from National_ID_Processing.vectorized import (
+    INVALID_CENTURY, INVALID_CHECK_DIGIT, INVALID_FORMAT, INVALID_GOVERNORATE, INVALID_MONTH, VALID,
+    error_messages, validate_national_ids,
+)
+
+
+class VectorizedValidationTests(SimpleTestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.current_date = datetime(2025, 1, 7)
+
+    def test_parity_with_scalar_validator(self):
+        """The vectorized engine agrees with `validate_national_id` on every (century, YYMMDD) combination."""
+        yymmdd = np.char.zfill(np.arange(1_000_000).astype("U6"), 6)
+        for century in "23":
+            with self.subTest(century=century):
+                prefixes = np.char.add(np.char.add(century, yymmdd), "123456")
+                digits = prefixes.view(np.uint32).reshape(-1, 13).astype(np.int64) - ord("0")
+                check_digits = (11 - (digits @ np.array(CHECK_DIGIT_WEIGHTS)) % 11) % 10
+                ids = np.char.add(prefixes, check_digits.astype("U1"))
+                result = validate_national_ids(ids, current_date=self.current_date)
+                actual = list(zip(result.valid.tolist(), error_messages(result.error_code).tolist()))
+
+                expected = [validate_national_id(national_id, current_date=self.current_date) for national_id in ids.tolist()]
+                if expected != actual:
+                    index = next(i for i, pair in enumerate(expected) if pair != actual[i])
+                    self.fail(f"Mismatch for {ids[index]}: {expected[index]!r} != {actual[index]!r}")
+
+    def test_parity_on_malformed_ids(self):
+        """Non-ASCII digits, code points that wrap in narrow integers and trailing whitespace are invalid formats."""
+        ids = [
+            "29001011234564",
+            "3\u0660\u0660\u0660\u0662\u0660\u0662\u0660\u0661\u0660\u0660\u0660\u0661\u0667",
+            "\U00010032" + "9001011234564",
+            "2900101123456\U00010034",
+            "\u0132" + "9001011234564",
+            "29001011234564\n",
+            "29001011234564 ",
+            "2900101123456",
+        ]
+        result = validate_national_ids(ids, current_date=self.current_date)
+        actual = list(zip(result.valid.tolist(), error_messages(result.error_code).tolist()))
+        expected = [validate_national_id(national_id, current_date=self.current_date) for national_id in ids]
+        self.assertEqual(actual, expected)
+        self.assertEqual(result.valid.tolist(), [True] + [False] * 7)
+
+    def test_columns_match_extract_info(self):
+        """Birth date and gender columns match `extract_info` for valid IDs."""
+        ids = ["29001011234564", "32402292234565", "29013231234567", "29001019934565", "29001011234565"]
+        result = validate_national_ids(ids, current_date=self.current_date)
+        self.assertEqual(result.valid.tolist(), [True, True, False, False, False])
+        self.assertEqual(result.error_code[2:].tolist(), [INVALID_MONTH, INVALID_GOVERNORATE, INVALID_CHECK_DIGIT])
+
+        for index, national_id in enumerate(ids[:2]):
+            info = extract_info(national_id)
+            self.assertEqual(result.birth_year[index], info["birth_year"])
+            self.assertEqual(result.birth_month[index], info["birth_month"])
+            self.assertEqual(result.birth_day[index], info["birth_day"])
+            self.assertEqual("male" if result.gender[index] else "female", info["gender"])
+            self.assertEqual(result.governorate_code[index], info["governorate_code"])
+        self.assertEqual(result.birth_year[2], 0)
+
+    def test_input_types(self):
+        """Bytes buffers, byte-string arrays and ragged string lists are all accepted."""
+        buffer = b"29001011234564" + b"29001011ABCD67"
+        for ids in (buffer, memoryview(buffer), np.array([b"29001011234564", b"29001011ABCD67"])):
+            with self.subTest(ids=type(ids)):
+                result = validate_national_ids(ids, current_date=self.current_date)
+                self.assertEqual(result.error_code.tolist(), [VALID, INVALID_FORMAT])
+
+        result = validate_national_ids(["2900101123456", "290010112345678", None, "29001011234564"])
+        self.assertEqual(result.error_code.tolist(), [INVALID_FORMAT, INVALID_FORMAT, INVALID_FORMAT, VALID])
+
+        result = validate_national_ids(["123", "19001011234567", "49001011234567"])
+        self.assertEqual(result.error_code.tolist(), [INVALID_FORMAT, INVALID_CENTURY, INVALID_CENTURY])
+
+        result = validate_national_ids(["123"], current_date=self.current_date.date())
+        self.assertEqual(result.error_code.tolist(), [INVALID_FORMAT])
+
+        with self.assertRaises(ValueError):
+            validate_national_ids(b"2900101123456")
+        with self.assertRaises(TypeError):
+            validate_national_ids(np.arange(3))
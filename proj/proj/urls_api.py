@@ -0,0 +1,10 @@
+"""
+URL configuration of the API-only settings profile (proj.settings_api): the
+national ID API without the admin and the homepage.
+"""
+from django.urls import include, path
+from National_ID_Processing.urls import api_urlpatterns
+
+urlpatterns = [
+    path('', include(api_urlpatterns)),
+]